@@ -1,9 +1,17 @@
-from .handle import get_client_handle, get_api_client, update_client_handle
+from .handle import (
+    get_client_handle,
+    get_api_client,
+    get_async_api_client,
+    update_client_handle,
+)
 from .resource import get_resource_api
+from .groups import GroupsQuery
 
 __all__ = [
     "get_client_handle",
     "get_resource_api",
     "get_api_client",
+    "get_async_api_client",
     "update_client_handle",
+    "GroupsQuery",
 ]
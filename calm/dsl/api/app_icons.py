@@ -1,3 +1,5 @@
+import mimetypes
+
 from .resource import ResourceAPI
 from .connection import REQUEST
 
@@ -8,17 +10,21 @@ class AppIconAPI(ResourceAPI):
         self.UPLOAD = self.PREFIX + "/upload"
         self.IS_MARKETPLACE_ICON = self.PREFIX + "/{}/" + "is_marketplaceicon"
 
-    def upload(self, icon_name, file_path):
+    def upload(self, icon_name, file_path, progress=None):
         data = {"name": icon_name}
-        files = {"image": (icon_name, open(file_path, "rb"), "image/jpeg")}
+        content_type = mimetypes.guess_type(file_path)[0] or "image/jpeg"
 
-        return self.connection._call(
-            self.UPLOAD,
-            request_json=data,
-            files=files,
-            method=REQUEST.METHOD.POST,
-            verify=False,
-        )
+        # File is streamed while uploading and closed once the call is over
+        with open(file_path, "rb") as fd:
+            files = {"image": (icon_name, fd, content_type)}
+            return self.connection._call(
+                self.UPLOAD,
+                request_json=data,
+                files=files,
+                method=REQUEST.METHOD.POST,
+                verify=False,
+                progress=progress,
+            )
 
     def is_marketplace_icon(self, uuid):
         return self.connection._call(
@@ -35,8 +35,19 @@ class ApplicationAPI(ResourceAPI):
             delete_url, verify=False, method=REQUEST.METHOD.DELETE
         )
 
-    def download_runlog(self, app_id, runlog_id):
+    def download_runlog(
+        self, app_id, runlog_id, file_name=None, resume=False, progress=None
+    ):
+        """Downloads the runlogs archive of an action run. If file_name is
+        given, the archive is streamed to it (see `ResourceAPI._download`).
+        """
+
         download_url = self.DOWNLOAD_RUNLOG.format(app_id, runlog_id)
+        if file_name:
+            return self._download(
+                download_url, file_name, resume=resume, progress=progress
+            )
+
         return self.connection._call(
             download_url, method=REQUEST.METHOD.GET, verify=False
         )
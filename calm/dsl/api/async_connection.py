@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+async_connection: Provides an asyncio counterpart of the calm HTTP client
+
+The blocking requests session of a `Connection` is shared, every call is
+dispatched to a thread pool sized to the connection pool and the number of
+in-flight requests is bounded by a semaphore.
+
+Example:
+
+connection = Connection(pc_ip, pc_port, auth=("<pc_username>", "<pc_passwd>"))
+async_connection = AsyncConnection(connection, max_concurrency=10)
+async_connection.connect()
+res, err = await async_connection._call(endpoint, method=REQUEST.METHOD.GET)
+
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from calm.dsl.tools import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+
+class AsyncConnection:
+    def __init__(self, connection, max_concurrency=None):
+        """Asyncio client wrapping a (shared) connection.
+
+        Args:
+            connection (Connection): connection whose session pool is used
+            max_concurrency (int): The maximum number of requests in flight
+                                   (default: pool_maxsize of the connection)
+        Returns:
+        Raises:
+        """
+        self.connection = connection
+        self.max_concurrency = int(max_concurrency or connection._pool_maxsize)
+        self._executor = None
+        self._semaphores = {}
+
+    @property
+    def host(self):
+        return self.connection.host
+
+    @property
+    def base_url(self):
+        return self.connection.base_url
+
+    def connect(self):
+        """Connect the underlying connection (if required) and create the
+        worker pool used for dispatching requests.
+        """
+
+        if self.connection.session is None:
+            self.connection.connect()
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="calm-async"
+            )
+        LOG.debug("{} created".format(self.__class__.__name__))
+        return self
+
+    def close(self):
+        """
+        Shutdown the worker pool. The underlying session is left open as it
+        may be shared with the synchronous client.
+        """
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._semaphores = {}
+
+    def _get_semaphore(self):
+        """Returns the semaphore bound to the running event loop"""
+
+        loop = asyncio.get_event_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def run(self, func, *args, **kwargs):
+        """Runs the blocking callable in the worker pool
+
+        Args:
+            func (callable): blocking function (usually an api method)
+        Returns:
+            Return value of the func
+        """
+
+        if self._executor is None:
+            self.connect()
+
+        async with self._get_semaphore():
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(func, *args, **kwargs)
+            )
+
+    async def _call(self, endpoint, **kwargs):
+        """Awaitable version of `Connection._call`
+
+        Args:
+            endpoint (str): calm server endpoint
+            kwargs: keyword arguments of `Connection._call`
+        Returns:
+            (tuple (requests.Response, dict)): Response
+        """
+
+        return await self.run(self.connection._call, endpoint, **kwargs)
+
+
+class AsyncResourceAPI:
+    """Awaitable proxy of a resource api. Every method of the wrapped api
+    (list, read, create, update, delete and the resource specific ones) is
+    exposed as a coroutine function running on the async connection.
+    """
+
+    def __init__(self, resource_api, connection):
+        self._api = resource_api
+        self.connection = connection
+
+    def __getattr__(self, name):
+        attr = getattr(self._api, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def _async_method(*args, **kwargs):
+            return await self.connection.run(attr, *args, **kwargs)
+
+        return _async_method
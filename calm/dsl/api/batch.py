@@ -0,0 +1,238 @@
+"""
+batch: Bundles many v3 operations into `/batch` calls
+
+Api methods of a batch handle queue their request instead of making it and
+return a future. Queued operations are submitted in chunks (of at most
+`MAX_BATCH_SIZE`) to the batch api and every future is resolved with the
+(response, error) of its operation, as returned by the regular api.
+
+Only api methods making a single request (create, read, update, delete and
+resource specific actions) can be batched. A chunk holding a single
+operation is sent as a regular request.
+
+Example:
+
+with client.batch() as batch:
+    futures = [batch.application.delete(app_uuid) for app_uuid in app_uuids]
+
+for future in futures:
+    res, err = future.result()
+
+"""
+
+from concurrent.futures import Future
+from urllib.parse import urlencode
+
+from requests.models import Response
+
+from calm.dsl.tools import get_logging_handle, serializer
+from .connection import REQUEST
+from .resource import ResourceAPI
+
+LOG = get_logging_handle(__name__)
+
+# Maximum number of operations accepted by a single batch call
+MAX_BATCH_SIZE = 60
+
+
+class BatchResourceAPI(ResourceAPI):
+    def __init__(self, connection):
+        super().__init__(connection, resource_type="batch")
+
+    def submit(self, api_request_list, sequential=False, continue_on_failure=True):
+        """Submits the operations in a single batch call
+
+        Args:
+            api_request_list (list): operations, each a dict having
+                operation (http method), path_and_params and body
+            sequential (bool): execute the operations in the given order
+            continue_on_failure (bool): execute the remaining operations if
+                an operation fails
+        Returns:
+            (tuple (requests.Response, dict)): Response, error
+        """
+
+        payload = {
+            "action_on_failure": "CONTINUE" if continue_on_failure else "ABORT",
+            "execution_order": "SEQUENTIAL" if sequential else "NON_SEQUENTIAL",
+            "api_request_list": api_request_list,
+            "api_version": "3.0",
+        }
+        return self.connection._call(
+            self.PREFIX, verify=False, request_json=payload, method=REQUEST.METHOD.POST
+        )
+
+
+def _get_status_code(status):
+    """Returns the status code of batch response item (Ex: '202 Accepted')"""
+
+    try:
+        return int(str(status).split()[0])
+    except (IndexError, ValueError):
+        return 500
+
+
+def _make_response(item, url):
+    """Returns the response of an operation built from batch response item"""
+
+    res = Response()
+    res.status_code = _get_status_code(item.get("status"))
+    res.url = url
+    res.encoding = "utf-8"
+    res.headers["Content-Type"] = "application/json"
+    res._content = serializer.dumps_bytes(item.get("api_response", {}))
+    return res
+
+
+class BatchConnection:
+    def __init__(
+        self, connection, chunk_size=None, sequential=False, continue_on_failure=True
+    ):
+        """Connection queueing the requests made on it
+
+        Args:
+            connection (Connection): connection used for the batch calls
+            chunk_size (int): operations per batch call (at most MAX_BATCH_SIZE)
+            sequential (bool): execute the operations of a chunk in order
+            continue_on_failure (bool): execute the remaining operations of
+                a chunk if an operation fails
+        """
+        self.connection = connection
+        self.chunk_size = min(int(chunk_size or MAX_BATCH_SIZE), MAX_BATCH_SIZE)
+        self.sequential = sequential
+        self.continue_on_failure = continue_on_failure
+        self.batch_api = BatchResourceAPI(connection)
+        self._pending = []
+
+    @property
+    def host(self):
+        return self.connection.host
+
+    def _call(
+        self,
+        endpoint,
+        method=REQUEST.METHOD.POST,
+        request_json=None,
+        request_params=None,
+        verify=True,
+        **kwargs
+    ):
+        """Queues the request, see `Connection._call`
+
+        Returns:
+            (concurrent.futures.Future): resolved with (Response, error)
+        """
+
+        unsupported = [key for key, value in kwargs.items() if value]
+        if unsupported:
+            raise ValueError(
+                "Batch request to {} does not support {}".format(endpoint, unsupported)
+            )
+
+        future = Future()
+        self._pending.append(
+            {
+                "future": future,
+                "endpoint": endpoint,
+                "method": method,
+                "request_json": request_json,
+                "request_params": request_params,
+                "verify": verify,
+            }
+        )
+        if len(self._pending) >= self.chunk_size:
+            self.flush()
+        return future
+
+    def flush(self):
+        """Submits the queued operations"""
+
+        while self._pending:
+            chunk = self._pending[: self.chunk_size]
+            del self._pending[: self.chunk_size]
+            self._submit(chunk)
+
+    def cancel(self):
+        """Drops the queued operations"""
+
+        for op in self._pending:
+            op["future"].cancel()
+        self._pending = []
+
+    def _submit(self, chunk):
+        chunk = [op for op in chunk if op["future"].set_running_or_notify_cancel()]
+        if not chunk:
+            return
+
+        try:
+            if len(chunk) == 1:
+                op = chunk[0]
+                op["future"].set_result(
+                    self.connection._call(
+                        op["endpoint"],
+                        method=op["method"],
+                        request_json=op["request_json"],
+                        request_params=op["request_params"],
+                        verify=op["verify"],
+                    )
+                )
+                return
+
+            self._submit_batch(chunk)
+
+        except Exception as exc:
+            for op in chunk:
+                if not op["future"].done():
+                    op["future"].set_exception(exc)
+
+    def _submit_batch(self, chunk):
+        api_request_list = []
+        for op in chunk:
+            path_and_params = "/" + op["endpoint"].lstrip("/")
+            if op["request_params"]:
+                path_and_params += ("&" if "?" in path_and_params else "?") + urlencode(
+                    op["request_params"]
+                )
+            op["path_and_params"] = path_and_params
+
+            api_request = {
+                "operation": op["method"].upper(),
+                "path_and_params": path_and_params,
+            }
+            if op["method"] != REQUEST.METHOD.GET:
+                api_request["body"] = op["request_json"] or {}
+            api_request_list.append(api_request)
+
+        LOG.debug("Submitting batch of {} operations".format(len(chunk)))
+        res, err = self.batch_api.submit(
+            api_request_list,
+            sequential=self.sequential,
+            continue_on_failure=self.continue_on_failure,
+        )
+        if err:
+            for op in chunk:
+                op["future"].set_result((None, err))
+            return
+
+        api_response_list = res.json().get("api_response_list", None) or []
+        for index, op in enumerate(chunk):
+            if index >= len(api_response_list):
+                op["future"].set_result(
+                    (
+                        None,
+                        {
+                            "code": 500,
+                            "error": "No response for {} in batch".format(
+                                op["path_and_params"]
+                            ),
+                        },
+                    )
+                )
+                continue
+
+            op_res = _make_response(api_response_list[index], op["path_and_params"])
+            op_err = None
+            if not op_res.ok:
+                op_err = {"error": op_res.text, "code": op_res.status_code}
+                LOG.debug("Error Response: {}".format(op_err))
+            op["future"].set_result((op_res, op_err))
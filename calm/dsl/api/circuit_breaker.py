@@ -0,0 +1,111 @@
+"""
+circuit_breaker: Fast failure of requests to an unresponsive server
+
+After `failure_threshold` consecutive failures (connection errors, timeouts
+and 502/503/504 responses) the circuit opens, and requests fail at once
+without being made. After `reset_timeout` seconds, a single trial request is
+let through: the circuit closes if it succeeds and opens again otherwise.
+
+Example:
+
+breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+if not breaker.allow():
+    return None, {"code": 503, "error": "..."}
+...
+breaker.record(failed)
+
+"""
+
+import threading
+import time
+
+from calm.dsl.tools import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+# Responses counted as failures of server
+FAILURE_STATUS_CODES = [502, 503, 504]
+
+
+class CircuitBreaker:
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """Circuit breaker
+
+        Args:
+            failure_threshold (int): consecutive failures opening the circuit
+                                     (0: never opens)
+            reset_timeout (float): seconds after which an open circuit lets
+                                   a trial request through
+        """
+        self.failure_threshold = int(failure_threshold or 0)
+        self.reset_timeout = float(reset_timeout)
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_time = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_failure(res):
+        """Returns True if the response (None if no response was received)
+        is a failure of server"""
+
+        return res is None or res.status_code in FAILURE_STATUS_CODES
+
+    def allow(self):
+        """Returns True if a request can be made"""
+
+        if not self.failure_threshold:
+            return True
+
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            # Trial request (if half open) is in flight
+            now = time.monotonic()
+            if now - self._opened_time < self.reset_timeout:
+                return False
+
+            LOG.debug("Circuit half open, letting a trial request through")
+            self.state = self.HALF_OPEN
+            self._opened_time = now
+            return True
+
+    def time_to_retry(self):
+        """Returns the seconds after which an open circuit allows a request"""
+
+        with self._lock:
+            if self.state == self.CLOSED:
+                return 0.0
+            return max(self.reset_timeout - (time.monotonic() - self._opened_time), 0.0)
+
+    def record(self, failed):
+        """Records the outcome of a request made"""
+
+        if not self.failure_threshold:
+            return
+
+        with self._lock:
+            if not failed:
+                if self.state != self.CLOSED:
+                    LOG.info("Server is responding again, closing circuit")
+                self.state = self.CLOSED
+                self.failures = 0
+                return
+
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                if self.state == self.CLOSED:
+                    LOG.warning(
+                        "{} consecutive requests failed, failing requests for "
+                        "{:.0f}s".format(self.failures, self.reset_timeout)
+                    )
+                self.state = self.OPEN
+                self._opened_time = time.monotonic()
@@ -12,14 +12,40 @@ client = get_connection(pc_ip, pc_port,
 """
 
 import traceback
-import json
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import threading
+import time
 import urllib3
-import sys
 
 from requests import Session as NonRetrySession
-from requests_toolbelt import MultipartEncoder
 from requests.adapters import HTTPAdapter
-from calm.dsl.tools import get_logging_handle
+from requests.auth import HTTPBasicAuth
+from requests.exceptions import RequestException, Timeout
+from requests_toolbelt import MultipartEncoder, MultipartEncoderMonitor
+from requests.structures import CaseInsensitiveDict
+from calm.dsl.tools import get_logging_handle, serializer
+from .circuit_breaker import CircuitBreaker
+from .instrumentation import (
+    TimedHTTPAdapter,
+    start_trace,
+    end_trace,
+    is_tracing_enabled,
+)
+from .rate_limiter import RateLimiter, is_read_request
+from .response_cache import ResponseCache
+from .retry import RetryPolicy
+from .session_store import SessionStore
+from .single_flight import SingleFlight
+from .timeouts import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DeadlineExceeded,
+    EndpointTimeouts,
+    get_time_left,
+    set_deadline,
+)
 
 urllib3.disable_warnings()
 LOG = get_logging_handle(__name__)
@@ -88,7 +114,29 @@ class Connection:
         base_url="",
         response_processor=None,
         session_headers=None,
-        retries_enabled=False,
+        retries_enabled=True,
+        response_cache=False,
+        response_cache_size=100,
+        request_coalescing=True,
+        coalesce_window=0,
+        request_compression=False,
+        compression_threshold=16384,
+        persist_session=False,
+        rate_limit=0,
+        rate_burst=0,
+        max_in_flight=0,
+        read_rate_limit=0,
+        write_rate_limit=0,
+        delete_rate_limit=0,
+        connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+        read_timeout=DEFAULT_READ_TIMEOUT,
+        endpoint_timeouts=None,
+        command_deadline=0,
+        circuit_breaker_threshold=5,
+        circuit_breaker_reset=30.0,
+        max_retries=3,
+        retry_backoff=0.5,
+        retry_max_backoff=30.0,
         **kwargs
     ):
         """Generic client to connect to server.
@@ -107,7 +155,46 @@ class Connection:
             session_headers (dict): session headers dict
             auth_type (str): auth type that needs to be used by the client
             auth (tuple): authentication
-            retries_enabled (bool): Flag to perform retries (default: false)
+            retries_enabled (bool): Flag to retry requests failing transiently,
+                                    if safe to repeat (default: true)
+            response_cache (bool): Flag to cache GET responses in local db
+                                   and revalidate them (default: false)
+            response_cache_size (int): Size of response cache in MB
+            request_coalescing (bool): Flag to merge identical idempotent
+                                       requests into one (default: true)
+            coalesce_window (float): Seconds for which a completed read is
+                                     shared with identical requests (0:
+                                     only reads in flight are shared)
+            request_compression (bool): Flag to gzip large request bodies
+                                        (default: false)
+            compression_threshold (int): Minimum size (in bytes) of request
+                                         body to be compressed
+            persist_session (bool): Flag to store the authenticated session
+                                    in local DB and reuse it (default: false)
+            rate_limit (float): Maximum requests per second (0: no limit)
+            rate_burst (int): Requests that may be made at once after being
+                              idle (default: rate limit)
+            max_in_flight (int): Maximum requests in flight (0: no limit)
+            read_rate_limit (float): Maximum reads (GET, list and groups
+                                     calls) per second (0: no limit)
+            write_rate_limit (float): Maximum writes (POST, PUT) per second
+            delete_rate_limit (float): Maximum deletes per second
+            connect_timeout (float): Seconds to wait for a connection
+                                     (0: no timeout)
+            read_timeout (float): Seconds to wait for the response (between
+                                  bytes) (0: no timeout)
+            endpoint_timeouts (dict or str): Timeouts of endpoints matching
+                                             patterns, see `timeouts`
+            command_deadline (float): Seconds (from first request) after
+                                      which requests fail (0: no deadline)
+            circuit_breaker_threshold (int): Consecutive failures after which
+                                             requests fail at once (0: never)
+            circuit_breaker_reset (float): Seconds after which a request is
+                                           tried again once circuit is open
+            max_retries (int): Maximum retries of a request
+            retry_backoff (float): Base of exponential backoff (seconds)
+                                   between retries
+            retry_max_backoff (float): Maximum backoff between retries
         Returns:
         Raises:
         """
@@ -124,6 +211,53 @@ class Connection:
         self.auth_type = auth_type
         self.response_processor = response_processor
         self.retries_enabled = retries_enabled
+        self._response_cache_enabled = response_cache
+        self._response_cache_size = response_cache_size
+        self.response_cache = None
+        self.single_flight = None
+        if request_coalescing:
+            self.single_flight = SingleFlight(window=coalesce_window)
+        self.request_compression = request_compression
+        self.compression_threshold = int(compression_threshold)
+
+        # Bytes before/after (de)compression of request and response bodies
+        self.transfer_metrics = {
+            "request_bytes": 0,
+            "request_bytes_sent": 0,
+            "response_bytes": 0,
+            "response_bytes_received": 0,
+        }
+        self._metrics_lock = threading.Lock()
+        self._persist_session = persist_session
+        self.rate_limiter = RateLimiter(
+            rate=rate_limit,
+            burst=rate_burst,
+            max_in_flight=max_in_flight,
+            budgets={
+                "read": read_rate_limit,
+                "write": write_rate_limit,
+                "delete": delete_rate_limit,
+            },
+        )
+        self.session_store = None
+        self._stored_cookies = None
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self.timeouts = EndpointTimeouts(
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            endpoint_timeouts=endpoint_timeouts,
+        )
+        self._command_deadline = command_deadline
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=circuit_breaker_threshold,
+            reset_timeout=circuit_breaker_reset,
+        )
+        self.retry_policy = RetryPolicy(
+            max_retries=max_retries,
+            backoff=retry_backoff,
+            max_backoff=retry_max_backoff,
+        )
 
     def connect(self):
         """Connect to api server, create http session pool.
@@ -134,16 +268,23 @@ class Connection:
         Raises:
         """
 
-        # TODO: Add retries
-        # if self.retries_enabled:
-        #     self.session = RetrySession()
-        # else:
+        # Retries are made by `_send`, as per `retry_policy`
         self.session = NonRetrySession()
+        if self._persist_session and self.auth:
+            if self.auth[1]:
+                self._load_session()
+            else:
+                # Session is stored encrypted with the password
+                LOG.debug("No password given, session will not be persisted")
         if self.auth and self.auth_type == REQUEST.AUTH_TYPE.BASIC:
             self.session.auth = self.auth
-        self.session.headers.update({"Content-Type": "application/json"})
+        self.session.headers.update(
+            {"Content-Type": "application/json", "Accept-Encoding": "gzip, deflate"}
+        )
 
-        http_adapter = HTTPAdapter(
+        # Request phases are timed only if traces are used (Ex: --profile-http)
+        adapter_cls = TimedHTTPAdapter if is_tracing_enabled() else HTTPAdapter
+        http_adapter = adapter_cls(
             pool_block=bool(self._pool_block),
             pool_connections=int(self._pool_connections),
             pool_maxsize=int(self._pool_maxsize),
@@ -151,20 +292,167 @@ class Connection:
         self.session.mount("http://", http_adapter)
         self.session.mount("https://", http_adapter)
         self.base_url = build_url(self.host, self.port, scheme=self.scheme)
+
+        if self._response_cache_enabled:
+            self.response_cache = ResponseCache(
+                max_size=int(self._response_cache_size) * 1024 * 1024,
+                scope=self.auth[0] if self.auth else "",
+            )
+
         LOG.debug("{} session created".format(self.__class__.__name__))
         return self.session
 
+    def _load_session(self):
+        """Loads the persisted session (if any) and registers the hooks to
+        refresh and persist it. Requests of a persisted session are
+        authenticated by its cookie (JWT) instead of basic auth.
+        """
+
+        scope = "{}/{}".format(
+            build_url(self.host, self.port, scheme=self.scheme), self.auth[0]
+        )
+        self.session_store = SessionStore(scope, self.auth[1])
+        self.session.hooks["response"].append(self._refresh_session)
+        self.session.hooks["response"].append(self._save_session)
+
+        cookies = self.session_store.load()
+        if cookies:
+            LOG.debug("Reusing the session stored in local DB")
+            self.session.cookies.update(cookies)
+            self._stored_cookies = cookies
+            self.auth_type = REQUEST.AUTH_TYPE.JWT
+
+    def _refresh_session(self, res, **kwargs):
+        """Response hook authenticating again (basic auth) if the server has
+        rejected the session cookie, and resending the request.
+        """
+
+        if res.status_code != 401 or self.auth_type != REQUEST.AUTH_TYPE.JWT:
+            return res
+
+        # Streamed request bodies (Ex: file uploads) cannot be sent again
+        body = res.request.body
+        if body is not None and not isinstance(body, (bytes, str)):
+            return res
+
+        LOG.debug("Session expired, authenticating again")
+        res.content
+        res.close()
+        self.session.cookies.clear()
+
+        request = res.request.copy()
+        request.headers.pop("Cookie", None)
+        request = HTTPBasicAuth(*self.auth)(request)
+        new_res = res.connection.send(request, **kwargs)
+        new_res.history.append(res)
+        new_res.request = request
+        return new_res
+
+    def _save_session(self, res, **kwargs):
+        """Response hook persisting the session cookies whenever the server
+        sets new ones. Later requests are authenticated by the cookies.
+        """
+
+        if not res.ok or not res.cookies:
+            return res
+
+        # Session jar is updated only after the hooks are run
+        self.session.cookies.update(res.cookies)
+        cookies = self.session.cookies.get_dict()
+        if cookies and cookies != self._stored_cookies:
+            self.session_store.save(cookies)
+            self._stored_cookies = cookies
+            self.auth_type = REQUEST.AUTH_TYPE.JWT
+            self.session.auth = None
+
+        return res
+
+    def get_executor(self):
+        """Returns the worker pool (sized to the connection pool) in which
+        calls submitted by client handles are run"""
+
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=int(self._pool_maxsize),
+                    thread_name_prefix="calm-submit",
+                )
+            return self._executor
+
     def close(self):
         """
-        Close the session.
+        Close the session and the worker pool.
 
         Args:
             None
         Returns:
             None
         """
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
         self.session.close()
 
+    def _record_transfer(
+        self, endpoint, request_size, sent_size, res=None, stream=False
+    ):
+        """Records the body sizes of a request (and response) in metrics,
+        returns the size of response body received. Bodies of streamed
+        responses are not read yet, so are not counted."""
+
+        response_size = received_size = 0
+        if res is not None and not stream:
+            response_size = len(res.content or b"")
+            # Bytes read from socket, before decoding (none if served from
+            # response cache)
+            received_size = res.raw.tell() if res.raw is not None else 0
+
+        with self._metrics_lock:
+            metrics = self.transfer_metrics
+            metrics["request_bytes"] += request_size
+            metrics["request_bytes_sent"] += sent_size
+            metrics["response_bytes"] += response_size
+            metrics["response_bytes_received"] += received_size
+
+        LOG.debug(
+            "Transfer of '{}': request {} bytes (sent {}), response {} bytes "
+            "(received {})".format(
+                endpoint, request_size, sent_size, response_size, received_size
+            )
+        )
+        return received_size
+
+    def _send_json(self, send, url, request_json, headers, **kwargs):
+        """Sends request_json as body of the request using send (a session
+        method). Bodies larger than compression threshold are gzip
+        compressed if enabled. If the server rejects the compressed body
+        with 415, compression is disabled and the request is sent again.
+
+        Returns:
+            (tuple (requests.Response, int, int)): response, body size and
+                size of the body sent
+        """
+
+        body = serializer.dumps_bytes(request_json)
+        data = body
+        body_headers = headers
+        compressed = (
+            self.request_compression and len(body) >= self.compression_threshold
+        )
+        if compressed:
+            data = gzip.compress(body, compresslevel=6)
+            body_headers = CaseInsensitiveDict(headers)
+            body_headers["Content-Encoding"] = "gzip"
+
+        res = send(url, data=data, headers=body_headers, **kwargs)
+        if compressed and res.status_code == 415:
+            LOG.debug("Server rejected compressed request, disabling compression")
+            self.request_compression = False
+            return self._send_json(send, url, request_json, headers, **kwargs)
+
+        return res, len(body), len(data)
+
     def _call(
         self,
         endpoint,
@@ -175,8 +463,12 @@ class Connection:
         verify=True,
         headers=None,
         files=None,
+        stream=False,
+        progress=None,
     ):
-        """Private method for making http request to calm
+        """Private method for making http request to calm. Identical
+        idempotent requests in flight (or completed within coalesce window)
+        are merged into a single call to server.
 
         Args:
             endpoint (str): calm server endpoint
@@ -184,9 +476,112 @@ class Connection:
             cookies (dict): cookies that need to be forwarded.
             request_json (dict): request data
             request_params (dict): request params
+            files (dict): files to upload as multipart/form-data
+            stream (bool): Flag to defer downloading the response body
+            progress (callable): called with (bytes sent, total bytes) while
+                                 uploading files
         Returns:
             (tuple (requests.Response, dict)): Response
         """
+
+        call_args = dict(
+            endpoint=endpoint,
+            method=method,
+            cookies=cookies,
+            request_json=request_json,
+            request_params=request_params,
+            verify=verify,
+            headers=headers,
+            files=files,
+            stream=stream,
+            progress=progress,
+        )
+
+        # Streamed body can be consumed only once, so it is never shared
+        if not self.single_flight or stream:
+            return self._send(**call_args)
+
+        if files or cookies or not is_read_request(method, endpoint):
+            # Mutation may change the results of earlier reads
+            self.single_flight.forget()
+            return self._send(**call_args)
+
+        key = serializer.dumps_bytes(
+            [method, endpoint, request_json, request_params, headers, verify],
+            sort_keys=True,
+            default=str,
+        )
+        return self.single_flight.do(key, functools.partial(self._send, **call_args))
+
+    def _send(self, endpoint, method=REQUEST.METHOD.POST, request_json=None, **kwargs):
+        """Makes the http request to calm, retrying it (if enabled) when it
+        fails transiently and is safe to repeat (see `retry`). Args are the
+        same as of `_send_once`.
+
+        Returns:
+            (tuple (requests.Response, dict)): Response, error of last attempt
+        """
+
+        attempt = 0
+        while True:
+            res, err, exc = self._send_once(
+                endpoint,
+                method=method,
+                request_json=request_json,
+                attempt=attempt,
+                **kwargs
+            )
+            if not err or not self.retries_enabled or kwargs.get("files", None):
+                return res, err
+
+            if not self.retry_policy.is_retryable(method, endpoint, res=res, exc=exc):
+                return res, err
+
+            delay = self.retry_policy.get_delay(attempt, res)
+            if delay is None:
+                return res, err
+
+            LOG.warning(
+                "Request to '{}' failed with {}, retrying in {:.2f}s".format(
+                    endpoint, err["code"], delay
+                )
+            )
+            if res is not None:
+                res.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def _send_once(
+        self,
+        endpoint,
+        method=REQUEST.METHOD.POST,
+        cookies=None,
+        request_json=None,
+        request_params=None,
+        verify=True,
+        headers=None,
+        files=None,
+        stream=False,
+        progress=None,
+        attempt=0,
+    ):
+        """Makes a single http request to calm
+
+        Args:
+            endpoint (str): calm server endpoint
+            method (str): calm server http method
+            cookies (dict): cookies that need to be forwarded.
+            request_json (dict): request data
+            request_params (dict): request params
+            files (dict): files to upload as multipart/form-data
+            stream (bool): Flag to defer downloading the response body
+            progress (callable): called with (bytes sent, total bytes) while
+                                 uploading files
+            attempt (int): number of earlier attempts of the request
+        Returns:
+            (tuple (requests.Response, dict, Exception)): Response, error and
+                the exception raised (if any) making the request
+        """
         if request_params is None:
             request_params = {}
 
@@ -199,71 +594,157 @@ class Connection:
         )
         res = None
         err = None
+        request_size = sent_size = 0
+        if not self.circuit_breaker.allow():
+            err = {
+                "error": "Request to '{}' not made, as {} consecutive requests to "
+                "server failed. Retry after {:.0f}s".format(
+                    endpoint,
+                    self.circuit_breaker.failures,
+                    self.circuit_breaker.time_to_retry(),
+                ),
+                "code": 503,
+            }
+            LOG.debug("Error Response: {}".format(err))
+            return res, err, None
+
+        exc = None
+        trace = start_trace(method, endpoint, attempt=attempt)
         try:
             res = None
             url = build_url(self.host, self.port, endpoint=endpoint, scheme=self.scheme)
             LOG.debug("URL is: {}".format(url))
-            base_headers = self.session.headers
+            # Deadline given on command line (see `set_deadline`) takes precedence
+            if self._command_deadline and get_time_left() is None:
+                set_deadline(self._command_deadline)
+            timeout = self.timeouts.get(endpoint)
+            # Copy, so that request headers do not leak into the session
+            base_headers = CaseInsensitiveDict(self.session.headers)
             if headers:
                 base_headers.update(headers)
 
-            if method == REQUEST.METHOD.POST:
-                if files:
-                    request_json.update(files)
-                    m = MultipartEncoder(fields=request_json)
-                    res = self.session.post(
+            with self.rate_limiter.limit(method, endpoint) as endpoint_class:
+                if method == REQUEST.METHOD.POST:
+                    if files:
+                        # Files are read in chunks while the body is being sent
+                        fields = dict(request_json)
+                        fields.update(files)
+                        m = MultipartEncoder(fields=fields)
+                        if progress:
+                            m = MultipartEncoderMonitor(
+                                m,
+                                lambda monitor: progress(
+                                    monitor.bytes_read, monitor.len
+                                ),
+                            )
+                        upload_headers = CaseInsensitiveDict(base_headers)
+                        upload_headers["Content-Type"] = m.content_type
+                        res = self.session.post(
+                            url,
+                            params=request_params,
+                            data=m,
+                            verify=verify,
+                            stream=stream,
+                            headers=upload_headers,
+                            cookies=cookies,
+                            timeout=timeout,
+                            # Upload can not be resent, so it is not authenticated
+                            # by the (possibly expired) session cookie alone
+                            auth=self.auth,
+                        )
+                        request_size = sent_size = m.len
+                    else:
+                        res, request_size, sent_size = self._send_json(
+                            self.session.post,
+                            url,
+                            request_json,
+                            base_headers,
+                            params=request_params,
+                            verify=verify,
+                            stream=stream,
+                            cookies=cookies,
+                            timeout=timeout,
+                        )
+                elif method == REQUEST.METHOD.PUT:
+                    res, request_size, sent_size = self._send_json(
+                        self.session.put,
                         url,
-                        data=m,
+                        request_json,
+                        base_headers,
+                        params=request_params,
                         verify=verify,
-                        headers={"Content-Type": m.content_type},
+                        stream=stream,
+                        cookies=cookies,
+                        timeout=timeout,
                     )
-                else:
-                    res = self.session.post(
+                elif method == REQUEST.METHOD.GET:
+                    params = request_params or request_json
+                    response_cache = self.response_cache
+                    if stream or url.endswith("/download"):
+                        response_cache = None
+
+                    cache_entry = None
+                    get_headers = base_headers
+                    if response_cache:
+                        cache_entry = response_cache.lookup(url, params)
+                        if cache_entry:
+                            get_headers = dict(base_headers)
+                            get_headers.update(
+                                response_cache.get_conditional_headers(cache_entry)
+                            )
+
+                    res = self.session.get(
                         url,
+                        params=params,
+                        verify=verify,
+                        stream=stream,
+                        headers=get_headers,
+                        cookies=cookies,
+                        timeout=timeout,
+                    )
+
+                    if response_cache:
+                        if cache_entry and res.status_code == 304:
+                            res = response_cache.load(cache_entry, res)
+                        else:
+                            response_cache.store(url, params, res)
+                elif method == REQUEST.METHOD.DELETE:
+                    res, request_size, sent_size = self._send_json(
+                        self.session.delete,
+                        url,
+                        request_json,
+                        base_headers,
                         params=request_params,
-                        data=json.dumps(request_json),
                         verify=verify,
-                        headers=base_headers,
+                        stream=stream,
                         cookies=cookies,
+                        timeout=timeout,
                     )
-            elif method == REQUEST.METHOD.PUT:
-                res = self.session.put(
-                    url,
-                    params=request_params,
-                    data=json.dumps(request_json),
-                    verify=verify,
-                    headers=base_headers,
-                    cookies=cookies,
-                )
-            elif method == REQUEST.METHOD.GET:
-                res = self.session.get(
-                    url,
-                    params=request_params or request_json,
-                    verify=verify,
-                    headers=base_headers,
-                    cookies=cookies,
-                )
-            elif method == REQUEST.METHOD.DELETE:
-                res = self.session.delete(
-                    url,
-                    params=request_params,
-                    data=json.dumps(request_json),
-                    verify=verify,
-                    headers=base_headers,
-                    cookies=cookies,
-                )
+            self.rate_limiter.update(endpoint_class, res)
+            self.circuit_breaker.record(self.circuit_breaker.is_failure(res))
+            received_size = self._record_transfer(
+                endpoint, request_size, sent_size, res, stream=stream
+            )
+            end_trace(trace, res.status_code, sent_size, received_size)
             res.raise_for_status()
             if not url.endswith("/download"):
                 if not res.ok:
                     LOG.debug("Server Response: {}".format(res.json()))
         except Exception as ex:
+            exc = ex
+            if "total" not in trace:
+                end_trace(trace, getattr(res, "status_code", None), sent_size)
             LOG.debug("Got traceback\n{}".format(traceback.format_exc()))
             err_msg = res.text if hasattr(res, "text") else "{}".format(ex)
             status_code = res.status_code if hasattr(res, "status_code") else 500
+            if isinstance(ex, (Timeout, DeadlineExceeded)):
+                err_msg = "Request to '{}' timed out: {}".format(endpoint, ex)
+                status_code = 504
+            if res is None and isinstance(ex, RequestException):
+                self.circuit_breaker.record(True)
             err = {"error": err_msg, "code": status_code}
-            LOG.error("Error Response: {}".format(err))
-            sys.exit(-1)
-        return res, err
+            LOG.debug("Error Response: {}".format(err))
+        return res, err, exc
 
 
 _CONNECTION = None
@@ -302,6 +783,7 @@ def update_connection(
     auth_type=REQUEST.AUTH_TYPE.BASIC,
     scheme=REQUEST.SCHEME.HTTPS,
     auth=None,
+    **kwargs
 ):
     global _CONNECTION
-    _CONNECTION = Connection(host, port, auth_type, scheme=scheme, auth=auth)
+    _CONNECTION = Connection(host, port, auth_type, scheme=scheme, auth=auth, **kwargs)
@@ -0,0 +1,159 @@
+"""
+groups: Attribute projected queries on the groups api
+
+A `GroupsQuery` fetches only the requested attributes of the entities of a
+type (with filter, sort and pagination), so listings transfer a fraction of
+the full entity documents returned by list apis.
+
+Example:
+
+query = GroupsQuery(
+    "blueprint",
+    ["name", "state", "categories"],
+    filter="state==ACTIVE",
+    sort_attribute="name",
+    list_attributes=["categories"],
+)
+for row in client.groups.iter_entities(query, limit=50):
+    print(row["entity_id"], row["name"], row["categories"])
+
+"""
+
+from .connection import REQUEST
+from .resource import ResourceAPI
+
+
+class GroupsQuery:
+    def __init__(
+        self,
+        entity_type,
+        attributes,
+        filter=None,
+        sort_attribute=None,
+        sort_order="ASCENDING",
+        offset=0,
+        list_attributes=None,
+    ):
+        """Groups query
+
+        Args:
+            entity_type (str): type of entities queried (Ex: blueprint)
+            attributes (list): attributes fetched for every entity
+            filter (str): filter criteria (Ex: name==abc;state!=DELETED)
+            sort_attribute (str): attribute by which entities are sorted
+            sort_order (str): ASCENDING or DESCENDING
+            offset (int): offset of the first entity
+            list_attributes (list): multi valued attributes, returned as
+                                    list of values
+        """
+        self.entity_type = entity_type
+        self.attributes = list(attributes)
+        self.filter = filter
+        self.sort_attribute = sort_attribute
+        self.sort_order = sort_order
+        self.offset = int(offset or 0)
+        self.list_attributes = set(list_attributes or [])
+
+    def payload(self, offset=None, length=None):
+        """Returns the groups api payload of a page of the query"""
+
+        payload = {
+            "entity_type": self.entity_type,
+            "group_member_attributes": [
+                {"attribute": attribute} for attribute in self.attributes
+            ],
+            "group_member_offset": self.offset if offset is None else offset,
+        }
+        if length:
+            payload["group_member_count"] = length
+        if self.filter:
+            payload["filter_criteria"] = self.filter
+        if self.sort_attribute:
+            payload["group_member_sort_attribute"] = self.sort_attribute
+            payload["group_member_sort_order"] = self.sort_order
+
+        return payload
+
+    def get_row(self, entity_result):
+        """Returns the attribute values of an entity result as flat dict
+        having the entity uuid as `entity_id`"""
+
+        row = {attribute: None for attribute in self.attributes}
+        for data in entity_result.get("data", []):
+            values = []
+            for value in data.get("values", []):
+                values.extend(value.get("values", []))
+
+            if data["name"] in self.list_attributes:
+                row[data["name"]] = values
+            else:
+                row[data["name"]] = values[0] if values else None
+
+        row["entity_id"] = entity_result.get("entity_id", None)
+        return row
+
+
+class GroupsAPI(ResourceAPI):
+
+    # Number of entities fetched per groups call
+    PAGE_SIZE = 250
+
+    def __init__(self, connection):
+        super().__init__(connection, resource_type="groups")
+
+    def query(self, query, offset=None, length=None):
+        return self.connection._call(
+            self.PREFIX,
+            verify=False,
+            request_json=query.payload(offset=offset, length=length),
+            method=REQUEST.METHOD.POST,
+        )
+
+    def iter_entities(self, query, limit=None, page_size=None):
+        """Yields the rows (see `GroupsQuery.get_row`) of query, walking the
+        pages using `filtered_entity_count`.
+
+        Args:
+            query (GroupsQuery): query
+            limit (int): maximum number of rows yielded (default: all)
+            page_size (int): number of entities fetched per groups call
+        Returns:
+            (generator): rows
+        Raises:
+            Exception: If groups call fails
+        """
+
+        page_size = int(page_size or self.PAGE_SIZE)
+        offset = query.offset
+        end = None if limit is None else offset + int(limit)
+
+        while end is None or offset < end:
+            length = page_size if end is None else min(page_size, end - offset)
+            res, err = self.query(query, offset=offset, length=length)
+            if err:
+                raise Exception("[{}] - {}".format(err["code"], err["error"]))
+
+            response = res.json()
+            if "group_results" not in response:
+                raise Exception(
+                    "Invalid response of {} groups query".format(query.entity_type)
+                )
+
+            entity_results = []
+            for group_result in response["group_results"] or []:
+                entity_results.extend(group_result.get("entity_results", None) or [])
+
+            for entity_result in entity_results:
+                yield query.get_row(entity_result)
+
+            offset += len(entity_results)
+            if not entity_results:
+                return
+
+            # Server may cap the page length below the requested one
+            total_matches = response.get("filtered_entity_count", None)
+            if total_matches is None:
+                if len(entity_results) < length:
+                    return
+            elif offset >= int(total_matches):
+                return
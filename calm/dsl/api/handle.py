@@ -1,12 +1,16 @@
 from calm.dsl.config import get_config
 
 from .connection import get_connection, update_connection, REQUEST, Connection
+from .async_connection import AsyncConnection, AsyncResourceAPI
+from .batch import BatchConnection
+from .resource import ResourceAPI
 from .blueprint import BlueprintAPI
 from .application import ApplicationAPI
 from .project import ProjectAPI
 from .setting import SettingAPI
 from .marketplace import MarketPlaceAPI
 from .app_icons import AppIconAPI
+from .groups import GroupsAPI
 
 
 class ClientHandle:
@@ -16,6 +20,9 @@ class ClientHandle:
     def _connect(self):
 
         self.connection.connect()
+        self._init_apis()
+
+    def _init_apis(self):
 
         # Note - add entity api classes here
         self.project = ProjectAPI(self.connection)
@@ -24,10 +31,127 @@ class ClientHandle:
         self.account = SettingAPI(self.connection)
         self.market_place = MarketPlaceAPI(self.connection)
         self.app_icon = AppIconAPI(self.connection)
+        self.groups = GroupsAPI(self.connection)
+
+    def submit(self, fn, *args, **kwargs):
+        """Runs fn(*args, **kwargs) in the worker pool of the connection,
+        which is sized to its connection pool (pool_maxsize). Api calls of
+        the handle can be pipelined this way without asyncio.
+
+        Example:
+            futures = [client.submit(client.blueprint.read, uuid) for uuid in uuids]
+            for future in futures:
+                res, err = future.result()
+
+        Returns:
+            (concurrent.futures.Future): resolved with the return value of
+                fn, or the exception raised by it
+        """
+
+        return self.connection.get_executor().submit(fn, *args, **kwargs)
+
+    def batch(self, chunk_size=None, sequential=False, continue_on_failure=True):
+        """Returns a batch handle, whose api calls are queued and submitted
+        in chunks to the batch api on exit (see `calm.dsl.api.batch`).
+
+        Args:
+            chunk_size (int): operations per batch call
+            sequential (bool): execute the operations of a chunk in order
+            continue_on_failure (bool): execute the remaining operations of
+                a chunk if an operation fails
+        """
+
+        handle = BatchClientHandle(
+            self.connection,
+            chunk_size=chunk_size,
+            sequential=sequential,
+            continue_on_failure=continue_on_failure,
+        )
+        handle._connect()
+        return handle
+
+
+class BatchClientHandle(ClientHandle):
+    def __init__(self, connection, **kwargs):
+        super().__init__(BatchConnection(connection, **kwargs))
+
+    def _connect(self):
+
+        # Underlying connection is already connected
+        self._init_apis()
+
+    def flush(self):
+        self.connection.flush()
+
+    def submit(self, fn, *args, **kwargs):
+        raise TypeError(
+            "Calls of batch handle are queued, submit them using the client handle"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            self.connection.cancel()
+
+
+class AsyncClientHandle:
+    def __init__(self, connection, max_concurrency=None):
+        self.connection = AsyncConnection(connection, max_concurrency=max_concurrency)
+
+    def _connect(self):
+
+        self.connection.connect()
+
+        # Entity apis of sync handle are exposed as awaitable ones
+        sync_handle = ClientHandle(self.connection.connection)
+        sync_handle._init_apis()
+        for name, api in vars(sync_handle).items():
+            if isinstance(api, ResourceAPI):
+                setattr(self, name, AsyncResourceAPI(api, self.connection))
+
+    def close(self):
+        self.connection.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
 
 
 _CLIENT_HANDLE = None
 
+# Options of [CONNECTION] config section and their getters
+CONNECTION_CONFIG_OPTIONS = {
+    "response_cache": "getboolean",
+    "response_cache_size": "getint",
+    "request_coalescing": "getboolean",
+    "coalesce_window": "getfloat",
+    "request_compression": "getboolean",
+    "compression_threshold": "getint",
+    "persist_session": "getboolean",
+    "rate_limit": "getfloat",
+    "rate_burst": "getint",
+    "max_in_flight": "getint",
+    "read_rate_limit": "getfloat",
+    "write_rate_limit": "getfloat",
+    "delete_rate_limit": "getfloat",
+    "connect_timeout": "getfloat",
+    "read_timeout": "getfloat",
+    "endpoint_timeouts": "get",
+    "command_deadline": "getfloat",
+    "circuit_breaker_threshold": "getint",
+    "circuit_breaker_reset": "getfloat",
+    "retries_enabled": "getboolean",
+    "max_retries": "getint",
+    "retry_backoff": "getfloat",
+    "retry_max_backoff": "getfloat",
+}
+
 
 def get_client_handle(
     host,
@@ -36,17 +160,18 @@ def get_client_handle(
     scheme=REQUEST.SCHEME.HTTPS,
     auth=None,
     temp=False,  # This flag is used to generate temp handle
+    **kwargs
 ):
     global _CLIENT_HANDLE
     if temp:
-        connection = Connection(host, port, auth_type, scheme, auth)
+        connection = Connection(host, port, auth_type, scheme, auth, **kwargs)
         handle = ClientHandle(connection)
         handle._connect()
         return handle
 
     else:
         if not _CLIENT_HANDLE:
-            update_client_handle(host, port, auth_type, scheme, auth)
+            update_client_handle(host, port, auth_type, scheme, auth, **kwargs)
         return _CLIENT_HANDLE
 
 
@@ -56,9 +181,10 @@ def update_client_handle(
     auth_type=REQUEST.AUTH_TYPE.BASIC,
     scheme=REQUEST.SCHEME.HTTPS,
     auth=None,
+    **kwargs
 ):
     global _CLIENT_HANDLE
-    update_connection(host, port, auth_type, scheme=scheme, auth=auth)
+    update_connection(host, port, auth_type, scheme=scheme, auth=auth, **kwargs)
     connection = get_connection(host, port, auth_type, scheme, auth)
     _CLIENT_HANDLE = ClientHandle(connection)
     _CLIENT_HANDLE._connect()
@@ -74,4 +200,35 @@ def get_api_client():
     username = config["SERVER"].get("pc_username")
     password = config["SERVER"].get("pc_password")
 
-    return get_client_handle(pc_ip, pc_port, auth=(username, password))
+    return get_client_handle(
+        pc_ip, pc_port, auth=(username, password), **get_connection_options(config)
+    )
+
+
+def get_connection_options(config):
+    """Returns the connection kwargs set in [CONNECTION] section of config"""
+
+    options = {}
+    if "CONNECTION" not in config:
+        return options
+
+    section = config["CONNECTION"]
+    for option, getter in CONNECTION_CONFIG_OPTIONS.items():
+        if option in section:
+            options[option] = getattr(section, getter)(option)
+
+    return options
+
+
+def get_async_api_client(max_concurrency=None):
+    """Returns the asyncio client handle. It shares the pooled connection of
+    the api client returned by `get_api_client`.
+
+    Args:
+        max_concurrency (int): The maximum number of requests in flight
+    """
+
+    client = get_api_client()
+    handle = AsyncClientHandle(client.connection, max_concurrency=max_concurrency)
+    handle._connect()
+    return handle
@@ -0,0 +1,327 @@
+"""
+instrumentation: Timing of the http requests made to calm
+
+Every request made by a `Connection` produces a trace (dict) with its
+endpoint template (uuids collapsed), attempt (number of earlier attempts, if
+retried), status, body sizes and the durations (in seconds) of its phases:
+
+    dns:      resolving the host name (not done for ip addresses)
+    connect:  establishing the tcp connection
+    tls:      tls handshake
+    send:     writing the request
+    server:   waiting for the response headers
+    transfer: reading the response body
+    total:    the whole call, including client side processing
+
+Connection setup phases are zero for requests made on a pooled connection.
+Traces are handed to the hooks registered with `register_hook`. Phases are
+timed only by connections created while hooks are registered (the other
+ones use the stock adapter of requests).
+
+Example:
+
+profiler = Profiler()
+register_hook(profiler.add)
+...
+for row in profiler.summary():
+    print(row)
+
+"""
+
+import ipaddress
+import json
+import math
+import re
+import socket
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+from calm.dsl.tools import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+UUID_REGEX = re.compile(
+    r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+)
+
+PHASES = ["dns", "connect", "tls", "send", "server", "transfer"]
+
+_HOOKS = []
+_LOCAL = threading.local()
+
+
+def register_hook(hook):
+    """Registers the callable, called with the trace of every request"""
+
+    _HOOKS.append(hook)
+
+
+def unregister_hook(hook):
+    _HOOKS.remove(hook)
+
+
+def is_tracing_enabled():
+    """Returns True if hooks are registered to receive traces"""
+
+    return bool(_HOOKS)
+
+
+def get_endpoint_template(endpoint):
+    """Returns the endpoint with uuids (and query) replaced by placeholders
+    Ex: api/nutanix/v3/apps/<uuid>/actions/<uuid>/run
+    """
+
+    endpoint = endpoint.split("?", 1)[0]
+    return UUID_REGEX.sub("<uuid>", endpoint)
+
+
+def start_trace(method, endpoint, attempt=0):
+    """Starts the trace of a request made by the current thread. attempt is
+    the number of earlier attempts (retries) of the request."""
+
+    trace = {
+        "start_time": time.time(),
+        "method": method.upper(),
+        "endpoint": get_endpoint_template(endpoint),
+        "attempt": attempt,
+        "status": None,
+        "request_bytes": 0,
+        "response_bytes": 0,
+    }
+    trace.update({phase: 0.0 for phase in PHASES})
+    trace["_start"] = time.perf_counter()
+    _LOCAL.trace = trace
+    return trace
+
+
+def end_trace(trace, status=None, request_bytes=0, response_bytes=0):
+    """Completes the trace and hands it to registered hooks"""
+
+    if getattr(_LOCAL, "trace", None) is trace:
+        _LOCAL.trace = None
+
+    end = time.perf_counter()
+    headers_time = trace.pop("_headers", None)
+    if headers_time is not None:
+        trace["transfer"] = end - headers_time
+    trace["total"] = end - trace.pop("_start")
+    trace["status"] = status
+    trace["request_bytes"] = request_bytes
+    trace["response_bytes"] = response_bytes
+
+    for hook in list(_HOOKS):
+        try:
+            hook(trace)
+        except Exception as exc:
+            LOG.debug("Request hook {} failed: {}".format(hook, exc))
+
+    return trace
+
+
+def _add_time(phase, duration):
+    trace = getattr(_LOCAL, "trace", None)
+    if trace is not None:
+        trace[phase] += duration
+
+
+class _TimedConnectionMixin:
+    """Records the phases of requests made on the connection in the trace
+    of the current thread.
+    """
+
+    is_tls = False
+
+    def _resolve(self):
+        """Returns the addresses of host (None if it is an ip address, or
+        cannot be resolved), timing the resolution"""
+
+        host = self._dns_host.strip("[]")
+        try:
+            ipaddress.ip_address(host)
+            return None
+        except ValueError:
+            pass
+
+        start = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(
+                host, self.port, allowed_gai_family(), socket.SOCK_STREAM
+            )
+        except socket.gaierror:
+            return None
+        finally:
+            _add_time("dns", time.perf_counter() - start)
+
+        addresses = []
+        for info in infos:
+            if info[4][0] not in addresses:
+                addresses.append(info[4][0])
+        return addresses
+
+    def _new_conn(self):
+        # Host is resolved once here, and the connection is made to the
+        # resolved addresses (in order), so that it is not resolved again
+        addresses = self._resolve()
+
+        start = time.perf_counter()
+        try:
+            if not addresses:
+                return super()._new_conn()
+
+            dns_host = self._dns_host
+            try:
+                for address in addresses:
+                    self._dns_host = address
+                    try:
+                        return super()._new_conn()
+                    except (NewConnectionError, ConnectTimeoutError) as exc:
+                        if address == addresses[-1]:
+                            raise
+                        LOG.debug("Cannot connect to {}: {}".format(address, exc))
+            finally:
+                self._dns_host = dns_host
+
+        finally:
+            _add_time("connect", time.perf_counter() - start)
+
+    def _setup_time(self):
+        trace = getattr(_LOCAL, "trace", None) or {}
+        return sum(trace.get(phase, 0.0) for phase in ["dns", "connect", "tls"])
+
+    def connect(self):
+        if not self.is_tls:
+            return super().connect()
+
+        # tls time is the part of connect beyond the tcp connection
+        start = time.perf_counter()
+        setup_time = self._setup_time()
+        super().connect()
+        elapsed = time.perf_counter() - start
+        _add_time("tls", elapsed - (self._setup_time() - setup_time))
+
+    def request(self, *args, **kwargs):
+        start = time.perf_counter()
+        setup_time = self._setup_time()
+        super().request(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        _add_time("send", elapsed - (self._setup_time() - setup_time))
+
+    def request_chunked(self, *args, **kwargs):
+        start = time.perf_counter()
+        setup_time = self._setup_time()
+        super().request_chunked(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        _add_time("send", elapsed - (self._setup_time() - setup_time))
+
+    def getresponse(self, *args, **kwargs):
+        start = time.perf_counter()
+        res = super().getresponse(*args, **kwargs)
+        _add_time("server", time.perf_counter() - start)
+
+        trace = getattr(_LOCAL, "trace", None)
+        if trace is not None:
+            trace["_headers"] = time.perf_counter()
+        return res
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    is_tls = True
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """Adapter whose pooled connections record the request phases"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+def _percentile(values, percent):
+    """Returns the nearest rank percentile of sorted values"""
+
+    rank = max(int(math.ceil(percent / 100.0 * len(values))), 1)
+    return values[rank - 1]
+
+
+class Profiler:
+    def __init__(self, dump_file=None):
+        """Collects the traces of requests
+
+        Args:
+            dump_file (str): file to which traces are written as
+                             newline delimited json
+        """
+        self.traces = []
+        self.dump_file = dump_file
+        self._lock = threading.Lock()
+
+    def add(self, trace):
+        with self._lock:
+            self.traces.append(trace)
+
+    def summary(self):
+        """Returns the summary rows of traces, grouped by endpoint template
+
+        Returns:
+            (list of dict): method, endpoint, count, errors, retries
+                (requests that were retries), p50, p95, max (of total
+                duration) and server (total server time), slowest endpoints
+                first
+        """
+
+        groups = {}
+        with self._lock:
+            for trace in self.traces:
+                key = (trace["method"], trace["endpoint"])
+                groups.setdefault(key, []).append(trace)
+
+        rows = []
+        for (method, endpoint), traces in groups.items():
+            durations = sorted(trace["total"] for trace in traces)
+            rows.append(
+                {
+                    "method": method,
+                    "endpoint": endpoint,
+                    "count": len(traces),
+                    "errors": len(
+                        [t for t in traces if not t["status"] or t["status"] >= 400]
+                    ),
+                    "retries": len([t for t in traces if t.get("attempt", 0)]),
+                    "p50": _percentile(durations, 50),
+                    "p95": _percentile(durations, 95),
+                    "max": durations[-1],
+                    "total": sum(durations),
+                    "server": sum(trace["server"] for trace in traces),
+                }
+            )
+
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+    def dump(self, dump_file=None):
+        """Writes the traces to dump_file as newline delimited json"""
+
+        dump_file = dump_file or self.dump_file
+        with self._lock, open(dump_file, "w") as fd:
+            for trace in self.traces:
+                fd.write(json.dumps(trace) + "\n")
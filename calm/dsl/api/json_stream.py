@@ -0,0 +1,150 @@
+"""
+json_stream: Incremental decoding of list responses
+
+Decodes the items of an array member (`entities` by default) of a json
+object received in chunks, yielding them one at a time. Only the item being
+decoded is buffered, so memory stays flat irrespective of the response size.
+Other top level members (Ex: metadata) are collected in `fields`.
+
+Example:
+
+res, err = connection._call(endpoint, request_json=payload, stream=True)
+stream = JSONItemStream(res.iter_content(chunk_size=65536), key="entities")
+for entity in stream:
+    ...
+total_matches = stream.fields["metadata"]["total_matches"]
+
+"""
+
+import codecs
+import json
+
+WHITESPACE = " \t\n\r"
+DELIMITERS = WHITESPACE + ",:]}"
+
+
+class JSONItemStream:
+    def __init__(self, chunks, key="entities", on_close=None):
+        """Item stream
+
+        Args:
+            chunks (iterable): bytes (or str) chunks of the json document
+            key (str): top level member whose items are yielded
+            on_close (callable): called once the stream is exhausted/closed
+        """
+        self.key = key
+        self.fields = {}
+        self._chunks = iter(chunks)
+        self._on_close = on_close
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """Reads next chunk into buffer, returns False at end of stream"""
+
+        if self._eof:
+            return False
+
+        # Drop the consumed part of buffer
+        pos = self._pos
+        self._buf = self._buf[pos:]
+        self._pos = 0
+
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._eof = True
+            self._buf += self._utf8.decode(b"", final=True)
+            return False
+
+        if isinstance(chunk, bytes):
+            chunk = self._utf8.decode(chunk)
+        self._buf += chunk
+        return True
+
+    def _peek(self):
+        """Returns next non whitespace character ('' at end of stream)"""
+
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in WHITESPACE:
+                self._pos += 1
+
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars):
+        char = self._peek()
+        if not char or char not in chars:
+            raise ValueError(
+                "Expected '{}' at offset {}, found '{}'".format(chars, self._pos, char)
+            )
+        self._pos += 1
+        return char
+
+    def _decode(self):
+        """Decodes the next json value, reading more chunks if required"""
+
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+
+                # A number is complete only if followed by a delimiter
+                if (
+                    self._eof
+                    or not isinstance(value, (int, float))
+                    or isinstance(value, bool)
+                    or (end < len(self._buf) and self._buf[end] in DELIMITERS)
+                ):
+                    self._pos = end
+                    return value
+
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+
+            # Read at least as much as buffered to keep decoding linear
+            pending = len(self._buf) - self._pos
+            while len(self._buf) - self._pos < 2 * pending and self._fill():
+                pass
+
+    def __iter__(self):
+        try:
+            self._expect("{")
+            if self._peek() == "}":
+                return
+
+            while True:
+                name = self._decode()
+                self._expect(":")
+
+                if name == self.key and self._peek() == "[":
+                    self._pos += 1
+                    if self._peek() != "]":
+                        while True:
+                            yield self._decode()
+                            if self._expect(",]") == "]":
+                                break
+                    else:
+                        self._pos += 1
+                    self.fields[name] = None
+
+                else:
+                    self.fields[name] = self._decode()
+
+                if self._expect(",}") == "}":
+                    break
+
+        finally:
+            self.close()
+
+    def close(self):
+        if self._on_close:
+            self._on_close()
+            self._on_close = None
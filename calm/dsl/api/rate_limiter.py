@@ -0,0 +1,239 @@
+"""
+rate_limiter: Client side rate limiting of requests made to calm
+
+Requests are admitted by token buckets (one for all requests and one per
+endpoint class: read, write and delete) and a bound on the requests in
+flight. When the server asks to back off (`429`/`503`, with `Retry-After`),
+the buckets involved are paused for the given time and their rate is
+halved, recovering gradually with successful requests.
+
+Example:
+
+limiter = RateLimiter(rate=20, max_in_flight=10, budgets={"write": 5})
+with limiter.limit(method, endpoint) as endpoint_class:
+    res = session.post(...)
+limiter.update(endpoint_class, res)
+
+"""
+
+import contextlib
+import datetime
+import email.utils
+import threading
+import time
+
+from calm.dsl.tools import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+ENDPOINT_CLASSES = ["read", "write", "delete"]
+
+# Backoff used when server throttles without Retry-After
+DEFAULT_RETRY_AFTER = 1.0
+
+# Share of the configured rate restored by every successful request
+RECOVERY_FACTOR = 0.05
+
+
+def is_read_request(method, endpoint):
+    """Returns True for requests that only read from server: GETs, and list
+    and groups queries (made by POST)"""
+
+    method = method.lower()
+    if method == "get":
+        return True
+
+    endpoint = endpoint.split("?", 1)[0]
+    return method == "post" and (
+        endpoint.endswith("/list") or endpoint.endswith("/groups")
+    )
+
+
+def get_endpoint_class(method, endpoint):
+    """Returns the class (read, write or delete) of request"""
+
+    if is_read_request(method, endpoint):
+        return "read"
+
+    if method.lower() == "delete":
+        return "delete"
+
+    return "write"
+
+
+def get_retry_after(res):
+    """Returns the seconds to back off given by response, None if the
+    response is not a throttling one"""
+
+    if res is None or res.status_code not in [429, 503]:
+        return None
+
+    retry_after = res.headers.get("Retry-After", None)
+    if not retry_after:
+        return DEFAULT_RETRY_AFTER
+
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_time = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+    now = datetime.datetime.now(retry_time.tzinfo)
+    return max((retry_time - now).total_seconds(), 0.0)
+
+
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        """Token bucket
+
+        Args:
+            rate (float): tokens added per second
+            burst (int): capacity of bucket (default: rate, at least 1)
+        """
+        self.max_rate = float(rate)
+        self.rate = self.max_rate
+        self.burst = float(burst or max(rate, 1))
+        self._tokens = self.burst
+        self._last_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._last_time) * self.rate
+        )
+        self._last_time = now
+
+    def acquire(self):
+        """Takes a token, waiting till one is available"""
+
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+    def slow_down(self):
+        """Halves the rate and drops the accumulated tokens"""
+
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = 0.0
+            self.rate = max(self.rate / 2, self.max_rate * RECOVERY_FACTOR)
+
+    def recover(self):
+        """Restores a part of the rate lost by backing off"""
+
+        if self.rate >= self.max_rate:
+            return
+
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_FACTOR)
+
+
+class RateLimiter:
+    def __init__(self, rate=0, burst=None, max_in_flight=0, budgets=None):
+        """Rate limiter. Requests are held back on throttling responses even
+        if no limits are given.
+
+        Args:
+            rate (float): maximum requests per second (0 for no limit)
+            burst (int): requests that may be made at once after being idle
+            max_in_flight (int): maximum requests in flight (0 for no limit)
+            budgets (dict): maximum requests per second of endpoint classes
+                            (Ex: {"read": 50, "write": 10, "delete": 5})
+        """
+        self.buckets = {}
+        if rate:
+            self.buckets[None] = TokenBucket(rate, burst)
+
+        for endpoint_class, class_rate in (budgets or {}).items():
+            if endpoint_class not in ENDPOINT_CLASSES:
+                raise ValueError(
+                    "Invalid endpoint class {}. Select from {}".format(
+                        endpoint_class, ENDPOINT_CLASSES
+                    )
+                )
+            if class_rate:
+                self.buckets[endpoint_class] = TokenBucket(class_rate, burst)
+
+        self._semaphore = None
+        if max_in_flight:
+            self._semaphore = threading.BoundedSemaphore(int(max_in_flight))
+
+        # Time (monotonic) till which requests of endpoint classes are held
+        self._paused_until = {}
+        self._lock = threading.Lock()
+
+    def _wait_pause(self, endpoint_class):
+        while True:
+            with self._lock:
+                wait = self._paused_until.get(endpoint_class, 0) - time.monotonic()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def _get_buckets(self, endpoint_class):
+        return [
+            bucket
+            for key, bucket in self.buckets.items()
+            if key is None or key == endpoint_class
+        ]
+
+    @contextlib.contextmanager
+    def limit(self, method, endpoint):
+        """Context in which the request is made. Waits till the request is
+        admitted and yields its endpoint class."""
+
+        endpoint_class = get_endpoint_class(method, endpoint)
+        start = time.monotonic()
+        self._wait_pause(endpoint_class)
+        for bucket in self._get_buckets(endpoint_class):
+            bucket.acquire()
+
+        if self._semaphore:
+            self._semaphore.acquire()
+
+        wait = time.monotonic() - start
+        if wait > 0.1:
+            LOG.debug(
+                "Request to '{}' was held back for {:.2f}s".format(endpoint, wait)
+            )
+
+        try:
+            yield endpoint_class
+        finally:
+            if self._semaphore:
+                self._semaphore.release()
+
+    def update(self, endpoint_class, res):
+        """Adapts the rate to the response of a request"""
+
+        retry_after = get_retry_after(res)
+        buckets = self._get_buckets(endpoint_class)
+        if retry_after is None:
+            for bucket in buckets:
+                bucket.recover()
+            return
+
+        LOG.warning(
+            "Server is throttling {} requests, backing off for {:.2f}s".format(
+                endpoint_class, retry_after
+            )
+        )
+        with self._lock:
+            self._paused_until[endpoint_class] = max(
+                self._paused_until.get(endpoint_class, 0),
+                time.monotonic() + retry_after,
+            )
+        for bucket in buckets:
+            bucket.slow_down()
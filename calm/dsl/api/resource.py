@@ -1,10 +1,32 @@
+import base64
+import hashlib
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.exceptions import RequestException
+
 from .connection import REQUEST
+from .json_stream import JSONItemStream
 
 
 class ResourceAPI:
 
     ROOT = "api/nutanix/v3"
 
+    # Number of entities fetched per list call while walking pages
+    PAGE_SIZE = 250
+
+    # Number of pages fetched in parallel while walking pages
+    PAGE_WORKERS = 4
+
+    # Size of chunks read from socket while decoding streamed responses
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    # Size of chunks written to disk while downloading files
+    DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
     def __init__(self, connection, resource_type):
         self.connection = connection
         self.PREFIX = ResourceAPI.ROOT + "/" + resource_type
@@ -38,21 +60,291 @@ class ResourceAPI:
             self.LIST, verify=False, request_json=params, method=REQUEST.METHOD.POST
         )
 
-    def get_name_uuid_map(self, params=None):
-        response, err = self.list(params)
+    def _download(self, url, file_name, resume=False, progress=None):
+        """Streams the response body of url to file_name in chunks, so the
+        memory used is independent of the file size.
+
+        Args:
+            url (str): download endpoint
+            file_name (str): destination file
+            resume (bool): continue the partial download present in file_name
+                           using a range request
+            progress (callable): called with (bytes downloaded, total bytes)
+                                 after every chunk. total is None if unknown.
+        Returns:
+            (tuple (requests.Response, dict)): Response, error. Response has
+                the sha256 hex digest of the downloaded file as `checksum`.
+        """
+
+        sha256 = hashlib.sha256()
+        offset = 0
+        if resume and os.path.isfile(file_name):
+            with open(file_name, "rb") as fd:
+                for chunk in iter(lambda: fd.read(self.DOWNLOAD_CHUNK_SIZE), b""):
+                    sha256.update(chunk)
+                    offset += len(chunk)
+
+        # Range is asked of the unencoded file, as offset counts its bytes
+        headers = None
+        if offset:
+            headers = {
+                "Range": "bytes={}-".format(offset),
+                "Accept-Encoding": "identity",
+            }
+        res, err = self.connection._call(
+            url, verify=False, method=REQUEST.METHOD.GET, headers=headers, stream=True
+        )
+        if err:
+            return res, err
+
+        # Server ignored the range, so download the whole file again
+        if res.status_code != 206:
+            sha256 = hashlib.sha256()
+            offset = 0
+
+        else:
+            content_range = res.headers.get("Content-Range", "")
+            match = re.match(r"bytes (\d+)-", content_range)
+            if not match or int(match.group(1)) != offset:
+                res.close()
+                return (
+                    res,
+                    {
+                        "code": res.status_code,
+                        "error": "Invalid range '{}' of {}, expected bytes from {}".format(
+                            content_range, file_name, offset
+                        ),
+                    },
+                )
+
+        # Content-Length counts the encoded (Ex: gzip) bytes, so size of the
+        # decoded file is not known in advance
+        length = res.headers.get("Content-Length", None)
+        length = int(length) if length is not None else None
+        encoded = res.headers.get("Content-Encoding", "identity") != "identity"
+        total = offset + length if length is not None and not encoded else None
+
+        downloaded = offset
+        try:
+            with open(file_name, "ab" if offset else "wb") as fd:
+                for chunk in res.iter_content(chunk_size=self.DOWNLOAD_CHUNK_SIZE):
+                    fd.write(chunk)
+                    sha256.update(chunk)
+                    downloaded += len(chunk)
+                    if progress:
+                        progress(downloaded, total)
+
+            # Bytes read from socket, before decoding
+            received = res.raw.tell()
+        except RequestException as exc:
+            return (
+                res,
+                {
+                    "code": res.status_code,
+                    "error": "Download of {} failed after {} bytes: {}".format(
+                        file_name, downloaded, exc
+                    ),
+                },
+            )
+        finally:
+            res.close()
+
+        if length is not None and received != length:
+            return (
+                res,
+                {
+                    "code": res.status_code,
+                    "error": "Incomplete download of {}: received {} of {} bytes".format(
+                        file_name, received, length
+                    ),
+                },
+            )
+
+        res.checksum = sha256.hexdigest()
+
+        # Verify the instance digest (RFC 3230) if sent by server
+        for digest in res.headers.get("Digest", "").split(","):
+            algorithm, _, value = digest.strip().partition("=")
+            if algorithm.lower() != "sha-256":
+                continue
+
+            if base64.b64decode(value) != sha256.digest():
+                return (
+                    res,
+                    {
+                        "code": res.status_code,
+                        "error": "Checksum mismatch of {}".format(file_name),
+                    },
+                )
+
+        return res, None
+
+    def list_stream(self, params=None):
+        """List call whose entities are decoded lazily from the socket
+
+        Returns:
+            (tuple (JSONItemStream, dict)): stream of entities, error. Other
+                members of the response (Ex: metadata) are available in
+                `stream.fields` once the stream is exhausted.
+        """
+
+        res, err = self.connection._call(
+            self.LIST,
+            verify=False,
+            request_json=params,
+            method=REQUEST.METHOD.POST,
+            stream=True,
+        )
+        if err:
+            return None, err
+
+        stream = JSONItemStream(
+            res.iter_content(chunk_size=self.STREAM_CHUNK_SIZE),
+            key="entities",
+            on_close=res.close,
+        )
+        return stream, None
+
+    def _list_page(self, payload, offset, length, stream=False):
+        """Returns the entities and total_matches of a single list page.
+        If stream is set, entities are decoded lazily and total_matches is
+        returned as a callable.
+        """
 
-        if not err:
-            response = response.json()
+        payload = dict(payload, offset=offset, length=length)
+        if stream:
+            entities, err = self.list_stream(payload)
         else:
+            res, err = self.list(payload)
+        if err:
             raise Exception("[{}] - {}".format(err["code"], err["error"]))
 
-        total_matches = response["metadata"]["total_matches"]
-        if total_matches == 0:
-            return {}
+        if stream:
+            return (
+                entities,
+                lambda: entities.fields.get("metadata", {}).get("total_matches"),
+            )
+
+        response = res.json()
+        entities = response.get("entities", None) or []
+        total_matches = response.get("metadata", {}).get("total_matches", None)
+        return entities, total_matches
+
+    def iter_entities(
+        self,
+        params=None,
+        filter=None,
+        page_size=None,
+        offset=0,
+        limit=None,
+        workers=None,
+        stream=False,
+    ):
+        """Yields the entities of list api one at a time, walking the pages
+        using `metadata.total_matches`.
+
+        Once the first page reports total_matches, remaining pages are
+        fetched concurrently by `workers` threads and yielded in order.
+        At most `workers` pages are held in memory. With `stream`, pages are
+        fetched serially and entities are decoded lazily from the socket, so
+        memory stays flat irrespective of the page size.
+
+        Args:
+            params (dict): list payload (filter, sort_attribute etc.)
+            filter (str): filter query (overrides the one present in params)
+            page_size (int): number of entities fetched per list call
+            offset (int): offset of the first entity
+            limit (int): maximum number of entities yielded (default: all)
+            workers (int): number of pages fetched in parallel
+            stream (bool): decode entities lazily from the response stream
+        Returns:
+            (generator): entities
+        Raises:
+            Exception: If list call fails
+        """
+
+        payload = dict(params or {})
+        if filter:
+            payload["filter"] = filter
+
+        page_size = int(page_size or self.PAGE_SIZE)
+        workers = 1 if stream else int(workers or self.PAGE_WORKERS)
+        offset = int(offset or 0)
+        end = None if limit is None else offset + int(limit)
+
+        def get_length(page_offset):
+            return page_size if end is None else min(page_size, end - page_offset)
+
+        def fetch_page(page_offset):
+            return self._list_page(
+                payload, page_offset, get_length(page_offset), stream=stream
+            )
+
+        if end is not None and end <= offset:
+            return
+
+        length = get_length(offset)
+        entities, total_matches = fetch_page(offset)
+        count = 0
+        for entity in entities:
+            count += 1
+            yield entity
+        offset += count
+
+        if stream:
+            total_matches = total_matches()
+
+        if total_matches is None:
+            # Api doesn't report total matches, walk till the partial page
+            while count == length and (end is None or offset < end):
+                length = get_length(offset)
+                entities, _ = fetch_page(offset)
+                count = 0
+                for entity in entities:
+                    count += 1
+                    yield entity
+                offset += count
+            return
+
+        # Server may cap the page length below the requested one
+        if 0 < count < length:
+            page_size = count
+
+        end = total_matches if end is None else min(end, total_matches)
+        if not count or offset >= end:
+            return
+
+        page_offsets = range(offset, end, page_size)
+        if workers <= 1 or len(page_offsets) == 1:
+            for page_offset in page_offsets:
+                entities, _ = fetch_page(page_offset)
+                for entity in entities:
+                    yield entity
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for page_offset in page_offsets:
+                pending.append(executor.submit(fetch_page, page_offset))
+                if len(pending) < workers:
+                    continue
+
+                entities, _ = pending.popleft().result()
+                for entity in entities:
+                    yield entity
+
+            while pending:
+                entities, _ = pending.popleft().result()
+                for entity in entities:
+                    yield entity
+
+    def get_name_uuid_map(self, params=None, offset=0, limit=None, workers=None):
 
         name_uuid_map = {}
 
-        for entity in response["entities"]:
+        for entity in self.iter_entities(
+            params, offset=offset, limit=limit, workers=workers
+        ):
             entity_name = entity["status"]["name"]
             entity_uuid = entity["metadata"]["uuid"]
 
@@ -0,0 +1,159 @@
+"""
+response_cache: On-disk cache of GET responses, revalidated by conditional
+requests.
+
+Bodies are stored in the local DB alongside the entity cache. A cached body
+is revalidated with `If-None-Match` using the ETag sent by the server or,
+when the server sends none, the `metadata.spec_version` of the entity. On a
+`304 Not Modified` the stored body is served instead of downloading it again.
+Least recently used bodies are evicted once the cache grows beyond its size.
+"""
+
+import datetime
+import hashlib
+import json
+
+import peewee
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from calm.dsl.db import get_db_handle
+from calm.dsl.tools import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+# Response headers persisted along with the body
+STORED_HEADERS = ["Content-Type", "ETag"]
+
+
+class ResponseCache:
+    def __init__(self, max_size=100 * 1024 * 1024, scope=""):
+        """Response cache
+
+        Args:
+            max_size (int): maximum size (in bytes) of the cached bodies
+            scope (str): namespace of the cache keys (Ex: username)
+        """
+        self.max_size = int(max_size)
+        self.scope = scope
+
+    def _get_key(self, url, params=None):
+        key = json.dumps([self.scope, url, params or {}], sort_keys=True)
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @staticmethod
+    def _get_validator(res):
+        """Returns the validator of response: ETag or entity spec_version"""
+
+        etag = res.headers.get("ETag", None)
+        if etag:
+            return etag
+
+        try:
+            metadata = res.json().get("metadata", {})
+        except (ValueError, AttributeError):
+            return None
+
+        spec_version = metadata.get("spec_version", None)
+        if spec_version is None:
+            return None
+
+        return 'W/"{}"'.format(spec_version)
+
+    def lookup(self, url, params=None):
+        """Returns the cached entry of the request, None if not present"""
+
+        db = get_db_handle()
+        try:
+            return db.response_cache_table.get(
+                db.response_cache_table.key == self._get_key(url, params)
+            )
+
+        except peewee.DoesNotExist:
+            return None
+
+    @staticmethod
+    def get_conditional_headers(entry):
+        """Returns the headers to revalidate the cached entry"""
+
+        return {"If-None-Match": entry.validator}
+
+    def load(self, entry, res):
+        """Returns the response built from cached entry for the `304`
+        response `res` of revalidation request.
+        """
+
+        db = get_db_handle()
+        query = db.response_cache_table.update(
+            last_access_time=datetime.datetime.now()
+        ).where(db.response_cache_table.key == entry.key)
+        query.execute()
+
+        cached_res = Response()
+        cached_res.status_code = 200
+        cached_res.reason = "OK"
+        cached_res.url = res.url
+        cached_res.request = res.request
+        cached_res.elapsed = res.elapsed
+        cached_res.encoding = "utf-8"
+        cached_res.headers = CaseInsensitiveDict(json.loads(bytes(entry.headers)))
+        cached_res._content = bytes(entry.content)
+        cached_res.from_cache = True
+
+        LOG.debug("Serving cached response of {}".format(entry.url))
+        return cached_res
+
+    def store(self, url, params, res):
+        """Stores the successful response if it can be revalidated"""
+
+        if res.status_code != 200:
+            return
+
+        validator = self._get_validator(res)
+        if not validator:
+            return
+
+        content = res.content
+        if len(content) > self.max_size:
+            return
+
+        headers = {
+            name: res.headers[name] for name in STORED_HEADERS if name in res.headers
+        }
+
+        db = get_db_handle()
+        db.response_cache_table.replace(
+            key=self._get_key(url, params),
+            url=url,
+            validator=validator,
+            headers=json.dumps(headers).encode(),
+            content=content,
+            size=len(content),
+            last_access_time=datetime.datetime.now(),
+        ).execute()
+
+        self.evict()
+
+    def evict(self):
+        """Evicts the least recently used entries to honour max_size"""
+
+        db = get_db_handle()
+        table = db.response_cache_table
+        total_size = table.select(peewee.fn.SUM(table.size)).scalar() or 0
+        if total_size <= self.max_size:
+            return
+
+        for entry in table.select(table.key, table.size).order_by(
+            table.last_access_time
+        ):
+            table.delete().where(table.key == entry.key).execute()
+            total_size -= entry.size
+            if total_size <= self.max_size:
+                break
+
+    @classmethod
+    def clear(cls):
+        """Deletes all the cached responses"""
+
+        db = get_db_handle()
+        db.response_cache_table.delete().execute()
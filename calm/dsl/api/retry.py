@@ -0,0 +1,72 @@
+"""
+retry: Retries of requests failing transiently
+
+Only reads (GET, list and groups calls) are retried. Mutations are not,
+as the server may have applied them before failing (Ex: an update retried
+after a timeout fails with 409 due to the changed `spec_version`).
+
+Reads are retried on connection errors (Ex: connection reset by server) and
+`429`/`502`/`503`/`504` responses, after an exponential backoff with full
+jitter (at least the `Retry-After` given by server). No retry is made if it
+would start after the deadline (see `timeouts`).
+
+Example:
+
+policy = RetryPolicy(max_retries=3, backoff=0.5)
+if policy.is_retryable(method, endpoint, res, exc):
+    time.sleep(policy.get_delay(attempt, res))
+
+"""
+
+import random
+
+from requests.exceptions import ConnectionError
+
+from .rate_limiter import get_retry_after, is_read_request
+from .timeouts import get_time_left
+
+RETRY_STATUS_CODES = [429, 502, 503, 504]
+
+
+class RetryPolicy:
+    def __init__(self, max_retries=3, backoff=0.5, max_backoff=30.0):
+        """Retry policy
+
+        Args:
+            max_retries (int): maximum retries of a request (0: no retries)
+            backoff (float): base of the exponential backoff (seconds)
+            max_backoff (float): maximum backoff (seconds)
+        """
+        self.max_retries = int(max_retries or 0)
+        self.backoff = float(backoff)
+        self.max_backoff = float(max_backoff)
+
+    def is_retryable(self, method, endpoint, res=None, exc=None):
+        """Returns True if the failed request (response res, or exception exc
+        if no response was received) can be retried"""
+
+        if not is_read_request(method, endpoint):
+            return False
+
+        if res is not None:
+            return res.status_code in RETRY_STATUS_CODES
+
+        return isinstance(exc, ConnectionError)
+
+    def get_delay(self, attempt, res=None):
+        """Returns the seconds to wait before retry of given attempt (0 for
+        the first attempt), None if no retry can be made"""
+
+        if attempt >= self.max_retries:
+            return None
+
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        retry_after = get_retry_after(res)
+        if retry_after is not None and res.headers.get("Retry-After", None):
+            delay = max(delay, retry_after)
+
+        time_left = get_time_left()
+        if time_left is not None and delay >= time_left:
+            return None
+
+        return delay
@@ -0,0 +1,74 @@
+"""
+session_store: Persists the authenticated server session in local DB
+
+The session cookies (Ex: the JWT sent by server in `NTNX_IGW_SESSION`) are
+stored encrypted with the password of the user, so that later invocations of
+the client reuse the session instead of authenticating again.
+"""
+
+import datetime
+import hashlib
+import json
+
+import peewee
+
+from calm.dsl.crypto import Crypto
+from calm.dsl.db import get_db_handle
+from calm.dsl.tools import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+
+class SessionStore:
+    def __init__(self, scope, pass_phrase):
+        """Session store
+
+        Args:
+            scope (str): identity of the session (Ex: url and username)
+            pass_phrase (str): pass phrase used to encrypt the session
+        """
+        self.key = hashlib.sha256(scope.encode()).hexdigest()
+        self.pass_phrase = pass_phrase.encode()
+
+    def load(self):
+        """Returns the stored cookies of session, None if not present"""
+
+        db = get_db_handle()
+        try:
+            entry = db.session_table.get(db.session_table.key == self.key)
+        except peewee.DoesNotExist:
+            return None
+
+        try:
+            cookies = Crypto.decrypt_AES_GCM(entry.generate_enc_msg(), self.pass_phrase)
+        except ValueError:
+            # Password has changed since the session was stored
+            LOG.debug("Discarding the stored session")
+            self.delete()
+            return None
+
+        return json.loads(cookies)
+
+    def save(self, cookies):
+        """Stores the cookies (dict) of session"""
+
+        (kdf_salt, ciphertext, iv, auth_tag) = Crypto.encrypt_AES_GCM(
+            json.dumps(cookies), self.pass_phrase
+        )
+
+        db = get_db_handle()
+        db.session_table.replace(
+            key=self.key,
+            kdf_salt=kdf_salt,
+            ciphertext=ciphertext,
+            iv=iv,
+            auth_tag=auth_tag,
+            last_update_time=datetime.datetime.now(),
+        ).execute()
+        LOG.debug("Session stored in local DB")
+
+    def delete(self):
+        """Deletes the stored session"""
+
+        db = get_db_handle()
+        db.session_table.delete().where(db.session_table.key == self.key).execute()
@@ -0,0 +1,106 @@
+"""
+single_flight: Coalesces identical idempotent requests
+
+Concurrent callers of an identical request wait for the one in flight and
+share its result. A completed result is also shared with identical requests
+issued within `window` seconds, unless a mutation happened in between.
+"""
+
+import threading
+import time
+
+from calm.dsl.tools import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.done_time = None
+
+
+class SingleFlight:
+    def __init__(self, window=0):
+        """Single flight group
+
+        Args:
+            window (float): seconds for which a completed result is shared
+                            (0: only calls in flight are shared)
+        """
+        self.window = float(window)
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def _is_expired(self, flight, now):
+        return flight.done_time is not None and now - flight.done_time > self.window
+
+    def do(self, key, func):
+        """Returns the result of func, calling it only if no identical call
+        (same key) is in flight or completed within the window.
+
+        Args:
+            key (hashable): identity of the call
+            func (callable): function making the call
+        Returns:
+            result of func
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            for flight_key, flight in list(self._flights.items()):
+                if self._is_expired(flight, now):
+                    self._flights.pop(flight_key)
+
+            flight = self._flights.get(key, None)
+            is_leader = flight is None
+            if is_leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if not is_leader:
+            LOG.debug("Coalescing request with the identical one")
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            flight.done_time = time.monotonic()
+            if flight.error is not None or not self._is_shareable(flight.result):
+                self._pop(key, flight)
+            flight.event.set()
+
+        return flight.result
+
+    def _is_shareable(self, result):
+        """Only successful results are shared after completion"""
+
+        if self.window <= 0:
+            return False
+
+        # Connection calls return (response, error) tuple
+        if isinstance(result, tuple) and len(result) == 2 and result[1]:
+            return False
+
+        return True
+
+    def _pop(self, key, flight):
+        with self._lock:
+            if self._flights.get(key, None) is flight:
+                self._flights.pop(key)
+
+    def forget(self):
+        """Forgets the completed results (Ex: after a mutation)"""
+
+        with self._lock:
+            for flight_key, flight in list(self._flights.items()):
+                if flight.done_time is not None:
+                    self._flights.pop(flight_key)
@@ -0,0 +1,138 @@
+"""
+timeouts: Timeouts of the requests made to calm
+
+Every request is made with a connect and a read timeout (seconds waited for
+the connection, and between bytes of the response). Endpoints matching a
+pattern of `endpoint_timeouts` (Ex: blueprint uploads) use their own
+timeouts. A deadline bounds the time of a whole command: once it has
+passed, requests fail without being made, and the timeouts of requests are
+capped to the time left.
+
+Example:
+
+set_deadline(300)
+timeouts = EndpointTimeouts(10, 120, "*/import_file=600, */list=5:60")
+connect_timeout, read_timeout = timeouts.get("api/nutanix/v3/apps/list")
+
+"""
+
+import fnmatch
+import threading
+import time
+
+from .instrumentation import get_endpoint_template
+
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 120.0
+
+_deadline = None
+_lock = threading.Lock()
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def set_deadline(seconds):
+    """Sets the deadline of requests made by the process to seconds from
+    now. 0 or None removes the deadline."""
+
+    global _deadline
+
+    with _lock:
+        _deadline = time.monotonic() + float(seconds) if seconds else None
+
+
+def get_time_left():
+    """Returns the seconds left till deadline, None if no deadline is set"""
+
+    with _lock:
+        if _deadline is None:
+            return None
+        return _deadline - time.monotonic()
+
+
+def parse_endpoint_timeouts(value):
+    """Returns the endpoint timeouts given as string
+    Ex: "*/import_file=600, */list=5:60" (read timeout or connect:read)
+
+    Returns:
+        (dict): endpoint pattern to (connect timeout, read timeout), None
+            for the default timeout
+    """
+
+    endpoint_timeouts = {}
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+
+        pattern, sep, timeout = item.partition("=")
+        if not sep:
+            raise ValueError("Invalid endpoint timeout {}".format(item))
+
+        connect_timeout, _, read_timeout = timeout.strip().rpartition(":")
+        endpoint_timeouts[pattern.strip()] = (
+            float(connect_timeout) if connect_timeout else None,
+            float(read_timeout),
+        )
+
+    return endpoint_timeouts
+
+
+class EndpointTimeouts:
+    def __init__(
+        self,
+        connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+        read_timeout=DEFAULT_READ_TIMEOUT,
+        endpoint_timeouts=None,
+    ):
+        """Timeouts of endpoints
+
+        Args:
+            connect_timeout (float): default connect timeout (0: no timeout)
+            read_timeout (float): default read timeout (0: no timeout)
+            endpoint_timeouts (dict or str): timeouts of endpoints matching
+                patterns (see `parse_endpoint_timeouts`). First matching
+                pattern is used.
+        """
+        self.connect_timeout = float(connect_timeout or 0) or None
+        self.read_timeout = float(read_timeout or 0) or None
+        if isinstance(endpoint_timeouts, str):
+            endpoint_timeouts = parse_endpoint_timeouts(endpoint_timeouts)
+
+        self.endpoint_timeouts = {}
+        for pattern, timeout in (endpoint_timeouts or {}).items():
+            if not isinstance(timeout, (tuple, list)):
+                timeout = (None, timeout)
+            self.endpoint_timeouts[pattern] = tuple(timeout)
+
+    def get(self, endpoint):
+        """Returns (connect timeout, read timeout) of request to endpoint,
+        capped to the time left till deadline
+
+        Raises:
+            DeadlineExceeded: If deadline has passed
+        """
+
+        connect_timeout, read_timeout = self.connect_timeout, self.read_timeout
+        template = get_endpoint_template(endpoint)
+        for pattern, (pattern_connect, pattern_read) in self.endpoint_timeouts.items():
+            if fnmatch.fnmatch(template, pattern):
+                connect_timeout = pattern_connect or connect_timeout
+                read_timeout = pattern_read or read_timeout
+                break
+
+        time_left = get_time_left()
+        if time_left is None:
+            return connect_timeout, read_timeout
+
+        if time_left <= 0:
+            raise DeadlineExceeded(
+                "Deadline exceeded before request to '{}'".format(endpoint)
+            )
+
+        return (
+            min(connect_timeout or time_left, time_left),
+            min(read_timeout or time_left, time_left),
+        )
@@ -7,6 +7,7 @@ from types import MappingProxyType
 from ruamel.yaml import YAML, resolver, SafeRepresenter
 from calm.dsl.tools import StrictDraft7Validator
 from calm.dsl.tools import get_logging_handle
+from calm.dsl.tools import serializer
 from .schema import get_schema_details
 
 LOG = get_logging_handle(__name__)
@@ -316,12 +317,8 @@ class EntityType(EntityTypeBase):
 
     def json_dumps(cls, pprint=False, sort_keys=False):
 
-        dump = json.dumps(
-            cls,
-            cls=EntityJSONEncoder,
-            sort_keys=sort_keys,
-            indent=4 if pprint else None,
-            separators=(",", ": ") if pprint else (",", ":"),
+        dump = serializer.dumps(
+            cls, pprint=pprint, sort_keys=sort_keys, default=_entity_encoder.default
         )
 
         # Add newline for pretty print
@@ -361,7 +358,9 @@ class EntityType(EntityTypeBase):
         return ref(name, bases, attrs)
 
     def get_dict(cls):
-        return json.loads(cls.json_dumps())
+        return serializer.loads(
+            serializer.dumps_bytes(cls, default=_entity_encoder.default)
+        )
 
 
 class Entity(metaclass=EntityType):
@@ -377,6 +376,9 @@ class EntityJSONEncoder(JSONEncoder):
         return cls.compile()
 
 
+_entity_encoder = EntityJSONEncoder()
+
+
 class EntityJSONDecoder(JSONDecoder):
     def __init__(self, *args, **kwargs):
         super().__init__(object_hook=self.object_hook, *args, **kwargs)
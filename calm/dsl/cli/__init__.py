@@ -11,5 +11,6 @@ from .init_command import *  # NoQA
 from calm.dsl.api import get_api_client
 from .mpis_commands import *  # NoQA
 from .app_icon_commands import *  # NoQA
+from .daemon_commands import *  # NoQA
 
 __all__ = [main, get_api_client]
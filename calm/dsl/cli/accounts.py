@@ -3,23 +3,60 @@ import click
 import arrow
 from prettytable import PrettyTable
 
-from calm.dsl.api import get_resource_api, get_api_client
+from calm.dsl.api import get_resource_api, get_api_client, GroupsQuery
 from calm.dsl.config import get_config
 
-from .utils import get_name_query, get_states_filter, highlight_text
+from .utils import (
+    get_name_query,
+    get_states_filter,
+    highlight_text,
+    get_list_entities,
+    get_groups_filter,
+)
 from .constants import ACCOUNT
 from calm.dsl.tools import get_logging_handle
 
 LOG = get_logging_handle(__name__)
 
 
+# Attributes of accounts fetched by groups api for listing
+ACCOUNT_GROUP_ATTRIBUTES = [
+    "name",
+    "type",
+    "state",
+    "owner_username",
+    "_created_timestamp_usecs_",
+    "_last_updated_timestamp_usecs_",
+]
+
+# Groups api attributes of the keys of account list filter
+ACCOUNT_GROUP_FILTER_KEYS = {"name": "name", "state": "state", "type": "type"}
+
+
+def _get_account_from_group(row):
+    """Returns the account (as list api does) from groups api row"""
+
+    return {
+        "status": {
+            "name": row["name"],
+            "resources": {"type": row["type"], "state": row["state"]},
+        },
+        "metadata": {
+            "uuid": row["entity_id"],
+            "owner_reference": {"kind": "user", "name": row["owner_username"]},
+            "creation_time": row["_created_timestamp_usecs_"] or 0,
+            "last_update_time": row["_last_updated_timestamp_usecs_"] or 0,
+        },
+    }
+
+
 def get_accounts(obj, name, filter_by, limit, offset, quiet, all_items, account_type):
     """ Get the accounts, optionally filtered by a string """
 
     client = get_api_client()
     config = get_config()
 
-    params = {"length": limit, "offset": offset}
+    params = {}
     filter_query = ""
     if name:
         filter_query = get_name_query([name])
@@ -35,14 +72,32 @@ def get_accounts(obj, name, filter_by, limit, offset, quiet, all_items, account_
     if filter_query:
         params["filter"] = filter_query
 
-    res, err = client.account.list(params)
-
-    if err:
+    query = None
+    groups_filter = get_groups_filter(
+        filter_query,
+        ACCOUNT_GROUP_FILTER_KEYS,
+        state_key="state",
+        deleted_state=ACCOUNT.STATES.DELETED,
+    )
+    if groups_filter is not None:
+        query = GroupsQuery(
+            "account", ACCOUNT_GROUP_ATTRIBUTES, filter=groups_filter, offset=offset
+        )
+    try:
+        json_rows = get_list_entities(
+            client,
+            client.account,
+            params,
+            offset,
+            limit,
+            query=query,
+            to_entity=_get_account_from_group,
+        )
+    except Exception:
         pc_ip = config["SERVER"]["pc_ip"]
         LOG.warning("Cannot fetch accounts from {}".format(pc_ip))
         return
 
-    json_rows = res.json()["entities"]
     if not json_rows:
         click.echo(highlight_text("No account found !!!\n"))
         return
@@ -138,10 +138,17 @@ def _watch_app(obj, app_name, poll_interval):
     "--app", "app_name", "-a", required=True, help="App the action belongs to"
 )
 @click.option("--file", "file_name", "-f", help="How to name the downloaded file")
+@click.option(
+    "--resume",
+    "-r",
+    is_flag=True,
+    default=False,
+    help="Resume a partial download present in the file",
+)
 @click.pass_obj
-def _download_runlog(obj, runlog_uuid, app_name, file_name):
+def _download_runlog(obj, runlog_uuid, app_name, file_name, resume):
     """Download runlogs, given runlog uuid and app name"""
-    download_runlog(obj, runlog_uuid, app_name, file_name)
+    download_runlog(obj, runlog_uuid, app_name, file_name, resume=resume)
 
 
 @delete.command("app")
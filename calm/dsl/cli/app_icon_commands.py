@@ -1,7 +1,12 @@
 import click
 
 from .main import create, delete, get
-from .app_icons import create_app_icon, delete_app_icon, get_app_icon_list
+from .app_icons import (
+    create_app_icon,
+    create_app_icons_from_dir,
+    delete_app_icon,
+    get_app_icon_list,
+)
 
 
 @create.command("app_icon")
@@ -9,14 +14,28 @@ from .app_icons import create_app_icon, delete_app_icon, get_app_icon_list
     "--file",
     "-f",
     type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
-    required=True,
-    help="Path of Blueprint file to upload",
+    default=None,
+    help="Path of icon file to upload",
+)
+@click.option(
+    "--dir",
+    "-d",
+    "icon_dir",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, readable=True),
+    default=None,
+    help="Directory of icon files to upload (named after the files)",
 )
 @click.option("--name", "-n", default=None, help="icon name")
-def _create_app_icon(file, name):
-    """Creates a marketplace app icon"""
+def _create_app_icon(file, icon_dir, name):
+    """Creates a marketplace app icon (or icons from a directory)"""
+
+    if bool(file) == bool(icon_dir):
+        raise click.UsageError("Exactly one of --file and --dir is required")
 
-    create_app_icon(name, file)
+    if icon_dir:
+        create_app_icons_from_dir(icon_dir)
+    else:
+        create_app_icon(name, file)
 
 
 @delete.command("app_icon")
@@ -1,5 +1,7 @@
 import click
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from prettytable import PrettyTable
 
 from calm.dsl.api import get_api_client
@@ -8,12 +10,74 @@ from .utils import highlight_text, get_name_query
 
 LOG = get_logging_handle(__name__)
 
+ICON_FILE_EXTENSIONS = [".jpg", ".jpeg", ".png", ".gif", ".svg"]
+
 
 def create_app_icon(name, file):
     """creates app icon"""
 
     client = get_api_client()
-    client.app_icon.upload(name, file)
+    res, err = client.app_icon.upload(name, file)
+    if err:
+        LOG.error("[{}] - {}".format(err["code"], err["error"]))
+        sys.exit(-1)
+
+    LOG.info("App Icon {} created".format(name))
+
+
+def create_app_icons_from_dir(icon_dir):
+    """creates app icons from the image files in icon_dir concurrently,
+    icons are named after the files (without extension)"""
+
+    icon_files = {}
+    duplicate_names = set()
+    for file_name in sorted(os.listdir(icon_dir)):
+        file_path = os.path.join(icon_dir, file_name)
+        if not os.path.isfile(file_path):
+            continue
+
+        icon_name, ext = os.path.splitext(file_name)
+        if ext.lower() not in ICON_FILE_EXTENSIONS:
+            LOG.debug("Skipping {}, not an image file".format(file_path))
+            continue
+
+        if icon_name in icon_files:
+            duplicate_names.add(icon_name)
+        icon_files[icon_name] = file_path
+
+    if duplicate_names:
+        LOG.error(
+            "Multiple icon files named {} in {}".format(
+                sorted(duplicate_names), icon_dir
+            )
+        )
+        sys.exit(-1)
+
+    if not icon_files:
+        LOG.warning("No icon files found in {}".format(icon_dir))
+        return
+
+    client = get_api_client()
+    max_workers = min(len(icon_files), client.connection._pool_maxsize)
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="calm-upload"
+    ) as executor:
+        futures = {
+            executor.submit(client.app_icon.upload, icon_name, file_path): icon_name
+            for icon_name, file_path in icon_files.items()
+        }
+        failed = False
+        for future in as_completed(futures):
+            icon_name = futures[future]
+            res, err = future.result()
+            if err:
+                LOG.error("[{}] - {}".format(err["code"], err["error"]))
+                failed = True
+                continue
+            LOG.info("App Icon {} created".format(icon_name))
+
+    if failed:
+        sys.exit(-1)
 
 
 def delete_app_icon(icon_names):
@@ -22,24 +86,34 @@ def delete_app_icon(icon_names):
     client = get_api_client()
     app_icon_name_uuid_map = client.app_icon.get_name_uuid_map()
 
+    failed = False
     for icon_name in icon_names:
         app_icon_uuid = app_icon_name_uuid_map.get(icon_name, None)
         if not app_icon_uuid:
-            LOG.error("APP icon: {} not found")
+            LOG.error("APP icon: {} not found".format(icon_name))
             sys.exit(-1)
-        client.app_icon.delete(app_icon_uuid)
+        res, err = client.app_icon.delete(app_icon_uuid)
+        if err:
+            LOG.error("[{}] - {}".format(err["code"], err["error"]))
+            failed = True
+            continue
         LOG.info("App Icon {} deleted".format(icon_name))
 
+    if failed:
+        sys.exit(-1)
+
 
 def get_app_icon_list(name, limit, offset, quiet, marketplace_use=False):
     """Get list of app icons"""
 
     client = get_api_client()
-    params = {"length": limit, "offset": offset}
+    params = {}
     if name:
         params["filter"] = get_name_query([name])
 
-    app_icon_name_uuid_map = client.app_icon.get_name_uuid_map(params)
+    app_icon_name_uuid_map = client.app_icon.get_name_uuid_map(
+        params, offset=offset, limit=limit
+    )
     if quiet:
         for name in app_icon_name_uuid_map.keys():
             click.echo(highlight_text(name))
@@ -50,11 +124,26 @@ def get_app_icon_list(name, limit, offset, quiet, marketplace_use=False):
     if marketplace_use:
         field_names.append("IS_MARKETPLACE_ICON")
 
+    # Icons of same name are listed in separate rows
+    app_icons = []
+    for name, uuids in app_icon_name_uuid_map.items():
+        if not isinstance(uuids, list):
+            uuids = [uuids]
+        app_icons.extend((name, uuid) for uuid in uuids)
+
+    # Marketplace usage of icons is fetched concurrently
+    marketplace_checks = {}
+    if marketplace_use:
+        for _, uuid in app_icons:
+            marketplace_checks[uuid] = client.submit(
+                client.app_icon.is_marketplace_icon, uuid
+            )
+
     table.field_names = field_names
-    for name, uuid in app_icon_name_uuid_map.items():
+    for name, uuid in app_icons:
         data_row = [highlight_text(name), highlight_text(uuid)]
         if marketplace_use:
-            res, err = client.app_icon.is_marketplace_icon(uuid)
+            res, err = marketplace_checks[uuid].result()
             if err:
                 LOG.error("[{}] - {}".format(err["code"], err["error"]))
                 sys.exit(-1)
@@ -1,3 +1,4 @@
+import sys
 import time
 import json
 from json import JSONEncoder
@@ -7,21 +8,71 @@ import click
 from prettytable import PrettyTable
 from anytree import NodeMixin, RenderTree
 
-from calm.dsl.api import get_api_client
+from calm.dsl.api import get_api_client, GroupsQuery
 from calm.dsl.config import get_config
 
-from .utils import get_name_query, get_states_filter, highlight_text, Display
+from .utils import (
+    get_name_query,
+    get_states_filter,
+    highlight_text,
+    get_list_entities,
+    get_groups_filter,
+    Display,
+)
 from .constants import APPLICATION, RUNLOG, SYSTEM_ACTIONS
 from calm.dsl.tools import get_logging_handle
 
 LOG = get_logging_handle(__name__)
 
 
+# Attributes of applications fetched by groups api for listing
+APPLICATION_GROUP_ATTRIBUTES = [
+    "name",
+    "blueprint_name",
+    "_state",
+    "project_name",
+    "owner_username",
+    "_created_timestamp_usecs_",
+    "_last_updated_timestamp_usecs_",
+]
+
+# Groups api attributes of the keys of application list filter
+APPLICATION_GROUP_FILTER_KEYS = {"name": "name", "_state": "_state"}
+
+
+def _get_app_from_group(row):
+    """Returns the application (as list api does) from groups api row"""
+
+    metadata = {
+        "uuid": row["entity_id"],
+        "owner_reference": {"kind": "user", "name": row["owner_username"]},
+        "creation_time": row["_created_timestamp_usecs_"] or 0,
+        "last_update_time": row["_last_updated_timestamp_usecs_"] or 0,
+    }
+    if row["project_name"]:
+        metadata["project_reference"] = {"kind": "project", "name": row["project_name"]}
+
+    return {
+        "status": {
+            "name": row["name"],
+            "state": row["_state"],
+            "resources": {
+                "app_blueprint_reference": {
+                    "kind": "blueprint",
+                    "name": row["blueprint_name"],
+                }
+            },
+            "uuid": row["entity_id"],
+        },
+        "metadata": metadata,
+    }
+
+
 def get_apps(obj, name, filter_by, limit, offset, quiet, all_items):
     client = get_api_client()
     config = get_config()
 
-    params = {"length": limit, "offset": offset}
+    params = {}
     filter_query = ""
     if name:
         filter_query = get_name_query([name])
@@ -35,14 +86,32 @@ def get_apps(obj, name, filter_by, limit, offset, quiet, all_items):
     if filter_query:
         params["filter"] = filter_query
 
-    res, err = client.application.list(params=params)
-
-    if err:
+    query = None
+    groups_filter = get_groups_filter(
+        filter_query,
+        APPLICATION_GROUP_FILTER_KEYS,
+        state_key="_state",
+        deleted_state=APPLICATION.STATES.DELETED,
+    )
+    if groups_filter is not None:
+        query = GroupsQuery(
+            "app", APPLICATION_GROUP_ATTRIBUTES, filter=groups_filter, offset=offset
+        )
+    try:
+        json_rows = get_list_entities(
+            client,
+            client.application,
+            params,
+            offset,
+            limit,
+            query=query,
+            to_entity=_get_app_from_group,
+        )
+    except Exception:
         pc_ip = config["SERVER"]["pc_ip"]
         LOG.warning("Cannot fetch applications from {}".format(pc_ip))
         return
 
-    json_rows = res.json()["entities"]
     if not json_rows:
         click.echo(highlight_text("No application found !!!\n"))
         return
@@ -500,21 +569,42 @@ def watch_app(obj, app_name, screen, app=None):
 
 def delete_app(obj, app_names, soft=False):
     client = get_api_client()
+    action_label = "Soft Delete" if soft else "Delete"
 
-    for app_name in app_names:
-        app = _get_app(client, app_name)
-        app_id = app["metadata"]["uuid"]
-        action_label = "Soft Delete" if soft else "Delete"
-        LOG.info("Triggering {}".format(action_label))
-        res, err = client.application.delete(app_id, soft_delete=soft)
+    # Apps are looked up concurrently, and deleted together through batch api
+    app_lookups = [
+        (app_name, client.submit(_get_app, client, app_name)) for app_name in app_names
+    ]
+    delete_requests = []
+    with client.batch() as batch:
+        for app_name, app_lookup in app_lookups:
+            app = app_lookup.result()
+            app_id = app["metadata"]["uuid"]
+            LOG.info("Triggering {} of {}".format(action_label, app_name))
+            delete_requests.append(
+                (app_name, batch.application.delete(app_id, soft_delete=soft))
+            )
+
+    failed = []
+    for app_name, delete_request in delete_requests:
+        res, err = delete_request.result()
         if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
+            LOG.error(
+                "Failed to {} {}: [{}] - {}".format(
+                    action_label.lower(), app_name, err["code"], err["error"]
+                )
+            )
+            failed.append(app_name)
+            continue
 
-        LOG.info("{} action triggered".format(action_label))
+        LOG.info("{} action triggered for {}".format(action_label, app_name))
         response = res.json()
         runlog_id = response["status"]["runlog_uuid"]
         LOG.info("Action runlog uuid: {}".format(runlog_id))
 
+    if failed:
+        sys.exit(-1)
+
 
 def run_actions(screen, obj, app_name, action_name, watch):
     client = get_api_client()
@@ -584,7 +674,7 @@ def poll_action(poll_func, completion_func, poll_interval=10):
         time.sleep(poll_interval)
 
 
-def download_runlog(obj, runlog_id, app_name, file_name):
+def download_runlog(obj, runlog_id, app_name, file_name, resume=False):
     client = get_api_client()
     app = _get_app(client, app_name)
     app_id = app["metadata"]["uuid"]
@@ -592,9 +682,30 @@ def download_runlog(obj, runlog_id, app_name, file_name):
     if not file_name:
         file_name = "runlog_{}.zip".format(runlog_id)
 
-    res, err = client.application.download_runlog(app_id, runlog_id)
+    # Progress bar is created once the size of download is known
+    progress_bar = None
+    progress_done = 0
+
+    def show_progress(downloaded, total):
+        nonlocal progress_bar, progress_done
+        if total is None:
+            return
+
+        if progress_bar is None:
+            progress_bar = click.progressbar(
+                length=total, label="Downloading runlogs", file=sys.stderr
+            )
+        progress_bar.update(downloaded - progress_done)
+        progress_done = downloaded
+
+    res, err = client.application.download_runlog(
+        app_id, runlog_id, file_name=file_name, resume=resume, progress=show_progress
+    )
+    if progress_bar is not None:
+        progress_bar.render_finish()
+
     if not err:
-        open(file_name, "wb").write(res.content)
         click.echo("Runlogs saved as {}".format(highlight_text(file_name)))
+        LOG.debug("sha256 checksum of {}: {}".format(file_name, res.checksum))
     else:
         LOG.error("[{}] - {}".format(err["code"], err["error"]))
@@ -1,4 +1,3 @@
-import json
 import click
 
 from calm.dsl.api import get_api_client
@@ -14,7 +13,7 @@ from .bps import (
     launch_blueprint_simple,
     delete_blueprint,
 )
-from calm.dsl.tools import get_logging_handle
+from calm.dsl.tools import get_logging_handle, serializer
 
 LOG = get_logging_handle(__name__)
 
@@ -132,7 +131,7 @@ def create_blueprint(client, bp_payload, name=None, description=None, categories
 
 def create_blueprint_from_json(client, path_to_json, name=None, description=None):
 
-    bp_payload = json.loads(open(path_to_json, "r").read())
+    bp_payload = serializer.loads(open(path_to_json, "r").read())
     return create_blueprint(client, bp_payload, name=name, description=description)
 
 
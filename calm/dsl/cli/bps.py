@@ -1,5 +1,4 @@
 import time
-import json
 import importlib.util
 import sys
 from pprint import pprint
@@ -11,23 +10,71 @@ from prettytable import PrettyTable
 
 from calm.dsl.builtins import Blueprint, SimpleBlueprint, create_blueprint_payload
 from calm.dsl.config import get_config
-from calm.dsl.api import get_api_client
-
-from .utils import get_name_query, get_states_filter, highlight_text
+from calm.dsl.api import get_api_client, GroupsQuery
+
+from .utils import (
+    get_name_query,
+    get_states_filter,
+    highlight_text,
+    get_list_entities,
+    get_groups_filter,
+)
 from .constants import BLUEPRINT
 from calm.dsl.store import Cache
-from calm.dsl.tools import get_logging_handle
+from calm.dsl.tools import get_logging_handle, serializer
 
 LOG = get_logging_handle(__name__)
 
 
+# Attributes of blueprints fetched by groups api for listing
+BLUEPRINT_GROUP_ATTRIBUTES = [
+    "name",
+    "description",
+    "application_count",
+    "project_name",
+    "state",
+    "categories",
+    "_created_timestamp_usecs_",
+    "_last_updated_timestamp_usecs_",
+]
+
+# Groups api attributes of the keys of blueprint list filter
+BLUEPRINT_GROUP_FILTER_KEYS = {"name": "name", "state": "state"}
+
+
+def _get_blueprint_from_group(row):
+    """Returns the blueprint (as list api does) from groups api row"""
+
+    metadata = {
+        "uuid": row["entity_id"],
+        "categories": dict(
+            category.split(":", 1) for category in row["categories"] if ":" in category
+        ),
+        "creation_time": row["_created_timestamp_usecs_"] or 0,
+        "last_update_time": row["_last_updated_timestamp_usecs_"] or 0,
+    }
+    if row["project_name"]:
+        metadata["project_reference"] = {"kind": "project", "name": row["project_name"]}
+
+    return {
+        "status": {
+            "name": row["name"],
+            "description": row["description"] or "",
+            "application_count": row["application_count"] or 0,
+            "state": row["state"],
+            "uuid": row["entity_id"],
+        },
+        "metadata": metadata,
+    }
+
+
 def get_blueprint_list(obj, name, filter_by, limit, offset, quiet, all_items):
     """Get the blueprints, optionally filtered by a string"""
 
     client = get_api_client()
     config = get_config()
 
-    params = {"length": limit, "offset": offset}
+    params = {}
     filter_query = ""
     if name:
         filter_query = get_name_query([name])
@@ -41,14 +88,36 @@ def get_blueprint_list(obj, name, filter_by, limit, offset, quiet, all_items):
     if filter_query:
         params["filter"] = filter_query
 
-    res, err = client.blueprint.list(params=params)
-
-    if err:
+    query = None
+    groups_filter = get_groups_filter(
+        filter_query,
+        BLUEPRINT_GROUP_FILTER_KEYS,
+        state_key="state",
+        deleted_state=BLUEPRINT.STATES.DELETED,
+    )
+    if groups_filter is not None:
+        query = GroupsQuery(
+            "blueprint",
+            BLUEPRINT_GROUP_ATTRIBUTES,
+            filter=groups_filter,
+            offset=offset,
+            list_attributes=["categories"],
+        )
+    try:
+        json_rows = get_list_entities(
+            client,
+            client.blueprint,
+            params,
+            offset,
+            limit,
+            query=query,
+            to_entity=_get_blueprint_from_group,
+        )
+    except Exception:
         pc_ip = config["SERVER"]["pc_ip"]
         LOG.warning("Cannot fetch blueprints from {}".format(pc_ip))
         return
 
-    json_rows = res.json()["entities"]
     if not json_rows:
         click.echo(highlight_text("No blueprint found !!!\n"))
         return
@@ -119,7 +188,7 @@ def describe_bp(obj, blueprint_name, out):
 
     if out == "json":
         bp.pop("status", None)
-        click.echo(json.dumps(bp, indent=4, separators=(",", ": ")))
+        click.echo(serializer.dumps(bp, pprint=True))
         return
 
     click.echo("\n----Blueprint Summary----\n")
@@ -208,22 +277,20 @@ def get_blueprint_class_from_module(user_bp_module):
 
 def compile_blueprint(bp_file, no_sync=False):
 
-    # Sync only if no_sync flag is not set
-    if not no_sync:
-        LOG.info("Syncing cache")
-        Cache.sync()
-
-    user_bp_module = get_blueprint_module_from_file(bp_file)
-    UserBlueprint = get_blueprint_class_from_module(user_bp_module)
-    if UserBlueprint is None:
-        return None
-
-    bp_payload = None
-    if isinstance(UserBlueprint, type(SimpleBlueprint)):
-        bp_payload = UserBlueprint.make_bp_dict()
-    else:
-        UserBlueprintPayload, _ = create_blueprint_payload(UserBlueprint)
-        bp_payload = UserBlueprintPayload.get_dict()
+    # Entity types looked up by blueprint are synced (if stale), unless
+    # no_sync flag is set
+    with Cache.lazy_sync(enabled=not no_sync):
+        user_bp_module = get_blueprint_module_from_file(bp_file)
+        UserBlueprint = get_blueprint_class_from_module(user_bp_module)
+        if UserBlueprint is None:
+            return None
+
+        bp_payload = None
+        if isinstance(UserBlueprint, type(SimpleBlueprint)):
+            bp_payload = UserBlueprint.make_bp_dict()
+        else:
+            UserBlueprintPayload, _ = create_blueprint_payload(UserBlueprint)
+            bp_payload = UserBlueprintPayload.get_dict()
 
     return bp_payload
 
@@ -238,7 +305,8 @@ def compile_blueprint_command(bp_file, out, no_sync=False):
     config = get_config()
 
     project_name = config["PROJECT"].get("name", "default")
-    project_uuid = Cache.get_entity_uuid("PROJECT", project_name)
+    with Cache.lazy_sync(enabled=not no_sync):
+        project_uuid = Cache.get_entity_uuid("PROJECT", project_name)
 
     if not project_uuid:
         LOG.error(
@@ -264,7 +332,7 @@ def compile_blueprint_command(bp_file, out, no_sync=False):
         LOG.warning("Secrets are not shown in payload !!!")
 
     if out == "json":
-        click.echo(json.dumps(bp_payload, indent=4, separators=(",", ": ")))
+        click.echo(serializer.dumps(bp_payload, pprint=True))
     elif out == "yaml":
         click.echo(yaml.dump(bp_payload, default_flow_style=False))
     else:
@@ -303,6 +371,9 @@ def get_blueprint_runtime_editables(client, blueprint):
         LOG.debug("Blueprint UUID not present in metadata")
         raise Exception("Invalid blueprint provided {} ".format(blueprint))
     res, err = client.blueprint._get_editables(bp_uuid)
+    if err:
+        raise Exception("[{}] - {}".format(err["code"], err["error"]))
+
     response = res.json()
     return response.get("resources", [])
 
@@ -372,18 +443,14 @@ def launch_blueprint_simple(
     }
 
     if runtime_editables and patch_editables:
-        runtime_editables_json = json.dumps(
-            runtime_editables, indent=4, separators=(",", ": ")
-        )
+        runtime_editables_json = serializer.dumps(runtime_editables, pprint=True)
         click.echo("Blueprint editables are:\n{}".format(runtime_editables_json))
         for entity_type, entity_list in runtime_editables.items():
             for entity in entity_list:
                 context = entity["context"]
                 editables = entity["value"]
                 get_field_values(editables, context, path=entity.get("name", ""))
-        runtime_editables_json = json.dumps(
-            runtime_editables, indent=4, separators=(",", ": ")
-        )
+        runtime_editables_json = serializer.dumps(runtime_editables, pprint=True)
         LOG.info("Updated blueprint editables are:\n{}".format(runtime_editables_json))
     res, err = client.blueprint.launch(blueprint_uuid, launch_payload)
     if not err:
@@ -404,6 +471,9 @@ def poll_launch_status(client, blueprint_uuid, launch_req_id):
         # call status api
         LOG.info("Polling status of Launch")
         res, err = client.blueprint.poll_launch(blueprint_uuid, launch_req_id)
+        if err:
+            raise Exception("[{}] - {}".format(err["code"], err["error"]))
+
         response = res.json()
         app_state = response["status"]["state"]
         pprint(response)
@@ -436,10 +506,33 @@ def delete_blueprint(obj, blueprint_names):
 
     client = get_api_client()
 
-    for blueprint_name in blueprint_names:
-        blueprint = get_blueprint(client, blueprint_name)
-        blueprint_id = blueprint["metadata"]["uuid"]
-        res, err = client.blueprint.delete(blueprint_id)
+    # Blueprints are looked up concurrently, and deleted together through batch api
+    blueprint_lookups = [
+        (blueprint_name, client.submit(get_blueprint, client, blueprint_name))
+        for blueprint_name in blueprint_names
+    ]
+    delete_requests = []
+    with client.batch() as batch:
+        for blueprint_name, blueprint_lookup in blueprint_lookups:
+            blueprint = blueprint_lookup.result()
+            blueprint_id = blueprint["metadata"]["uuid"]
+            delete_requests.append(
+                (blueprint_name, batch.blueprint.delete(blueprint_id))
+            )
+
+    failed = []
+    for blueprint_name, delete_request in delete_requests:
+        res, err = delete_request.result()
         if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
+            LOG.error(
+                "Failed to delete blueprint {}: [{}] - {}".format(
+                    blueprint_name, err["code"], err["error"]
+                )
+            )
+            failed.append(blueprint_name)
+            continue
+
         LOG.info("Blueprint {} deleted".format(blueprint_name))
+
+    if failed:
+        sys.exit(-1)
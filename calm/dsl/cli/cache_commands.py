@@ -1,9 +1,11 @@
+import sys
 import click
 import arrow
 import datetime
 from prettytable import PrettyTable
 
 from calm.dsl.store import Cache
+from calm.dsl.api.response_cache import ResponseCache
 
 from .main import show, update, clear
 from .utils import highlight_text
@@ -48,9 +50,10 @@ def show_cache_command(obj):
 @clear.command("cache")
 @click.pass_obj
 def clear_cache(obj):
-    """Clear the entities stored in cache"""
+    """Clear the entities and responses stored in cache"""
 
     Cache.clear_entities()
+    ResponseCache.clear()
     LOG.info(highlight_text("Cache cleared at {}".format(datetime.datetime.now())))
 
 
@@ -62,12 +65,30 @@ def clear_cache(obj):
     type=click.Choice(Cache.get_entity_types()),
     help="Cache entity type",
 )
+@click.option(
+    "--full",
+    "-f",
+    is_flag=True,
+    default=False,
+    help="Refetch all the entities, instead of the ones changed since last update",
+)
 @click.pass_obj
-def update_cache(obj, entity_type):
+def update_cache(obj, entity_type, full):
     """Update the data for dynamic entities stored in the cache"""
 
     LOG.debug("Updating cache")
-    Cache.sync(entity_type)
+    report = Cache.sync(entity_type, full=full)
     LOG.debug("Success")
     show_cache(obj)
+
+    failed_entity_types = [etype for etype, err in report.items() if err]
+    for etype, err in report.items():
+        if err:
+            LOG.error("Failed to update {}: {}".format(etype, err))
+        else:
+            LOG.info("Updated {}".format(etype))
+
+    if failed_entity_types:
+        sys.exit(-1)
+
     LOG.info(highlight_text("Cache updated at {}".format(datetime.datetime.now())))
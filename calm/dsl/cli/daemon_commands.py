@@ -0,0 +1,78 @@
+import os
+import time
+
+import click
+
+from calm.dsl.daemon import get_socket_path
+from calm.dsl.daemon.client import request
+from calm.dsl.daemon.server import Daemon, start_daemon
+from calm.dsl.tools import get_logging_handle
+
+from .main import daemon
+from .utils import highlight_text
+
+LOG = get_logging_handle(__name__)
+
+
+@daemon.command("start")
+@click.option("--socket", "socket_path", default=None, help="Path of unix socket")
+@click.option(
+    "--idle-timeout",
+    "-t",
+    default=0,
+    type=int,
+    help="Seconds after which an idle daemon exits (default: never)",
+)
+@click.option(
+    "--foreground", "-f", is_flag=True, default=False, help="Run in foreground"
+)
+def _start_daemon(socket_path, idle_timeout, foreground):
+    """Start the daemon. Later calm commands are forwarded to it"""
+
+    socket_path = socket_path or get_socket_path()
+    res = request("ping", socket_path)
+    if res:
+        LOG.info("Calm daemon is already running (pid {})".format(res["pid"]))
+        return
+
+    if foreground:
+        Daemon(socket_path, idle_timeout=idle_timeout).serve()
+        return
+
+    pid = start_daemon(socket_path, idle_timeout=idle_timeout)
+    LOG.info("Calm daemon (pid {}) listening on {}".format(pid, socket_path))
+
+
+@daemon.command("stop")
+@click.option("--socket", "socket_path", default=None, help="Path of unix socket")
+def _stop_daemon(socket_path):
+    """Stop the daemon"""
+
+    socket_path = socket_path or get_socket_path()
+    res = request("stop", socket_path)
+    if not res:
+        LOG.info("Calm daemon is not running")
+        return
+
+    # Daemon removes the socket on exit
+    while os.path.exists(socket_path):
+        time.sleep(0.1)
+    LOG.info("Calm daemon (pid {}) stopped".format(res["pid"]))
+
+
+@daemon.command("status")
+@click.option("--socket", "socket_path", default=None, help="Path of unix socket")
+def _daemon_status(socket_path):
+    """Show the status of daemon"""
+
+    res = request("ping", socket_path or get_socket_path())
+    if not res:
+        click.echo("Calm daemon is not running")
+        return
+
+    click.echo("Calm daemon is running")
+    click.echo("\tPid: {}".format(highlight_text(res["pid"])))
+    click.echo("\tUptime: {} seconds".format(highlight_text(res["uptime"])))
+    click.echo("\tCommands run: {}".format(highlight_text(res["commands_run"])))
+    click.echo("\tCommands running: {}".format(highlight_text(res["commands_running"])))
+    click.echo("\tConfig file: {}".format(highlight_text(res["config_file"])))
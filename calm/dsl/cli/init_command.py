@@ -1,6 +1,5 @@
 import click
 import os
-import json
 
 from calm.dsl.config import init_config, get_default_user_config_file, set_config
 from calm.dsl.db import get_db_handle
@@ -10,7 +9,7 @@ from calm.dsl.init import init_bp
 from calm.dsl.providers import get_provider_types
 
 from .main import init, set
-from calm.dsl.tools import get_logging_handle
+from calm.dsl.tools import get_logging_handle, serializer
 
 LOG = get_logging_handle(__name__)
 
@@ -85,7 +84,7 @@ def set_server_details(ip, port, username, password, project_name):
         click.echo("[Fail]")
         raise Exception("[{}] - {}".format(err["code"], err["error"]))
 
-    result = json.loads(res.content)
+    result = serializer.loads(res.content)
     service_enablement_status = result["service_enablement_status"]
     LOG.info(service_enablement_status)
 
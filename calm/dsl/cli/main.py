@@ -1,6 +1,8 @@
 from ruamel import yaml
 import click
-import json
+import time
+
+from prettytable import PrettyTable
 
 import click_completion
 import click_completion.core
@@ -10,10 +12,13 @@ from click_repl import repl
 # TODO - move providers to separate file
 from calm.dsl.providers import get_provider, get_provider_types
 from calm.dsl.api import get_api_client, get_resource_api
+from calm.dsl.api.instrumentation import Profiler, register_hook
+from calm.dsl.api.timeouts import set_deadline
 from calm.dsl.tools import (
     get_logging_handle,
     simple_verbosity_option,
     show_trace_option,
+    serializer,
 )
 
 CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
@@ -25,9 +30,27 @@ LOG = get_logging_handle(__name__)
 @click.group(context_settings=CONTEXT_SETTINGS)
 @simple_verbosity_option(LOG)
 @show_trace_option(LOG)
+@click.option(
+    "--profile-http",
+    is_flag=True,
+    default=False,
+    help="Show the timings of http requests (per endpoint) at exit",
+)
+@click.option(
+    "--profile-http-dump",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Write the traces of http requests to file as newline delimited json",
+)
+@click.option(
+    "--deadline",
+    type=float,
+    default=None,
+    help="Fail requests made after given seconds (overrides command_deadline of config)",
+)
 @click.version_option("0.1")
 @click.pass_context
-def main(ctx):
+def main(ctx, profile_http, profile_http_dump, deadline):
     """Calm CLI
 
 \b
@@ -42,6 +65,69 @@ Commonly used commands:
     ctx.ensure_object(dict)
     ctx.obj["verbose"] = True
 
+    if deadline:
+        set_deadline(deadline)
+
+    if profile_http or profile_http_dump:
+        profiler = Profiler(dump_file=profile_http_dump)
+        register_hook(profiler.add)
+        start_time = time.time()
+
+        def report_profile():
+            if profile_http_dump:
+                profiler.dump()
+            if profile_http:
+                show_http_profile(profiler, time.time() - start_time)
+
+        ctx.call_on_close(report_profile)
+
+
+def show_http_profile(profiler, wall_time):
+    """Shows the summary of http requests on stderr"""
+
+    rows = profiler.summary()
+    if not rows:
+        click.echo("No http requests made", err=True)
+        return
+
+    table = PrettyTable()
+    table.field_names = [
+        "METHOD",
+        "ENDPOINT",
+        "COUNT",
+        "ERRORS",
+        "RETRIES",
+        "P50 (ms)",
+        "P95 (ms)",
+        "MAX (ms)",
+        "SERVER (%)",
+    ]
+    table.align["ENDPOINT"] = "l"
+    for row in rows:
+        table.add_row(
+            [
+                row["method"],
+                row["endpoint"],
+                row["count"],
+                row["errors"],
+                row["retries"],
+                int(row["p50"] * 1000),
+                int(row["p95"] * 1000),
+                int(row["max"] * 1000),
+                int(100 * row["server"] / row["total"]) if row["total"] else 0,
+            ]
+        )
+
+    http_time = sum(row["total"] for row in rows)
+    server_time = sum(row["server"] for row in rows)
+    click.echo(table, err=True)
+    click.echo(
+        "{} requests took {:.2f}s ({:.2f}s waiting for server) of {:.2f}s".format(
+            sum(row["count"] for row in rows), http_time, server_time, wall_time
+        ),
+        err=True,
+    )
+
 
 @main.group(cls=DYMGroup)
 def validate():
@@ -125,7 +211,7 @@ def get_server_status(obj):
         click.echo("[Fail]")
         raise Exception("[{}] - {}".format(err["code"], err["error"]))
 
-    result = json.loads(res.content)
+    result = serializer.loads(res.content)
     service_enablement_status = result["service_enablement_status"]
 
     LOG.info(service_enablement_status)
@@ -254,3 +340,9 @@ def calmrepl():
 def set():
     """Sets the entities"""
     pass
+
+
+@main.group(cls=DYMGroup)
+def daemon():
+    """Manage the daemon running calm commands with a warm start"""
+    pass
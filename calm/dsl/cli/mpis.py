@@ -655,7 +655,10 @@ def publish_bp_to_marketplace_manager(
     if icon_name:
         if icon_file:
             # If file is there, upload first and then use it for marketplace item
-            client.app_icon.upload(icon_name, icon_file)
+            res, err = client.app_icon.upload(icon_name, icon_file)
+            if err:
+                LOG.error("[{}] - {}".format(err["code"], err["error"]))
+                sys.exit(-1)
 
         app_icon_name_uuid_map = client.app_icon.get_name_uuid_map()
         app_icon_uuid = app_icon_name_uuid_map.get(icon_name, None)
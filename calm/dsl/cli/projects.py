@@ -1,25 +1,73 @@
+import sys
 import time
 import click
 import arrow
 from prettytable import PrettyTable
 
 from calm.dsl.builtins import ProjectValidator
-from calm.dsl.api import get_resource_api, get_api_client
+from calm.dsl.api import get_resource_api, get_api_client, GroupsQuery
 from calm.dsl.config import get_config
 
-from .utils import get_name_query, highlight_text
+from .utils import (
+    get_name_query,
+    highlight_text,
+    get_list_entities,
+    get_groups_filter,
+)
 from calm.dsl.tools import get_logging_handle
 
 LOG = get_logging_handle(__name__)
 
 
+# Attributes of projects fetched by groups api for listing
+PROJECT_GROUP_ATTRIBUTES = [
+    "name",
+    "description",
+    "state",
+    "owner_username",
+    "user_uuids",
+    "_created_timestamp_usecs_",
+    "_last_updated_timestamp_usecs_",
+]
+
+# Groups api attributes of the keys of project list filter
+PROJECT_GROUP_FILTER_KEYS = {"name": "name"}
+
+
+def _get_project_from_group(row):
+    """Returns the project (as list api does) from groups api row"""
+
+    creation_time = int(row["_created_timestamp_usecs_"] or 0) // 1000000
+    last_update_time = int(row["_last_updated_timestamp_usecs_"] or 0) // 1000000
+
+    return {
+        "status": {
+            "name": row["name"],
+            "description": row["description"] or "",
+            "state": row["state"],
+            "resources": {
+                "user_reference_list": [
+                    {"kind": "user", "uuid": user_uuid}
+                    for user_uuid in row["user_uuids"]
+                ]
+            },
+        },
+        "metadata": {
+            "uuid": row["entity_id"],
+            "owner_reference": {"kind": "user", "name": row["owner_username"]},
+            "creation_time": arrow.get(creation_time).isoformat(),
+            "last_update_time": arrow.get(last_update_time).isoformat(),
+        },
+    }
+
+
 def get_projects(obj, name, filter_by, limit, offset, quiet):
     """ Get the projects, optionally filtered by a string """
 
     client = get_api_client()
     config = get_config()
 
-    params = {"length": limit, "offset": offset}
+    params = {}
     filter_query = ""
     if name:
         filter_query = get_name_query([name])
@@ -33,14 +81,31 @@ def get_projects(obj, name, filter_by, limit, offset, quiet):
     if filter_query:
         params["filter"] = filter_query
 
-    res, err = client.project.list(params=params)
-
-    if err:
+    query = None
+    groups_filter = get_groups_filter(filter_query, PROJECT_GROUP_FILTER_KEYS)
+    if groups_filter is not None:
+        query = GroupsQuery(
+            "project",
+            PROJECT_GROUP_ATTRIBUTES,
+            filter=groups_filter,
+            offset=offset,
+            list_attributes=["user_uuids"],
+        )
+    try:
+        json_rows = get_list_entities(
+            client,
+            client.project,
+            params,
+            offset,
+            limit,
+            query=query,
+            to_entity=_get_project_from_group,
+        )
+    except Exception:
         pc_ip = config["SERVER"]["pc_ip"]
         LOG.warning("Cannot fetch projects from {}".format(pc_ip))
         return
 
-    json_rows = res.json()["entities"]
     if not json_rows:
         click.echo(highlight_text("No project found !!!\n"))
         return
@@ -120,14 +185,35 @@ def delete_project(obj, project_names):
 
     client = get_api_client()
 
-    for project_name in project_names:
-        project = get_project(client, project_name)
-        project_id = project["metadata"]["uuid"]
-        res, err = client.project.delete(project_id)
+    # Projects are looked up concurrently, and deleted together through batch api
+    project_lookups = [
+        (project_name, client.submit(get_project, client, project_name))
+        for project_name in project_names
+    ]
+    delete_requests = []
+    with client.batch() as batch:
+        for project_name, project_lookup in project_lookups:
+            project = project_lookup.result()
+            project_id = project["metadata"]["uuid"]
+            delete_requests.append((project_name, batch.project.delete(project_id)))
+
+    failed = []
+    for project_name, delete_request in delete_requests:
+        res, err = delete_request.result()
         if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
+            LOG.error(
+                "Failed to delete project {}: [{}] - {}".format(
+                    project_name, err["code"], err["error"]
+                )
+            )
+            failed.append(project_name)
+            continue
+
         LOG.info("Project {} deleted".format(project_name))
 
+    if failed:
+        sys.exit(-1)
+
 
 def create_project(obj, payload):
 
@@ -273,12 +359,16 @@ def describe_project(obj, project_name):
     if subnets:
         click.echo("Account Type: " + highlight_text("NUTANIX"))
 
-    for subnet in subnets:
-        subnet_name = subnet["name"]
-
+    # Subnets are read together through batch api
+    subnet_reads = []
+    with client.batch() as batch:
         # TODO move this to AHV specific method
-        Obj = get_resource_api("subnets", client.connection)
-        res, err = Obj.read(subnet["uuid"])
+        Obj = get_resource_api("subnets", batch.connection)
+        for subnet in subnets:
+            subnet_reads.append((subnet["name"], Obj.read(subnet["uuid"])))
+
+    for subnet_name, subnet_read in subnet_reads:
+        res, err = subnet_read.result()
 
         if err:
             raise Exception("[{}] - {}".format(err["code"], err["error"]))
@@ -1,7 +1,12 @@
 import click
+import re
 from functools import reduce
 from asciimatics.screen import Screen
 
+from calm.dsl.tools import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
 
 def get_states_filter(STATES_CLASS=None, state_key="state", states=[]):
 
@@ -26,6 +31,81 @@ def get_name_query(names):
         return "({})".format(",".join(search_strings))
 
 
+# Name filter built by `get_name_query` (Ex: name==.*[a|A][b|B].*)
+NAME_QUERY_REGEX = re.compile(r"\.\*((?:\[[^\]]\|[^\]]\])+)\.\*")
+
+# Characters making a filter value a regex
+REGEX_CHARS = re.compile(r"[.*+?^$\[\]{}()|\\]")
+
+
+def get_groups_filter(filter_query, filter_keys, state_key=None, deleted_state=None):
+    """Returns the groups api filter criteria for the filter of list api.
+    Name queries are converted to `contains` conditions, and keys are
+    renamed as per filter_keys (list api key: groups attribute).
+    Ex: name==.*[a|A][b|B].*;(_state==running) -> name=cs=ab;(_state==running)
+
+    Entities in deleted_state are excluded, unless filter has conditions
+    on state_key (as list api does).
+
+    Returns:
+        (str): filter criteria, None if filter can not be converted (Ex:
+            keys not in filter_keys, regex values)
+    """
+
+    terms = []
+    has_state = False
+    for term in (filter_query or "").split(";"):
+        if not term:
+            continue
+
+        is_group = term.startswith("(") and term.endswith(")")
+        conditions = []
+        for condition in term.strip("()").split(","):
+            match = re.fullmatch(r"(\w+)(==|!=)(.*)", condition)
+            if not match or match.group(1) not in filter_keys:
+                return None
+
+            key, op, value = match.groups()
+            name_match = NAME_QUERY_REGEX.fullmatch(value)
+            if key == "name" and op == "==" and name_match:
+                value = "".join(re.findall(r"\[([^\]])\|", name_match.group(1)))
+                op = "=cs="
+            elif REGEX_CHARS.search(value):
+                return None
+
+            has_state = has_state or key == state_key
+            conditions.append("{}{}{}".format(filter_keys[key], op, value))
+
+        condition = ",".join(conditions)
+        terms.append("({})".format(condition) if is_group else condition)
+
+    if state_key and not has_state:
+        terms.append("{}!={}".format(filter_keys[state_key], deleted_state))
+
+    return ";".join(terms)
+
+
+def get_list_entities(client, api, params, offset, limit, query=None, to_entity=None):
+    """Returns the entities of list api.
+    If groups query is given, only its attributes are fetched using groups
+    api and every row is converted to list entity by to_entity. List api is
+    used if groups api fails or doesn't return the names of entities.
+    Filter of query is to be converted by `get_groups_filter`.
+    """
+
+    if query:
+        try:
+            rows = list(client.groups.iter_entities(query, limit=limit))
+            if all(row.get("name") is not None for row in rows):
+                return [to_entity(row) for row in rows]
+
+            LOG.debug("Groups api did not return {} names".format(query.entity_type))
+        except Exception as exc:
+            LOG.debug("Groups query of {} failed: {}".format(query.entity_type, exc))
+
+    return list(api.iter_entities(params, offset=offset, limit=limit))
+
+
 def highlight_text(text, **kwargs):
     """Highlight text in our standard format"""
     return click.style("{}".format(text), fg="blue", bold=False, **kwargs)
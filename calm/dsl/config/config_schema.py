@@ -1,4 +1,8 @@
-from schema import Schema, And, Use, SchemaError
+from schema import Schema, And, Use, Optional, SchemaError
+
+
+# Accepted values for boolean options (same as configparser)
+BOOLEANS = ["1", "yes", "true", "on", "0", "no", "false", "off"]
 
 
 config_schema_dict = {
@@ -12,6 +16,38 @@ config_schema_dict = {
     "DB": {"location": And(Use(str))},
     "LOG": {"level": And(Use(str))},
     "CATEGORIES": {},
+    Optional("CONNECTION"): {
+        Optional("response_cache"): And(Use(str), lambda v: v.lower() in BOOLEANS),
+        Optional("response_cache_size"): And(Use(int), lambda v: v > 0),
+        Optional("request_coalescing"): And(Use(str), lambda v: v.lower() in BOOLEANS),
+        Optional("coalesce_window"): And(Use(float), lambda v: v >= 0),
+        Optional("request_compression"): And(Use(str), lambda v: v.lower() in BOOLEANS),
+        Optional("compression_threshold"): And(Use(int), lambda v: v >= 0),
+        Optional("persist_session"): And(Use(str), lambda v: v.lower() in BOOLEANS),
+        Optional("rate_limit"): And(Use(float), lambda v: v >= 0),
+        Optional("rate_burst"): And(Use(int), lambda v: v >= 0),
+        Optional("max_in_flight"): And(Use(int), lambda v: v >= 0),
+        Optional("read_rate_limit"): And(Use(float), lambda v: v >= 0),
+        Optional("write_rate_limit"): And(Use(float), lambda v: v >= 0),
+        Optional("delete_rate_limit"): And(Use(float), lambda v: v >= 0),
+        Optional("connect_timeout"): And(Use(float), lambda v: v >= 0),
+        Optional("read_timeout"): And(Use(float), lambda v: v >= 0),
+        Optional("endpoint_timeouts"): And(
+            Use(str),
+            lambda v: all("=" in item for item in v.split(",") if item.strip()),
+        ),
+        Optional("command_deadline"): And(Use(float), lambda v: v >= 0),
+        Optional("circuit_breaker_threshold"): And(Use(int), lambda v: v >= 0),
+        Optional("circuit_breaker_reset"): And(Use(float), lambda v: v >= 0),
+        Optional("retries_enabled"): And(Use(str), lambda v: v.lower() in BOOLEANS),
+        Optional("max_retries"): And(Use(int), lambda v: v >= 0),
+        Optional("retry_backoff"): And(Use(float), lambda v: v >= 0),
+        Optional("retry_max_backoff"): And(Use(float), lambda v: v >= 0),
+    },
+    Optional("CACHE"): {
+        # ttl of all entity types, and of an entity type (Ex: AHV_DISK_IMAGE)
+        Optional(str): And(Use(float), lambda v: v >= 0),
+    },
 }
 
 
@@ -0,0 +1,20 @@
+"""
+daemon: Long lived agent running calm commands forwarded by thin clients
+
+Modules of this package (except `server`) must stay light to import, as the
+`calm` entry point imports them before deciding to forward the command.
+"""
+
+import os
+
+# Environment variables tuning the forwarding to daemon
+SOCKET_ENV_VAR = "CALM_DSL_DAEMON_SOCKET"
+DISABLE_ENV_VAR = "CALM_DSL_NO_DAEMON"
+
+
+def get_socket_path():
+    """Returns the path of unix socket of daemon"""
+
+    return os.environ.get(SOCKET_ENV_VAR) or os.path.join(
+        os.path.expanduser("~"), ".calm", "daemon.sock"
+    )
@@ -0,0 +1,132 @@
+"""
+client: Thin `calm` entry point forwarding commands to the daemon
+
+If a daemon is listening (see `calm daemon start`), the command line, the
+working directory, the environment and the standard streams of this process
+are handed over to it and the command runs in an already initialized
+interpreter. Otherwise (or if daemon declines the command) the command runs
+in this process as usual.
+"""
+
+import json
+import os
+import signal
+import socket
+import sys
+
+from . import DISABLE_ENV_VAR, get_socket_path
+from .protocol import send_message
+
+# Commands that always run in the invoking process
+LOCAL_COMMANDS = ["daemon"]
+
+
+def _connect(socket_path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+
+    return sock
+
+
+def request(op, socket_path=None):
+    """Sends a control request (Ex: ping, stop) to the daemon
+
+    Returns:
+        (dict): response of daemon, None if daemon is not running
+    """
+
+    socket_path = socket_path or get_socket_path()
+    sock = _connect(socket_path)
+    if sock is None:
+        return None
+
+    try:
+        send_message(sock, {"op": op})
+        line = sock.makefile("r").readline()
+        return json.loads(line) if line else None
+
+    except OSError:
+        return None
+
+    finally:
+        sock.close()
+
+
+def forward_command(argv, socket_path=None):
+    """Runs the command in daemon
+
+    Args:
+        argv (list): arguments of calm command
+        socket_path (str): unix socket of daemon
+    Returns:
+        (int): exit code of command, None if daemon can not run it
+    """
+
+    socket_path = socket_path or get_socket_path()
+    if not os.path.exists(socket_path):
+        return None
+
+    sock = _connect(socket_path)
+    if sock is None:
+        return None
+
+    pid = None
+    try:
+        send_message(
+            sock,
+            {"op": "run", "argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)},
+            fds=[0, 1, 2],
+        )
+
+        reader = sock.makefile("r")
+        while True:
+            try:
+                line = reader.readline()
+            except KeyboardInterrupt:
+                # Interrupt the command running in daemon
+                if pid is None:
+                    raise
+                os.kill(pid, signal.SIGINT)
+                continue
+
+            if not line:
+                break
+
+            message = json.loads(line)
+            if "fallback" in message:
+                return None
+
+            pid = message.get("pid", pid)
+            if "exit_code" in message:
+                return message["exit_code"]
+
+    except OSError:
+        pass
+
+    finally:
+        sock.close()
+
+    if pid is None:
+        return None
+
+    print("Lost connection to calm daemon", file=sys.stderr)
+    return 1
+
+
+def main():
+    """Entry point of `calm`"""
+
+    argv = sys.argv[1:]
+    is_local = bool(argv) and argv[0] in LOCAL_COMMANDS
+    if not is_local and not os.environ.get(DISABLE_ENV_VAR):
+        exit_code = forward_command(argv)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    from calm.dsl.cli import main as cli_main
+
+    cli_main()
@@ -0,0 +1,53 @@
+"""
+protocol: Messages exchanged between the daemon and its clients
+
+Every message is a json document terminated by a newline. A client may pass
+open file descriptors (its stdin, stdout and stderr) along with its request.
+"""
+
+import array
+import json
+import socket
+
+# Maximum number of file descriptors passed with a message
+MAX_FDS = 3
+
+
+def send_message(sock, message, fds=None):
+    """Sends the message (dict) and file descriptors over the unix socket"""
+
+    data = (json.dumps(message) + "\n").encode("utf-8")
+    if fds:
+        ancillary = [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", fds))]
+        sent = sock.sendmsg([data], ancillary)
+        data = data[sent:]
+
+    sock.sendall(data)
+
+
+def recv_message(sock):
+    """Receives a message and the file descriptors passed with it
+
+    Returns:
+        (tuple (dict, list)): message, file descriptors
+    Raises:
+        ConnectionError: If peer closed the socket before sending a message
+    """
+
+    data = b""
+    fds = array.array("i")
+    while not data.endswith(b"\n"):
+        chunk, ancdata, _, _ = sock.recvmsg(
+            64 * 1024, socket.CMSG_SPACE(MAX_FDS * fds.itemsize)
+        )
+        if not chunk:
+            for fd in fds:
+                socket.close(fd)
+            raise ConnectionError("Socket closed before receiving the message")
+
+        data += chunk
+        for level, msg_type, cdata in ancdata:
+            if level == socket.SOL_SOCKET and msg_type == socket.SCM_RIGHTS:
+                fds.frombytes(cdata[: len(cdata) - (len(cdata) % fds.itemsize)])
+
+    return json.loads(data.decode("utf-8")), list(fds)
@@ -0,0 +1,388 @@
+"""
+server: Daemon serving the commands forwarded by `calm` invocations
+
+The daemon imports the cli, renders the entity schemas and provider specs
+and opens the local DB once. Every forwarded command then runs in a process
+forked from it, with the standard streams, working directory and
+environment of the invoking process. Forking keeps the state a command
+leaves behind (Ex: classes of the user blueprint) out of the next ones.
+Commands run concurrently: children are reaped on SIGCHLD, so the daemon
+keeps serving other commands (and control requests) while they run.
+
+Note: Connections to server are not shared with commands, as the TLS state
+of a connection lives in the memory of the process using it.
+"""
+
+import os
+import selectors
+import signal
+import socket
+import subprocess
+import sys
+import time
+import traceback
+
+import click
+
+from calm.dsl.tools import get_logging_handle
+from calm.dsl.config import get_default_user_config_file
+from . import get_socket_path
+from .client import request
+from .protocol import recv_message, send_message
+
+LOG = get_logging_handle(__name__)
+
+
+# Seconds in which a client is to send its request after connecting
+REQUEST_TIMEOUT = 10
+
+
+def _drain(sock):
+    """Reads the pending bytes of non-blocking socket, False if none"""
+
+    try:
+        return bool(sock.recv(4096))
+    except BlockingIOError:
+        return False
+
+
+def get_config_file(cwd):
+    """Returns the config file used by calm commands run in cwd"""
+
+    local_config_file = os.path.join(cwd, "config.ini")
+    if os.path.isfile(local_config_file):
+        return local_config_file
+
+    return get_default_user_config_file()
+
+
+def _get_exit_code(code):
+    """Returns the exit code for the code of SystemExit"""
+
+    if code is None:
+        return 0
+
+    if isinstance(code, int):
+        return code
+
+    print(code, file=sys.stderr)
+    return 1
+
+
+class Daemon:
+    def __init__(self, socket_path=None, idle_timeout=0):
+        """Calm daemon
+
+        Args:
+            socket_path (str): unix socket to listen on
+            idle_timeout (int): seconds after which an idle daemon exits,
+                                0 to never exit
+        """
+        self.socket_path = socket_path or get_socket_path()
+        self.idle_timeout = idle_timeout
+        self.config_file = get_config_file(os.getcwd())
+        self.config_mtime = None
+        self.start_time = None
+        self.commands_run = 0
+        self._sock = None
+        self._running = False
+
+        # Connections of the running commands, by pid of child
+        self._children = {}
+
+        # Socket pair woken up on SIGCHLD
+        self._wakeup_socks = None
+
+    def warm_up(self):
+        """Loads everything a command would otherwise load on startup"""
+
+        LOG.info("Loading calm cli")
+        from calm.dsl.cli import main  # NoQA
+        from calm.dsl.builtins.models.schema import _get_all_schemas
+        from calm.dsl.db import get_db_handle
+        from calm.dsl.api import get_api_client
+
+        _get_all_schemas()
+
+        if os.path.isfile(self.config_file):
+            self.config_mtime = os.path.getmtime(self.config_file)
+            get_api_client()
+
+            # Verifies (creates) the db tables. sqlite connections are not
+            # shared across processes, so children open their own.
+            get_db_handle().close()
+
+    def serve(self):
+        """Listens on socket and serves the requests until stopped"""
+
+        self.warm_up()
+        self._listen()
+
+        self.start_time = time.time()
+        self._running = True
+        LOG.info(
+            "Calm daemon (pid {}) listening on {}".format(os.getpid(), self.socket_path)
+        )
+
+        wakeup_sock, wakeup_write_sock = self._wakeup_socks = socket.socketpair()
+        wakeup_sock.setblocking(False)
+        wakeup_write_sock.setblocking(False)
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        signal.set_wakeup_fd(wakeup_write_sock.fileno())
+
+        selector = selectors.DefaultSelector()
+        selector.register(self._sock, selectors.EVENT_READ)
+        selector.register(wakeup_sock, selectors.EVENT_READ)
+        last_active = time.time()
+        try:
+            while self._running:
+                for key, _ in selector.select(timeout=1):
+                    if key.fileobj is wakeup_sock:
+                        while _drain(wakeup_sock):
+                            pass
+                        continue
+
+                    conn, _ = self._sock.accept()
+                    self._serve_connection(conn)
+
+                self._reap_children()
+                if self._children:
+                    last_active = time.time()
+                elif self.idle_timeout and (
+                    time.time() - last_active > self.idle_timeout
+                ):
+                    LOG.info("Stopping idle daemon")
+                    break
+
+        finally:
+            selector.close()
+            self._sock.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+            # Running commands are let to finish
+            self._reap_children(wait=True)
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            wakeup_sock.close()
+            wakeup_write_sock.close()
+
+    def _listen(self):
+        """Binds the socket, accessible only to the user"""
+
+        socket_dir = os.path.dirname(os.path.abspath(self.socket_path))
+        os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o177)
+        try:
+            self._sock.bind(self.socket_path)
+        finally:
+            os.umask(umask)
+        self._sock.listen(16)
+
+    def _serve_connection(self, conn):
+        """Serves the request of connection. Connections of commands run
+        are kept open till the command exits (see `_reap_children`)."""
+
+        # Requests are sent right after connecting
+        conn.settimeout(REQUEST_TIMEOUT)
+        try:
+            self._handle(conn)
+        except Exception:
+            LOG.error("Failed to serve request\n{}".format(traceback.format_exc()))
+
+        if conn not in self._children.values():
+            conn.close()
+
+    def _reap_children(self, wait=False):
+        """Reports the exit code of exited commands to their clients"""
+
+        for pid, conn in list(self._children.items()):
+            try:
+                exited_pid, status = os.waitpid(pid, 0 if wait else os.WNOHANG)
+            except ChildProcessError:
+                exited_pid, status = pid, None
+
+            # Still running
+            if exited_pid == 0:
+                continue
+
+            self._children.pop(pid)
+            if status is None:
+                exit_code = 1
+            elif os.WIFSIGNALED(status):
+                exit_code = 128 + os.WTERMSIG(status)
+            else:
+                exit_code = os.WEXITSTATUS(status)
+
+            try:
+                send_message(conn, {"exit_code": exit_code})
+            except OSError:
+                LOG.debug("Client of command {} has gone away".format(pid))
+            finally:
+                conn.close()
+
+    def _handle(self, conn):
+        message, fds = recv_message(conn)
+        op = message.get("op", None)
+
+        try:
+            if op == "run":
+                self._run(conn, message, fds)
+
+            elif op == "ping":
+                send_message(
+                    conn,
+                    {
+                        "pid": os.getpid(),
+                        "uptime": int(time.time() - self.start_time),
+                        "commands_run": self.commands_run,
+                        "commands_running": len(self._children),
+                        "config_file": self.config_file,
+                    },
+                )
+
+            elif op == "stop":
+                self._running = False
+                send_message(conn, {"pid": os.getpid()})
+
+            else:
+                send_message(conn, {"error": "Invalid op {}".format(op)})
+
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+    def _run(self, conn, message, fds):
+        """Runs the command in a forked child and reports its exit code"""
+
+        # Commands are run only with the config the daemon was loaded with
+        config_file = get_config_file(message["cwd"])
+        if config_file != self.config_file:
+            send_message(conn, {"fallback": "Different config file"})
+            return
+
+        config_mtime = None
+        if os.path.isfile(config_file):
+            config_mtime = os.path.getmtime(config_file)
+        if config_mtime != self.config_mtime:
+            LOG.info("Config file has changed, stopping daemon")
+            self._running = False
+            send_message(conn, {"fallback": "Config file changed"})
+            return
+
+        if len(fds) != 3:
+            send_message(conn, {"fallback": "Standard streams not received"})
+            return
+
+        LOG.debug("Running command: {}".format(message["argv"]))
+        pid = os.fork()
+        if pid == 0:
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            for sock in [self._sock, conn] + list(self._children.values()):
+                sock.close()
+            for sock in self._wakeup_socks or []:
+                sock.close()
+            self._exec_command(message, fds)
+
+        self.commands_run += 1
+        self._children[pid] = conn
+        conn.settimeout(None)
+        send_message(conn, {"pid": pid})
+
+    @staticmethod
+    def _exec_command(message, fds):
+        """Runs the command in (forked) child process. Never returns."""
+
+        exit_code = 1
+        try:
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            for std_fd, fd in enumerate(fds):
+                os.dup2(fd, std_fd)
+                os.close(fd)
+
+            os.chdir(message["cwd"])
+            os.environ.clear()
+            os.environ.update(message["env"])
+            sys.argv = ["calm"] + message["argv"]
+            if sys.stdout.isatty():
+                sys.stdout.reconfigure(line_buffering=True)
+
+            from calm.dsl.cli import main
+
+            main(args=message["argv"], prog_name="calm")
+            exit_code = 0
+
+        except SystemExit as exc:
+            exit_code = _get_exit_code(exc.code)
+
+        except KeyboardInterrupt:
+            exit_code = 130
+
+        except BaseException:
+            traceback.print_exc()
+
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(exit_code)
+
+
+def start_daemon(socket_path=None, idle_timeout=0, log_file=None, wait=10):
+    """Starts the daemon in background, returns its pid"""
+
+    socket_path = socket_path or get_socket_path()
+    socket_dir = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+    if log_file is None:
+        log_file = os.path.join(socket_dir, "daemon.log")
+
+    cmd = [
+        sys.executable,
+        "-m",
+        "calm.dsl.daemon.server",
+        "--socket",
+        socket_path,
+        "--idle-timeout",
+        str(idle_timeout),
+    ]
+    with open(log_file, "ab") as log_fd, open(os.devnull, "rb") as null_fd:
+        process = subprocess.Popen(
+            cmd, stdin=null_fd, stdout=log_fd, stderr=log_fd, start_new_session=True
+        )
+
+    deadline = time.time() + wait
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise Exception(
+                "Calm daemon exited with code {}, see {}".format(
+                    process.returncode, log_file
+                )
+            )
+
+        if request("ping", socket_path):
+            return process.pid
+        time.sleep(0.1)
+
+    raise Exception("Calm daemon did not start in {} seconds".format(wait))
+
+
+@click.command()
+@click.option("--socket", "socket_path", default=None, help="Path of unix socket")
+@click.option(
+    "--idle-timeout", default=0, type=int, help="Seconds after which idle daemon exits"
+)
+def main(socket_path, idle_timeout):
+    """Runs the calm daemon in foreground"""
+
+    Daemon(socket_path, idle_timeout=idle_timeout).serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,15 @@
 import atexit
 
 from calm.dsl.config import get_config
-from .table_config import dsl_database, SecretTable, DataTable, CacheTable
+from .table_config import (
+    dsl_database,
+    SecretTable,
+    DataTable,
+    CacheTable,
+    CacheMetaTable,
+    ResponseCacheTable,
+    SessionTable,
+)
 from calm.dsl.tools import get_logging_handle
 
 LOG = get_logging_handle(__name__)
@@ -31,6 +39,9 @@ class Database:
         self.secret_table = self.set_and_verify(SecretTable)
         self.data_table = self.set_and_verify(DataTable)
         self.cache_table = self.set_and_verify(CacheTable)
+        self.cache_meta_table = self.set_and_verify(CacheMetaTable)
+        self.response_cache_table = self.set_and_verify(ResponseCacheTable)
+        self.session_table = self.set_and_verify(SessionTable)
 
     def set_and_verify(self, table_cls):
         """ Verify whether this class exists in db
@@ -4,6 +4,8 @@ from peewee import (
     CharField,
     BlobField,
     DateTimeField,
+    IntegerField,
+    BigIntegerField,
     ForeignKeyField,
     CompositeKey,
 )
@@ -50,7 +52,7 @@ class CacheTable(BaseModel):
     entity_name = CharField()
     entity_uuid = CharField()
     entity_list_api_suffix = CharField()
-    last_update_time = DateTimeField(default=datetime.datetime.now())
+    last_update_time = DateTimeField(default=datetime.datetime.now)
 
     def get_detail_dict(self):
         return {
@@ -63,3 +65,47 @@ class CacheTable(BaseModel):
     class Meta:
         database = dsl_database
         primary_key = CompositeKey("entity_type", "entity_name")
+
+
+class CacheMetaTable(BaseModel):
+    entity_type = CharField(primary_key=True)
+    # Latest `metadata.last_update_time` (usecs) of the entities synced
+    max_update_time = BigIntegerField(default=0)
+    last_sync_time = DateTimeField(default=datetime.datetime.now)
+
+    def get_detail_dict(self):
+        return {
+            "type": self.entity_type,
+            "max_update_time": self.max_update_time,
+            "last_sync_time": self.last_sync_time,
+        }
+
+
+class ResponseCacheTable(BaseModel):
+    key = CharField(primary_key=True)
+    url = CharField()
+    validator = CharField()
+    headers = BlobField()
+    content = BlobField()
+    size = IntegerField()
+    last_access_time = DateTimeField(default=datetime.datetime.now)
+
+    def get_detail_dict(self):
+        return {
+            "url": self.url,
+            "validator": self.validator,
+            "size": self.size,
+            "last_access_time": self.last_access_time,
+        }
+
+
+class SessionTable(BaseModel):
+    key = CharField(primary_key=True)
+    kdf_salt = BlobField()
+    ciphertext = BlobField()
+    iv = BlobField()
+    auth_tag = BlobField()
+    last_update_time = DateTimeField(default=datetime.datetime.now)
+
+    def generate_enc_msg(self):
+        return (self.kdf_salt, self.ciphertext, self.iv, self.auth_tag)
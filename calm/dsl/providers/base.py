@@ -7,6 +7,7 @@ from jinja2 import Environment, PackageLoader
 import jsonref
 from calm.dsl.tools import StrictDraft7Validator
 from calm.dsl.tools import get_logging_handle
+from calm.dsl.store import Cache
 
 LOG = get_logging_handle(__name__)
 
@@ -28,6 +29,10 @@ class ProviderBase:
             # Register Provider
             cls.providers[provider_type] = cls
 
+            # Register inventories of Provider looked up from cache
+            for cache_entity in cls.cache_entities:
+                Cache.register(cache_entity)
+
 
 class Provider(ProviderBase):
 
@@ -35,6 +40,9 @@ class Provider(ProviderBase):
     spec_template_file = None
     package_name = None
 
+    # Kinds of entities (CacheEntity) looked up while creating spec
+    cache_entities = []
+
     @classmethod
     def _init(cls):
 
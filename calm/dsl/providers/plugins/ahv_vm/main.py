@@ -57,14 +57,9 @@ class AHV:
 
     def images(self, image_type="DISK_IMAGE"):
         Obj = get_resource_api(ahv.IMAGES, self.connection)
-        res, err = Obj.list()
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        res = res.json()
         img_name_uuid_map = {}
 
-        for image in res["entities"]:
+        for image in Obj.iter_entities():
             img_type = image["status"]["resources"].get("image_type", None)
 
             # Ignoring images, if they don't have any image type(Ex: Karbon Image)
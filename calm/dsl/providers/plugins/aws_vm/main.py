@@ -4,6 +4,7 @@ import uuid
 
 from calm.dsl.api import get_resource_api, get_api_client
 from calm.dsl.providers import get_provider_interface
+from calm.dsl.store import Cache, CacheEntity
 from .constants import AWS as aws
 
 
@@ -16,6 +17,64 @@ class AwsVmProvider(Provider):
     package_name = __name__
     spec_template_file = "aws_vm_provider_spec.yaml.jinja2"
 
+    cache_entities = [
+        CacheEntity(
+            "AWS_MACHINE_TYPE",
+            aws.MACHINE_TYPES,
+            name_key="metadata.name",
+            uuid_key="metadata.name",
+            on_demand=True,
+        ),
+        CacheEntity(
+            "AWS_VOLUME_TYPE",
+            aws.VOLUME_TYPES,
+            name_key="metadata.name",
+            uuid_key="metadata.name",
+            on_demand=True,
+        ),
+        CacheEntity(
+            "AWS_AVAILABILITY_ZONE",
+            aws.AVAILABILTY_ZONES,
+            name_key="metadata.name",
+            uuid_key="metadata.name",
+            scopes=["account_uuid", "region"],
+        ),
+        CacheEntity(
+            "AWS_ROLE",
+            aws.ROLES,
+            name_key="metadata.name",
+            uuid_key="metadata.name",
+            scopes=["account_uuid", "region"],
+        ),
+        CacheEntity(
+            "AWS_KEY_PAIR",
+            aws.KEY_PAIRS,
+            name_key="metadata.name",
+            uuid_key="metadata.name",
+            scopes=["account_uuid", "region"],
+        ),
+        CacheEntity(
+            "AWS_VPC",
+            aws.VPCS,
+            name_key="status.resources.cidr_block",
+            uuid_key="status.resources.id",
+            scopes=["account_uuid", "region"],
+        ),
+        CacheEntity(
+            "AWS_SECURITY_GROUP",
+            aws.SECURITY_GROUPS,
+            uuid_key="status.resources.id",
+            scopes=["account_uuid", "region", "vpc_id", "include_classic_sg"],
+        ),
+        CacheEntity(
+            "AWS_SUBNET",
+            aws.SUBNETS,
+            name_key="status.resources.id",
+            uuid_key="status.resources.id",
+            scopes=["account_uuid", "region", "vpc_id", "availability_zone"],
+        ),
+    ]
+
     @classmethod
     def create_spec(cls):
         client = get_api_client()
@@ -42,47 +101,17 @@ class AWS:
         return region_list
 
     def machine_types(self):
-        Obj = get_resource_api(aws.MACHINE_TYPES, self.connection)
-        res, err = Obj.list()
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        entity_list = []
-        res = res.json()
-        for entity in res["entities"]:
-            entity_list.append(entity["metadata"]["name"])
-
-        return entity_list
+        return list(Cache.get_entities("AWS_MACHINE_TYPE"))
 
     def volume_types(self):
-        Obj = get_resource_api(aws.VOLUME_TYPES, self.connection)
-        res, err = Obj.list()
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        entity_list = []
-        res = res.json()
-        for entity in res["entities"]:
-            entity_list.append(entity["metadata"]["name"])
-
-        return entity_list
+        return list(Cache.get_entities("AWS_VOLUME_TYPE"))
 
     def availability_zones(self, account_id, region_name):
-
-        payload = {
-            "filter": "account_uuid=={};region=={}".format(account_id, region_name)
-        }
-        Obj = get_resource_api(aws.AVAILABILTY_ZONES, self.connection)
-        res, err = Obj.list(payload)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        entity_list = []
-        res = res.json()
-        for entity in res["entities"]:
-            entity_list.append(entity["metadata"]["name"])
-
-        return entity_list
+        return list(
+            Cache.get_entities(
+                "AWS_AVAILABILITY_ZONE", account_uuid=account_id, region=region_name
+            )
+        )
 
     def mixed_images(self, account_id, region_name):
         """Returns a map
@@ -111,97 +140,43 @@ class AWS:
         return result
 
     def roles(self, account_id, region_name):
-
-        payload = {
-            "filter": "account_uuid=={};region=={}".format(account_id, region_name)
-        }
-        Obj = get_resource_api(aws.ROLES, self.connection)
-        res, err = Obj.list(payload)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        entity_list = []
-        res = res.json()
-        for entity in res["entities"]:
-            entity_list.append(entity["metadata"]["name"])
-
-        return entity_list
+        return list(
+            Cache.get_entities("AWS_ROLE", account_uuid=account_id, region=region_name)
+        )
 
     def key_pairs(self, account_id, region_name):
-
-        payload = {
-            "filter": "account_uuid=={};region=={}".format(account_id, region_name)
-        }
-        Obj = get_resource_api(aws.KEY_PAIRS, self.connection)
-        res, err = Obj.list(payload)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        entity_list = []
-        res = res.json()
-        for entity in res["entities"]:
-            entity_list.append(entity["metadata"]["name"])
-
-        return entity_list
+        return list(
+            Cache.get_entities(
+                "AWS_KEY_PAIR", account_uuid=account_id, region=region_name
+            )
+        )
 
     def VPCs(self, account_id, region_name):
+        """Returns the map of cidr block to id of VPCs"""
 
-        payload = {
-            "filter": "account_uuid=={};region=={}".format(account_id, region_name)
-        }
-        Obj = get_resource_api(aws.VPCS, self.connection)
-        res, err = Obj.list(payload)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        res = res.json()
-        vpc_cidr_id_map = {}
-        for entity in res["entities"]:
-            ip_blk = entity["status"]["resources"]["cidr_block"]
-            vpc_id = entity["status"]["resources"]["id"]
-            vpc_cidr_id_map[ip_blk] = vpc_id
-
-        return vpc_cidr_id_map
+        return Cache.get_entities(
+            "AWS_VPC", account_uuid=account_id, region=region_name
+        )
 
     def security_groups(self, account_id, region_name, vpc_id, inc_classic_sg=False):
-
-        inc_classic_sg = "true" if inc_classic_sg else "false"
-        payload = {
-            "filter": "account_uuid=={};region=={};vpc_id=={};include_classic_sg=={}".format(
-                account_id, region_name, vpc_id, inc_classic_sg
-            )
-        }
-
-        Obj = get_resource_api(aws.SECURITY_GROUPS, self.connection)
-        res, err = Obj.list(payload)
-        res = res.json()
-
-        sg_name_id_map = {}
-        for entity in res["entities"]:
-            sg_id = entity["status"]["resources"]["id"]
-            name = entity["status"]["name"]
-            sg_name_id_map[name] = sg_id
-
-        return sg_name_id_map
+        return Cache.get_entities(
+            "AWS_SECURITY_GROUP",
+            account_uuid=account_id,
+            region=region_name,
+            vpc_id=vpc_id,
+            include_classic_sg="true" if inc_classic_sg else "false",
+        )
 
     def subnets(self, account_id, region_name, vpc_id, availability_zone):
-
-        payload = {
-            "filter": "account_uuid=={};region=={};vpc_id=={};availability_zone=={}".format(
-                account_id, region_name, vpc_id, availability_zone
+        return list(
+            Cache.get_entities(
+                "AWS_SUBNET",
+                account_uuid=account_id,
+                region=region_name,
+                vpc_id=vpc_id,
+                availability_zone=availability_zone,
             )
-        }
-
-        subnet_list = []
-        Obj = get_resource_api(aws.SUBNETS, self.connection)
-        res, err = Obj.list(payload)
-        res = res.json()
-
-        for entity in res["entities"]:
-            subnet_id = entity["status"]["resources"]["id"]
-            subnet_list.append(subnet_id)
-
-        return subnet_list
+        )
 
 
 def highlight_text(text, **kwargs):
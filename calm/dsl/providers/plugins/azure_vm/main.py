@@ -3,6 +3,7 @@ from ruamel import yaml
 
 from calm.dsl.api import get_resource_api, get_api_client
 from calm.dsl.providers import get_provider_interface
+from calm.dsl.store import Cache, CacheEntity
 from .constants import AZURE as azure
 
 
@@ -15,6 +16,78 @@ class AzureVmProvider(Provider):
     package_name = __name__
     spec_template_file = "azure_vm_provider_spec.yaml.jinja2"
 
+    cache_entities = [
+        CacheEntity(
+            "AZURE_RESOURCE_GROUP",
+            azure.RESOURCE_GROUPS,
+            uuid_key="status.name",
+            scopes=["account_uuid"],
+        ),
+        CacheEntity(
+            "AZURE_AVAILABILITY_SET",
+            azure.AVAILABILTY_SETS,
+            name_key="status.resources.name",
+            uuid_key="status.resources.id",
+            scopes=["account_uuid", "resource_group"],
+        ),
+        CacheEntity(
+            "AZURE_LOCATION",
+            azure.LOCATIONS,
+            name_key="status.resources.displayName",
+            uuid_key="status.resources.name",
+            scopes=["account_uuid"],
+        ),
+        CacheEntity(
+            "AZURE_CUSTOM_IMAGE",
+            azure.SUBSCRIPTION_IMAGES,
+            name_key="status.resources.name",
+            uuid_key="status.resources.id",
+            scopes=["account_uuid", "location"],
+        ),
+        CacheEntity(
+            "AZURE_IMAGE_PUBLISHER",
+            azure.IMAGE_PUBLISHERS,
+            uuid_key="status.name",
+            scopes=["account_uuid", "location"],
+        ),
+        CacheEntity(
+            "AZURE_IMAGE_OFFER",
+            azure.IMAGE_OFFERS,
+            uuid_key="status.name",
+            scopes=["account_uuid", "location", "publisher"],
+        ),
+        CacheEntity(
+            "AZURE_IMAGE_SKU",
+            azure.IMAGE_SKUS,
+            uuid_key="status.name",
+            scopes=["account_uuid", "location", "publisher", "offer"],
+        ),
+        CacheEntity(
+            "AZURE_IMAGE_VERSION",
+            azure.IMAGE_VERSIONS,
+            uuid_key="status.name",
+            scopes=["account_uuid", "location", "publisher", "offer", "sku"],
+        ),
+        CacheEntity(
+            "AZURE_SECURITY_GROUP",
+            azure.SECURITY_GROUPS,
+            uuid_key="status.name",
+            scopes=["account_uuid", "location", "resource_group"],
+        ),
+        CacheEntity(
+            "AZURE_VIRTUAL_NETWORK",
+            azure.VIRTUAL_NETWORKS,
+            uuid_key="status.name",
+            scopes=["account_uuid", "location", "resource_group"],
+        ),
+        CacheEntity(
+            "AZURE_SUBNET",
+            azure.SUBNETS,
+            uuid_key="status.name",
+            scopes=["account_uuid", "virtual_network", "resource_group"],
+        ),
+    ]
+
     @classmethod
     def create_spec(cls):
         client = get_api_client()
@@ -26,57 +99,17 @@ class Azure:
         self.connection = connection
 
     def resource_groups(self, account_id):
-        Obj = get_resource_api(azure.RESOURCE_GROUPS, self.connection)
-        payload = {"filter": "account_uuid=={};".format(account_id)}
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        res_groups = []
-        res = res.json()
-        for entity in res["entities"]:
-            res_groups.append(entity["status"]["name"])
-
-        return res_groups
+        return list(Cache.get_entities("AZURE_RESOURCE_GROUP", account_uuid=account_id))
 
     def availability_sets(self, account_id, resource_group):
-        Obj = get_resource_api(azure.AVAILABILTY_SETS, self.connection)
-        payload = {
-            "filter": "account_uuid=={};resource_group=={}".format(
-                account_id, resource_group
-            )
-        }
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        name_id_map = {}
-        res = res.json()
-        for entity in res["entities"]:
-            name = entity["status"]["resources"]["name"]
-            entity_uuid = entity["status"]["resources"]["id"]
-            name_id_map[name] = entity_uuid
-
-        return name_id_map
+        return Cache.get_entities(
+            "AZURE_AVAILABILITY_SET",
+            account_uuid=account_id,
+            resource_group=resource_group,
+        )
 
     def locations(self, account_id):
-        Obj = get_resource_api(azure.LOCATIONS, self.connection)
-        payload = {"filter": "account_uuid=={};".format(account_id)}
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        res = res.json()
-        name_value_map = {}
-        for entity in res["entities"]:
-            name = entity["status"]["resources"]["displayName"]
-            value = entity["status"]["resources"]["name"]
-            name_value_map[name] = value
-
-        return name_value_map
+        return Cache.get_entities("AZURE_LOCATION", account_uuid=account_id)
 
     def hardware_profiles(self, account_id, location):
         Obj = get_resource_api(azure.VM_SIZES, self.connection)
@@ -98,161 +131,79 @@ class Azure:
         return hwprofiles
 
     def custom_images(self, account_id, location):
-        Obj = get_resource_api(azure.SUBSCRIPTION_IMAGES, self.connection)
-        payload = {
-            "filter": "account_uuid=={};location=={}".format(account_id, location)
-        }
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        res = res.json()
-        name_id_map = {}
-        for entity in res["entities"]:
-            name = entity["status"]["resources"]["name"]
-            id = entity["status"]["resources"]["id"]
-            name_id_map[name] = id
-
-        return name_id_map
+        return Cache.get_entities(
+            "AZURE_CUSTOM_IMAGE", account_uuid=account_id, location=location
+        )
 
     def image_publishers(self, account_id, location):
-        Obj = get_resource_api(azure.IMAGE_PUBLISHERS, self.connection)
-        payload = {
-            "filter": "account_uuid=={};location=={}".format(account_id, location)
-        }
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        res = res.json()
-        entity_list = []
-        for entity in res["entities"]:
-            name = entity["status"]["name"]
-            entity_list.append(name)
-
-        return entity_list
+        return list(
+            Cache.get_entities(
+                "AZURE_IMAGE_PUBLISHER", account_uuid=account_id, location=location
+            )
+        )
 
     def image_offers(self, account_id, location, publisher):
-        Obj = get_resource_api(azure.IMAGE_OFFERS, self.connection)
-        payload = {
-            "filter": "account_uuid=={};location=={};publisher=={}".format(
-                account_id, location, publisher
+        return list(
+            Cache.get_entities(
+                "AZURE_IMAGE_OFFER",
+                account_uuid=account_id,
+                location=location,
+                publisher=publisher,
             )
-        }
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        res = res.json()
-        entity_list = []
-        for entity in res["entities"]:
-            name = entity["status"]["name"]
-            entity_list.append(name)
-
-        return entity_list
+        )
 
     def image_skus(self, account_id, location, publisher, offer):
-        Obj = get_resource_api(azure.IMAGE_SKUS, self.connection)
-        payload = {
-            "filter": "account_uuid=={};location=={};publisher=={};offer=={}".format(
-                account_id, location, publisher, offer
+        return list(
+            Cache.get_entities(
+                "AZURE_IMAGE_SKU",
+                account_uuid=account_id,
+                location=location,
+                publisher=publisher,
+                offer=offer,
             )
-        }
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        res = res.json()
-        entity_list = []
-        for entity in res["entities"]:
-            name = entity["status"]["name"]
-            entity_list.append(name)
-
-        return entity_list
+        )
 
     def image_versions(self, account_id, location, publisher, offer, sku):
-        Obj = get_resource_api(azure.IMAGE_VERSIONS, self.connection)
-        payload = {
-            "filter": "account_uuid=={};location=={};publisher=={};offer=={};sku=={}".format(
-                account_id, location, publisher, offer, sku
+        return list(
+            Cache.get_entities(
+                "AZURE_IMAGE_VERSION",
+                account_uuid=account_id,
+                location=location,
+                publisher=publisher,
+                offer=offer,
+                sku=sku,
             )
-        }
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        res = res.json()
-        entity_list = []
-        for entity in res["entities"]:
-            name = entity["status"]["name"]
-            entity_list.append(name)
-
-        return entity_list
+        )
 
     def security_groups(self, account_id, resource_group, location):
-        Obj = get_resource_api(azure.SECURITY_GROUPS, self.connection)
-        payload = {
-            "filter": "account_uuid=={};location=={};resource_group=={}".format(
-                account_id, location, resource_group
+        return list(
+            Cache.get_entities(
+                "AZURE_SECURITY_GROUP",
+                account_uuid=account_id,
+                location=location,
+                resource_group=resource_group,
             )
-        }
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        res = res.json()
-        entity_list = []
-        for entity in res["entities"]:
-            name = entity["status"]["name"]
-            entity_list.append(name)
-
-        return entity_list
+        )
 
     def virtual_networks(self, account_id, resource_group, location):
-        Obj = get_resource_api(azure.VIRTUAL_NETWORKS, self.connection)
-        payload = {
-            "filter": "account_uuid=={};location=={};resource_group=={}".format(
-                account_id, location, resource_group
+        return list(
+            Cache.get_entities(
+                "AZURE_VIRTUAL_NETWORK",
+                account_uuid=account_id,
+                location=location,
+                resource_group=resource_group,
             )
-        }
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        res = res.json()
-        entity_list = []
-        for entity in res["entities"]:
-            name = entity["status"]["name"]
-            entity_list.append(name)
-
-        return entity_list
+        )
 
     def subnets(self, account_id, resource_group, virtual_network):
-        Obj = get_resource_api(azure.SUBNETS, self.connection)
-        payload = {
-            "filter": "account_uuid=={};virtual_network=={};resource_group=={}".format(
-                account_id, virtual_network, resource_group
+        return list(
+            Cache.get_entities(
+                "AZURE_SUBNET",
+                account_uuid=account_id,
+                virtual_network=virtual_network,
+                resource_group=resource_group,
             )
-        }
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        res = res.json()
-        entity_list = []
-        for entity in res["entities"]:
-            name = entity["status"]["name"]
-            entity_list.append(name)
-
-        return entity_list
+        )
 
 
 def highlight_text(text, **kwargs):
@@ -3,6 +3,7 @@ from ruamel import yaml
 
 from calm.dsl.api import get_resource_api, get_api_client
 from calm.dsl.providers import get_provider_interface
+from calm.dsl.store import Cache, CacheEntity
 from .constants import GCP as gcp
 
 
@@ -15,6 +16,38 @@ class GcpVmProvider(Provider):
     package_name = __name__
     spec_template_file = "gcp_vm_provider_spec.yaml.jinja2"
 
+    cache_entities = [
+        CacheEntity(
+            "GCP_ZONE",
+            gcp.ZONES,
+            uuid_key="status.name",
+            scopes=["account_uuid", "region"],
+        ),
+        CacheEntity(
+            "GCP_MACHINE_TYPE",
+            gcp.MACHINE_TYPES,
+            name_key="status.resources.name",
+            uuid_key="status.resources.selfLink",
+            scopes=["account_uuid", "zone"],
+        ),
+    ] + [
+        CacheEntity(
+            entity_type,
+            api,
+            name_key="status.resources.name",
+            uuid_key="status.resources.selfLink",
+            scopes=["account_uuid", "zone"],
+            filter="unused==true;private_only==true",
+        )
+        for entity_type, api in [
+            ("GCP_PERSISTENT_DISK", gcp.PERSISTENT_DISKS),
+            ("GCP_SNAPSHOT", gcp.SNAPSHOTS),
+            ("GCP_IMAGE", gcp.DISK_IMAGES),
+            ("GCP_NETWORK", gcp.NETWORKS),
+            ("GCP_SUBNETWORK", gcp.SUBNETWORKS),
+        ]
+    ]
+
     @classmethod
     def create_spec(cls):
         client = get_api_client()
@@ -26,78 +59,22 @@ class GCP:
         self.connection = connection
 
     def zones(self, account_id, region="undefined"):
-        Obj = get_resource_api(gcp.ZONES, self.connection)
-        payload = {"filter": "account_uuid=={};region=={}".format(account_id, region)}
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        entity_list = []
-        res = res.json()
-        for entity in res["entities"]:
-            entity_list.append(entity["status"]["name"])
-
-        return entity_list
+        return list(
+            Cache.get_entities("GCP_ZONE", account_uuid=account_id, region=region)
+        )
 
     def machine_types(self, account_id, zone):
-        Obj = get_resource_api(gcp.MACHINE_TYPES, self.connection)
-        payload = {"filter": "account_uuid=={};zone=={}".format(account_id, zone)}
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        entity_map = {}
-        res = res.json()
-        for entity in res["entities"]:
-            name = entity["status"]["resources"]["name"]
-            selfLink = entity["status"]["resources"]["selfLink"]
-            entity_map[name] = selfLink
-
-        return entity_map
+        return Cache.get_entities(
+            "GCP_MACHINE_TYPE", account_uuid=account_id, zone=zone
+        )
 
     def persistent_disks(self, account_id, zone):
-        Obj = get_resource_api(gcp.PERSISTENT_DISKS, self.connection)
-        payload = {
-            "filter": "account_uuid=={};zone=={};unused==true;private_only==true".format(
-                account_id, zone
-            )
-        }
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        entity_map = {}
-        res = res.json()
-        for entity in res["entities"]:
-            name = entity["status"]["resources"]["name"]
-            self_link = entity["status"]["resources"]["selfLink"]
-            entity_map[name] = self_link
-
-        return entity_map
+        return Cache.get_entities(
+            "GCP_PERSISTENT_DISK", account_uuid=account_id, zone=zone
+        )
 
     def snapshots(self, account_id, zone):
-        Obj = get_resource_api(gcp.SNAPSHOTS, self.connection)
-        payload = {
-            "filter": "account_uuid=={};zone=={};unused==true;private_only==true".format(
-                account_id, zone
-            )
-        }
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        entity_map = {}
-        res = res.json()
-        for entity in res["entities"]:
-            name = entity["status"]["resources"]["name"]
-            selfLink = entity["status"]["resources"]["selfLink"]
-            entity_map[name] = selfLink
-
-        return entity_map
+        return Cache.get_entities("GCP_SNAPSHOT", account_uuid=account_id, zone=zone)
 
     def configured_public_images(self, account_id):
         Obj = get_resource_api("accounts", self.connection)
@@ -116,25 +93,7 @@ class GCP:
         return public_image_map
 
     def images(self, account_id, zone):
-        Obj = get_resource_api(gcp.DISK_IMAGES, self.connection)
-        payload = {
-            "filter": "account_uuid=={};zone=={};unused==true;private_only==true".format(
-                account_id, zone
-            )
-        }
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        entity_map = {}
-        res = res.json()
-        for entity in res["entities"]:
-            name = entity["status"]["resources"]["name"]
-            selfLink = entity["status"]["resources"]["selfLink"]
-            entity_map[name] = selfLink
-
-        return entity_map
+        return Cache.get_entities("GCP_IMAGE", account_uuid=account_id, zone=zone)
 
     def disk_images(self, account_id, zone):
         """
@@ -149,46 +108,10 @@ class GCP:
         return image_map
 
     def networks(self, account_id, zone):
-        Obj = get_resource_api(gcp.NETWORKS, self.connection)
-        payload = {
-            "filter": "account_uuid=={};zone=={};unused==true;private_only==true".format(
-                account_id, zone
-            )
-        }
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        entity_map = {}
-        res = res.json()
-        for entity in res["entities"]:
-            name = entity["status"]["resources"]["name"]
-            selfLink = entity["status"]["resources"]["selfLink"]
-            entity_map[name] = selfLink
-
-        return entity_map
+        return Cache.get_entities("GCP_NETWORK", account_uuid=account_id, zone=zone)
 
     def subnetworks(self, account_id, zone):
-        Obj = get_resource_api(gcp.SUBNETWORKS, self.connection)
-        payload = {
-            "filter": "account_uuid=={};zone=={};unused==true;private_only==true".format(
-                account_id, zone
-            )
-        }
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        entity_map = {}
-        res = res.json()
-        for entity in res["entities"]:
-            name = entity["status"]["resources"]["name"]
-            selfLink = entity["status"]["resources"]["selfLink"]
-            entity_map[name] = selfLink
-
-        return entity_map
+        return Cache.get_entities("GCP_SUBNETWORK", account_uuid=account_id, zone=zone)
 
     def network_tags(self, account_id):
         Obj = get_resource_api(gcp.FIREWALLS, self.connection)
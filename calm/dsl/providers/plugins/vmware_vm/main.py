@@ -3,6 +3,7 @@ from ruamel import yaml
 
 from calm.dsl.api import get_resource_api, get_api_client
 from calm.dsl.providers import get_provider_interface
+from calm.dsl.store import Cache, CacheEntity
 from .constants import VCENTER as vmw
 
 
@@ -15,6 +16,51 @@ class VCenterVmProvider(Provider):
     package_name = __name__
     spec_template_file = "vmware_vm_provider_spec.yaml.jinja2"
 
+    cache_entities = [
+        CacheEntity(
+            "VMWARE_HOST",
+            vmw.HOST,
+            name_key="status.resources.name",
+            uuid_key="status.resources.summary.hardware.uuid",
+            scopes=["account_uuid"],
+        ),
+        CacheEntity(
+            "VMWARE_DATASTORE",
+            vmw.DATASTORE,
+            name_key="status.resources.name",
+            uuid_key="status.resources.summary.url",
+            scopes=["account_uuid", "host_id", "cluster_name"],
+        ),
+        CacheEntity(
+            "VMWARE_CLUSTER",
+            vmw.CLUSTER,
+            name_key="status.resources.name",
+            uuid_key="status.resources.name",
+            scopes=["account_uuid"],
+        ),
+        CacheEntity(
+            "VMWARE_STORAGE_POD",
+            vmw.STORAGE_POD,
+            name_key="status.resources.name",
+            uuid_key="status.resources.name",
+            scopes=["account_uuid"],
+        ),
+        CacheEntity(
+            "VMWARE_TEMPLATE",
+            vmw.TEMPLATE,
+            name_key="status.resources.name",
+            uuid_key="status.resources.config.instanceUuid",
+            scopes=["account_uuid"],
+        ),
+        CacheEntity(
+            "VMWARE_NETWORK",
+            vmw.NETWORK,
+            name_key="status.resources.name",
+            uuid_key="status.resources.id",
+            scopes=["account_uuid", "host_id", "cluster_name"],
+        ),
+    ]
+
     @classmethod
     def create_spec(cls):
         client = get_api_client()
@@ -32,111 +78,36 @@ class VCenter:
         self.connection = connection
 
     def hosts(self, account_id):
-        Obj = get_resource_api(vmw.HOST, self.connection)
-        payload = {"filter": "account_uuid=={};".format(account_id)}
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        name_id_map = {}
-        res = res.json()
-        for entity in res["entities"]:
-            name = entity["status"]["resources"]["name"]
-            entity_uuid = entity["status"]["resources"]["summary"]["hardware"]["uuid"]
-            name_id_map[name] = entity_uuid
-
-        return name_id_map
+        return Cache.get_entities("VMWARE_HOST", account_uuid=account_id)
 
     def datastores(self, account_id, cluster_name=None, host_id=None):
-        Obj = get_resource_api(vmw.DATASTORE, self.connection)
-        payload = ""
-        if host_id:
-            payload = {
-                "filter": "account_uuid=={};host_id=={}".format(account_id, host_id)
-            }
-
+        # Datastores of cluster, if given
         if cluster_name:
-            payload = {
-                "filter": "account_uuid=={};cluster_name=={}".format(
-                    account_id, cluster_name
-                )
-            }
-
-        res, err = Obj.list(payload)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
+            host_id = None
 
-        res = res.json()
-        name_url_map = {}
-        for entity in res["entities"]:
-            name = entity["status"]["resources"]["name"]
-            url = entity["status"]["resources"]["summary"]["url"]
-            name_url_map[name] = url
-
-        return name_url_map
+        return Cache.get_entities(
+            "VMWARE_DATASTORE",
+            account_uuid=account_id,
+            host_id=host_id,
+            cluster_name=cluster_name,
+        )
 
     def clusters(self, account_id):
-        Obj = get_resource_api(vmw.CLUSTER, self.connection)
-        payload = {"filter": "account_uuid=={};".format(account_id)}
-
-        res, err = Obj.list(payload)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        cluster_list = []
-        res = res.json()
-        for entity in res["entities"]:
-            name = entity["status"]["resources"]["name"]
-            cluster_list.append(name)
-
-        return cluster_list
+        return list(Cache.get_entities("VMWARE_CLUSTER", account_uuid=account_id))
 
     def storage_pods(self, account_id):
-        Obj = get_resource_api(vmw.STORAGE_POD, self.connection)
-        payload = {"filter": "account_uuid=={};".format(account_id)}
-
-        res, err = Obj.list(payload)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        res = res.json()
-        pod_list = []
-        for entity in res["entities"]:
-            name = entity["status"]["resources"]["name"]
-            pod_list.append(name)
-
-        return pod_list
+        return list(Cache.get_entities("VMWARE_STORAGE_POD", account_uuid=account_id))
 
     def templates(self, account_id):
-        Obj = get_resource_api(vmw.TEMPLATE, self.connection)
-        payload = {"filter": "account_uuid=={};".format(account_id)}
-        res, err = Obj.list(payload)
-
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        res = res.json()
-        name_id_map = {}
-        for entity in res["entities"]:
-            name = entity["status"]["resources"]["name"]
-            temp_id = entity["status"]["resources"]["config"]["instanceUuid"]
-            name_id_map[name] = temp_id
-
-        return name_id_map
+        return Cache.get_entities("VMWARE_TEMPLATE", account_uuid=account_id)
 
     def customizations(self, account_id, os):
 
         Obj = get_resource_api(vmw.CUSTOMIZATION, self.connection)
         payload = {"filter": "account_uuid=={};".format(account_id)}
 
-        res, err = Obj.list(payload)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        res = res.json()
         cust_list = []
-        for entity in res["entities"]:
+        for entity in Obj.iter_entities(payload):
             if entity["status"]["resources"]["type"] == os:
                 cust_list.append(entity["status"]["resources"]["name"])
 
@@ -147,13 +118,8 @@ class VCenter:
         Obj = get_resource_api(vmw.TIMEZONE, self.connection)
         payload = {"filter": "guest_os=={};".format(os)}
 
-        res, err = Obj.list(payload)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        res = res.json()
         name_ind_map = {}
-        for entity in res["entities"]:
+        for entity in Obj.iter_entities(payload):
             name = entity["status"]["resources"]["name"]
             ind = entity["status"]["resources"]["index"]
             name_ind_map[name] = ind
@@ -161,33 +127,16 @@ class VCenter:
         return name_ind_map
 
     def networks(self, account_id, host_id=None, cluster_name=None):
-        Obj = get_resource_api(vmw.NETWORK, self.connection)
-        payload = ""
-        if host_id:
-            payload = {
-                "filter": "account_uuid=={};host_id=={}".format(account_id, host_id)
-            }
-
+        # Networks of cluster, if given
         if cluster_name:
-            payload = {
-                "filter": "account_uuid=={};cluster_name=={}".format(
-                    account_id, cluster_name
-                )
-            }
-
-        res, err = Obj.list(payload)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
+            host_id = None
 
-        res = res.json()
-        name_id_map = {}
-        for entity in res["entities"]:
-            name = entity["status"]["resources"]["name"]
-            entity_id = entity["status"]["resources"]["id"]
-
-            name_id_map[name] = entity_id
-
-        return name_id_map
+        return Cache.get_entities(
+            "VMWARE_NETWORK",
+            account_uuid=account_id,
+            host_id=host_id,
+            cluster_name=cluster_name,
+        )
 
     def file_paths(
         self,
@@ -219,13 +168,8 @@ class VCenter:
                 )
             }
 
-        res, err = Obj.list(payload)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        res = res.json()
         fpaths = []
-        for entity in res["entities"]:
+        for entity in Obj.iter_entities(payload):
             fpaths.append(entity["status"]["resources"])
 
         return fpaths
@@ -1,4 +1,4 @@
 from .secrets import Secret
-from .cache import Cache
+from .cache import Cache, CacheEntity
 
-__all__ = [Secret, Cache]
+__all__ = [Secret, Cache, CacheEntity]
@@ -1,27 +1,206 @@
+import ast
+import contextlib
+import datetime
+import functools
+from collections import OrderedDict
+
 import peewee
 
 from ..db import get_db_handle
 from calm.dsl.api import get_resource_api, get_api_client
+from calm.dsl.api.groups import GroupsQuery
+from calm.dsl.config import get_config
 from calm.dsl.tools import get_logging_handle
 
 LOG = get_logging_handle(__name__)
 
+# Number of (entity type, name) lookups memoized in process
+LOOKUP_CACHE_SIZE = 4096
+
+# Rows per insert statement (sqlite limits the variables of a statement)
+INSERT_BATCH_SIZE = 100
+
+# Page length of list calls fetching the entities changed since last sync
+DELTA_PAGE_SIZE = 50
+
+# Seconds after which the entities of a type synced are refreshed on lookup
+DEFAULT_TTL = 3600
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+# Entity types checked for staleness and synced by lookups, in lazy_sync
+_lazy_sync_state = None
+
+
+def _get_update_time(metadata):
+    """Returns the last_update_time of entity metadata (RFC 3339 string, or
+    usecs since epoch) in usecs"""
+
+    value = str(metadata.get("last_update_time", None) or 0)
+    if value.isdigit():
+        return int(value)
+
+    update_time = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if update_time.tzinfo is None:
+        update_time = update_time.replace(tzinfo=datetime.timezone.utc)
+
+    return (update_time - EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def _get_name_uuid_map(uuid_name_map):
+    """Returns the name-uuid map of entities. Uuids of entities having the
+    same name are stored as list"""
+
+    name_uuid_map = {}
+    for uuid, name in sorted(uuid_name_map.items()):
+        if name not in name_uuid_map:
+            name_uuid_map[name] = uuid
+        elif isinstance(name_uuid_map[name], list):
+            name_uuid_map[name].append(uuid)
+        else:
+            name_uuid_map[name] = [name_uuid_map[name], uuid]
+
+    return name_uuid_map
+
+
+def _get_path(data, path):
+    """Returns the value at dotted path (Ex: status.resources.name) of data"""
+
+    for key in path.split("."):
+        data = data[key]
+    return data
+
+
+@functools.lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def _lookup_entity_uuid(entity_type, entity_name):
+    """Returns the uuid of entity stored in db, None if not present"""
+
+    db = get_db_handle()
+    try:
+        entity = db.cache_table.get(
+            (db.cache_table.entity_type == entity_type)
+            & (db.cache_table.entity_name == entity_name)
+        )
+        return entity.entity_uuid
+
+    except peewee.DoesNotExist:
+        return None
+
+
+class CacheEntity:
+    def __init__(
+        self,
+        entity_type,
+        api,
+        name_key="status.name",
+        uuid_key="metadata.uuid",
+        scopes=None,
+        filter=None,
+        groups_entity_type=None,
+        on_demand=False,
+    ):
+        """Kind of entities stored in cache (see `Cache.register`)
+
+        Args:
+            entity_type (str): type of entities (Ex: AWS_VPC)
+            api (str): resource type of list api of entities (Ex: aws/vpcs)
+            name_key (str): path of the name of entity, by which entities
+                            are looked up (Ex: status.resources.name)
+            uuid_key (str): path of the value stored for entity name
+            scopes (list): filter attributes scoping the entities (Ex:
+                           ["account_uuid", "region"]). Entities of every
+                           scope are stored separately.
+            filter (str): filter criteria added to list calls
+            groups_entity_type (str): entity type of groups api, if entities
+                                      can be synced incrementally (see
+                                      `Cache.sync`). Not supported with
+                                      scopes or filter, as groups api
+                                      does not apply them.
+            on_demand (bool): sync the entities by sync of all types only
+                              once they are looked up (as for scoped
+                              types). Ex: inventories of providers not
+                              used on every setup
+        """
+        if groups_entity_type and (scopes or filter):
+            raise ValueError(
+                "Entities of {} with scopes or filter cannot be synced "
+                "incrementally".format(entity_type)
+            )
+
+        self.entity_type = entity_type
+        self.api = api
+        self.name_key = name_key
+        self.uuid_key = uuid_key
+        self.scopes = list(scopes or [])
+        self.filter = filter
+        self.groups_entity_type = groups_entity_type
+        self.on_demand = on_demand
+
+    def get_scope_filter(self, scope):
+        """Returns the filter criteria of scope (dict)"""
+
+        unknown_scopes = set(scope).difference(self.scopes)
+        if unknown_scopes:
+            raise ValueError(
+                "Invalid scopes {} of {}".format(
+                    sorted(unknown_scopes), self.entity_type
+                )
+            )
+
+        return ";".join(
+            "{}=={}".format(key, scope[key])
+            for key in self.scopes
+            if scope.get(key, None) is not None
+        )
+
+    def get_name(self, entity):
+        return _get_path(entity, self.name_key)
+
+    def get_uuid(self, entity):
+        return _get_path(entity, self.uuid_key)
+
 
 class Cache:
     """Cache class Implementation"""
 
-    # TODO move this mapping to constants(api may change)
-    entity_type_api_map = {
-        "AHV_DISK_IMAGE": "images",
-        "AHV_SUBNET": "subnets",
-        "AHV_NETWORK_FUNCTION_CHAIN": "network_function_chains",
-        "PROJECT": "projects",
-    }
+    # Kinds of entities stored in cache, by entity type
+    registry = OrderedDict()
+
+    @classmethod
+    def register(cls, cache_entity):
+        """Registers the kind of entities (CacheEntity) stored in cache.
+        Providers declare the inventories they look up in `cache_entities`"""
+
+        cls.registry[cache_entity.entity_type] = cache_entity
 
     @classmethod
     def get_entity_types(cls):
         """Entity types used in the cache"""
-        return list(cls.entity_type_api_map.keys())
+        return list(cls.registry.keys())
+
+    @classmethod
+    def get_cache_entity(cls, entity_type):
+        """Returns the CacheEntity of (scoped) entity_type"""
+
+        entity_type = entity_type.split(":", 1)[0]
+        if entity_type not in cls.registry:
+            LOG.debug("Registered entity types: {}".format(cls.get_entity_types()))
+            raise ValueError("Entity type {} not registered".format(entity_type))
+
+        return cls.registry[entity_type]
+
+    @classmethod
+    def get_scoped_type(cls, entity_type, scope=None):
+        """Returns the entity type by which entities of entity_type in scope
+        are stored (Ex: AWS_VPC:account_uuid==<uuid>;region==us-east-1)"""
+
+        if not scope:
+            return entity_type
+
+        scope_filter = cls.get_cache_entity(entity_type).get_scope_filter(scope)
+        return (
+            "{}:{}".format(entity_type, scope_filter) if scope_filter else entity_type
+        )
 
     @classmethod
     def create(cls, entity_type="", entity_name="", entity_uuid=""):
@@ -32,70 +211,462 @@ class Cache:
             entity_type=entity_type,
             entity_name=entity_name,
             entity_uuid=entity_uuid,
-            entity_list_api_suffix=cls.entity_type_api_map[entity_type],
+            entity_list_api_suffix=cls.get_cache_entity(entity_type).api,
         )
+        _lookup_entity_uuid.cache_clear()
 
     @classmethod
-    def get_entity_uuid(cls, entity_type, entity_name):
-        """Returns the uuid of entity present"""
+    def get_entity_uuid(cls, entity_type, entity_name, **scope):
+        """Returns the uuid of entity present. Lookups are served from an
+        in process LRU, backed by the (entity_type, entity_name) primary key
+        index of the cache table.
+
+        Within `lazy_sync`, entity_type is synced first if it is stale, or
+        if the entity is not present (once per context)."""
+
+        entity_type = cls.get_scoped_type(entity_type, scope)
+        entity_uuid = _lookup_entity_uuid(entity_type, entity_name)
+        state = _lazy_sync_state
+        if state is None or entity_type in state["synced"]:
+            return entity_uuid
+
+        is_stale = entity_type not in state["checked"] and cls.is_stale(entity_type)
+        state["checked"].add(entity_type)
+        if entity_uuid is None or is_stale:
+            LOG.debug("Syncing {} entities".format(entity_type))
+            state["synced"].add(entity_type)
+            cls._sync_scoped_types([entity_type])
+            entity_uuid = _lookup_entity_uuid(entity_type, entity_name)
+
+        return entity_uuid
+
+    @classmethod
+    def get_entities(cls, entity_type, **scope):
+        """Returns the name-uuid map (ordered by name) of entities of
+        entity_type in scope (Ex: account_uuid, region), served from cache.
+        Entities are synced first if they are stale (see `is_stale`).
+
+        Raises:
+            Exception: If entities were never synced, and cannot be fetched
+        """
+
+        entity_type = cls.get_scoped_type(entity_type, scope)
+        if cls.is_stale(entity_type):
+            err = cls._sync_scoped_types([entity_type])[entity_type]
+            if err and cls.get_max_update_time(entity_type) is None:
+                raise Exception(err)
+
+        db = get_db_handle()
+        query = (
+            db.cache_table.select()
+            .where(db.cache_table.entity_type == entity_type)
+            .order_by(db.cache_table.entity_name)
+        )
+        name_uuid_map = OrderedDict()
+        for entity in query:
+            uuids = entity.entity_uuid
+            # Entities having same name are stored as list of uuids
+            if uuids.startswith("["):
+                uuids = ast.literal_eval(uuids)[-1]
+            name_uuid_map[entity.entity_name] = uuids
+
+        return name_uuid_map
+
+    @classmethod
+    @contextlib.contextmanager
+    def lazy_sync(cls, enabled=True):
+        """Context in which entity types are synced on lookup (see
+        `get_entity_uuid`), so only the types looked up are synced, and only
+        if needed.
+
+        Ex: Entity types used by a blueprint are synced while compiling it
+
+        with Cache.lazy_sync():
+            bp_payload = compile_blueprint(bp_file)
+
+        Args:
+            enabled (bool): False disables sync on lookup in the context
+        """
+
+        global _lazy_sync_state
+
+        state = _lazy_sync_state
+        if not enabled:
+            _lazy_sync_state = None
+        elif state is None:
+            _lazy_sync_state = {"checked": set(), "synced": set()}
+
+        try:
+            yield
+        finally:
+            _lazy_sync_state = state
+
+    @classmethod
+    def _get_rows(cls, entity_type, name_uuid_map):
+
+        api_suffix = cls.get_cache_entity(entity_type).api
+        update_time = datetime.datetime.now()
+        return [
+            {
+                "entity_type": entity_type,
+                "entity_name": name,
+                "entity_uuid": uuid,
+                "entity_list_api_suffix": api_suffix,
+                "last_update_time": update_time,
+            }
+            for name, uuid in name_uuid_map.items()
+        ]
+
+    @classmethod
+    def _set_max_update_time(cls, entity_type, max_update_time):
+        """Stores the high water mark of entity_type synced. None forgets it,
+        so the next sync of entity_type is a full one"""
+
+        db = get_db_handle()
+        if max_update_time is None:
+            db.cache_meta_table.delete().where(
+                db.cache_meta_table.entity_type == entity_type
+            ).execute()
+            return
+
+        db.cache_meta_table.replace(
+            entity_type=entity_type,
+            max_update_time=max_update_time,
+            last_sync_time=datetime.datetime.now(),
+        ).execute()
+
+    @classmethod
+    def _get_sync_state(cls, entity_type):
 
         db = get_db_handle()
         try:
-            entity = db.cache_table.get(
+            return db.cache_meta_table.get_by_id(entity_type)
+
+        except peewee.DoesNotExist:
+            return None
+
+    @classmethod
+    def get_max_update_time(cls, entity_type):
+        """Returns the latest last_update_time (usecs) of entities of
+        entity_type synced, None if entity_type was never synced"""
+
+        sync_state = cls._get_sync_state(entity_type)
+        return sync_state.max_update_time if sync_state else None
+
+    @classmethod
+    def get_ttl(cls, entity_type):
+        """Returns the seconds for which entities of entity_type synced are
+        used without refresh (0: no expiry). Configured in `CACHE` section
+        of config, per entity type (Ex: AHV_DISK_IMAGE = 600) or for all
+        of them (ttl = 3600)"""
+
+        entity_type = entity_type.split(":", 1)[0]
+        config = get_config()
+        section = config["CACHE"] if "CACHE" in config else {}
+        return float(section.get(entity_type, section.get("ttl", DEFAULT_TTL)))
+
+    @classmethod
+    def is_stale(cls, entity_type):
+        """Returns True if entity_type was never synced, or synced before
+        its ttl"""
+
+        sync_state = cls._get_sync_state(entity_type)
+        if not sync_state:
+            return True
+
+        ttl = cls.get_ttl(entity_type)
+        age = datetime.datetime.now() - sync_state.last_sync_time
+        return bool(ttl) and age.total_seconds() > ttl
+
+    @classmethod
+    def replace_entities(cls, entity_type, name_uuid_map, max_update_time=None):
+        """Replaces the entities of entity_type stored in cache by the ones
+        in name_uuid_map, in a single transaction"""
+
+        db = get_db_handle()
+        rows = cls._get_rows(entity_type, name_uuid_map)
+
+        with db.db.atomic():
+            db.cache_table.delete().where(
                 db.cache_table.entity_type == entity_type
-                and db.cache_table.entity_name == entity_name
+            ).execute()
+            for batch in peewee.chunked(rows, INSERT_BATCH_SIZE):
+                db.cache_table.insert_many(batch).execute()
+            cls._set_max_update_time(entity_type, max_update_time)
+
+        _lookup_entity_uuid.cache_clear()
+
+    @classmethod
+    def update_entities(
+        cls, entity_type, name_uuid_map, deleted_names=None, max_update_time=None
+    ):
+        """Stores the entities of name_uuid_map and deletes the ones named
+        in deleted_names, in a single transaction"""
+
+        db = get_db_handle()
+        rows = cls._get_rows(entity_type, name_uuid_map)
+        names = list(name_uuid_map.keys()) + list(deleted_names or [])
+
+        with db.db.atomic():
+            for batch in peewee.chunked(names, INSERT_BATCH_SIZE):
+                db.cache_table.delete().where(
+                    (db.cache_table.entity_type == entity_type)
+                    & (db.cache_table.entity_name.in_(batch))
+                ).execute()
+            for batch in peewee.chunked(rows, INSERT_BATCH_SIZE):
+                db.cache_table.insert_many(batch).execute()
+            cls._set_max_update_time(entity_type, max_update_time)
+
+        _lookup_entity_uuid.cache_clear()
+
+    @classmethod
+    def _get_uuid_name_map(cls, entity_type):
+        """Returns the uuid-name map of entities of entity_type stored"""
+
+        db = get_db_handle()
+        uuid_name_map = {}
+        query = db.cache_table.select().where(db.cache_table.entity_type == entity_type)
+        for entity in query:
+            uuids = entity.entity_uuid
+            # Entities having same name are stored as list of uuids
+            uuids = ast.literal_eval(uuids) if uuids.startswith("[") else [uuids]
+            for uuid in uuids:
+                uuid_name_map[uuid] = entity.entity_name
+
+        return uuid_name_map
+
+    @classmethod
+    def _fetch_full(cls, entity_type, client):
+        """Fetches all the entities of entity_type.
+
+        Returns:
+            (tuple): name-uuid map, None (entities replace the stored ones),
+                latest last_update_time of entities
+        """
+
+        cache_entity = cls.get_cache_entity(entity_type)
+        filters = [entity_type.partition(":")[2], cache_entity.filter]
+        Obj = get_resource_api(cache_entity.api, client.connection)
+        uuid_name_map = {}
+        max_update_time = 0
+        for entity in Obj.iter_entities(filter=";".join(filter(None, filters))):
+            uuid_name_map[cache_entity.get_uuid(entity)] = cache_entity.get_name(entity)
+            max_update_time = max(
+                max_update_time, _get_update_time(entity.get("metadata", {}))
             )
 
-            return entity.entity_uuid
+        LOG.debug("Fetched {} entities of {}".format(len(uuid_name_map), entity_type))
+        return _get_name_uuid_map(uuid_name_map), None, max_update_time
 
-        except peewee.DoesNotExist:
+    @classmethod
+    def _fetch_delta(cls, entity_type, client, since, cached):
+        """Fetches the entities of entity_type updated since the high water
+        mark (list sorted by last_update_time, read till the first older
+        entity), and finds the deleted ones by diff of the uuids listed by
+        groups api with the cached ones (uuid-name map). If the list is not
+        sorted as requested, updates past the first older entity could be
+        missed, so the delta is not used.
+
+        Returns:
+            (tuple): name-uuid map of changed entities, names of deleted
+                entities, latest last_update_time of entities. None if the
+                delta could not be found.
+        """
+
+        cache_entity = cls.get_cache_entity(entity_type)
+        Obj = get_resource_api(cache_entity.api, client.connection)
+        params = {
+            "sort_attribute": "last_update_time",
+            "sort_order": "DESCENDING",
+            "length": DELTA_PAGE_SIZE,
+        }
+        updated = {}
+        max_update_time = since
+        prev_update_time = None
+        offset = 0
+        while True:
+            res, err = Obj.list(dict(params, offset=offset))
+            if err:
+                raise Exception("[{}] - {}".format(err["code"], err["error"]))
+
+            response = res.json()
+            metadata = response.get("metadata", {})
+            if metadata.get("sort_attribute", None) != params["sort_attribute"]:
+                LOG.debug("List of {} is not sorted".format(entity_type))
+                return None
+
+            entities = response.get("entities", None) or []
+            done = not entities
+            for entity in entities:
+                update_time = _get_update_time(entity["metadata"])
+                if prev_update_time is not None and update_time > prev_update_time:
+                    LOG.debug("List of {} is not sorted".format(entity_type))
+                    return None
+                prev_update_time = update_time
+
+                if update_time < since:
+                    done = True
+                    break
+
+                updated[cache_entity.get_uuid(entity)] = cache_entity.get_name(entity)
+                max_update_time = max(max_update_time, update_time)
+
+            offset += len(entities)
+            total_matches = metadata.get("total_matches", None)
+            if done or (total_matches is not None and offset >= total_matches):
+                break
+
+        query = GroupsQuery(cache_entity.groups_entity_type, [])
+        try:
+            uuids = {row["entity_id"] for row in client.groups.iter_entities(query)}
+        except Exception as exc:
+            LOG.debug("Cannot list uuids of {}: {}".format(entity_type, exc))
+            return None
+
+        missing = uuids.difference(cached, updated)
+        if missing:
+            # New entities not listed as updated (list was not sorted)
+            LOG.debug("{} entities of {} missed".format(len(missing), entity_type))
             return None
 
+        uuid_name_map = {uuid: name for uuid, name in cached.items() if uuid in uuids}
+        uuid_name_map.update(updated)
+
+        cached_name_uuid_map = _get_name_uuid_map(cached)
+        name_uuid_map = _get_name_uuid_map(uuid_name_map)
+        changed = {
+            name: uuid
+            for name, uuid in name_uuid_map.items()
+            if cached_name_uuid_map.get(name, None) != uuid
+        }
+        deleted_names = [
+            name for name in cached_name_uuid_map if name not in name_uuid_map
+        ]
+
+        LOG.debug(
+            "Fetched {} changed, {} deleted entities of {}".format(
+                len(changed), len(deleted_names), entity_type
+            )
+        )
+        return changed, deleted_names, max_update_time
+
     @classmethod
-    def sync(cls, entity_type=None):
+    def _fetch_entities(cls, entity_type, client, since=None, cached=None):
+        """Fetches the delta of entity_type since the high water mark, or
+        all its entities if since is None or the delta could not be found"""
+
+        cache_entity = cls.get_cache_entity(entity_type)
+        if since is not None and cache_entity.groups_entity_type:
+            delta = cls._fetch_delta(entity_type, client, since, cached)
+            if delta is not None:
+                return delta
+
+        return cls._fetch_full(entity_type, client)
+
+    @classmethod
+    def _get_stored_scoped_types(cls, entity_type):
+        """Returns the scoped types of entity_type synced before"""
+
+        db = get_db_handle()
+        query = db.cache_meta_table.select().where(
+            db.cache_meta_table.entity_type.startswith(entity_type + ":")
+        )
+        return [sync_state.entity_type for sync_state in query]
+
+    @classmethod
+    def sync(cls, entity_type=None, full=False, **scope):
+        """Syncs the entities of entity_type (default: all registered types)
+        from server. Entities of scoped types (Ex: AWS_VPC) are synced for
+        the given scope, or for every scope synced before. On demand types
+        are synced by sync of all types only if they were synced before.
+
+        Types synced before are refreshed incrementally, fetching only the
+        entities changed since the last sync, unless full is set. Types are
+        fetched concurrently, and stored in a single transaction. Entities
+        of a type that cannot be fetched are left as they are.
+
+        Returns:
+            (dict): error of every (scoped) entity type synced (None if
+                synced)
+        """
 
         updating_entity_types = []
+        sync_all = not entity_type
 
         if entity_type:
-            if entity_type not in cls.get_entity_types():
-                LOG.debug("Registered entity types: {}".format(cls.get_entity_types()))
-                raise ValueError("Entity type {} not registered".format(entity_type))
-
+            cls.get_cache_entity(entity_type)
             updating_entity_types.append(entity_type)
 
         else:
-            updating_entity_types.extend(list(cls.entity_type_api_map.keys()))
-
-        db = get_db_handle()
+            updating_entity_types.extend(cls.get_entity_types())
 
+        scoped_types = []
         for entity_type in updating_entity_types:
-            query = db.cache_table.delete().where(
-                db.cache_table.entity_type == entity_type
-            )
-            query.execute()
+            cache_entity = cls.registry[entity_type]
+            if cache_entity.scopes and not scope:
+                scoped_types.extend(cls._get_stored_scoped_types(entity_type))
+            elif (
+                sync_all
+                and cache_entity.on_demand
+                and cls.get_max_update_time(entity_type) is None
+            ):
+                continue
+            else:
+                scoped_types.append(cls.get_scoped_type(entity_type, scope))
+
+        return cls._sync_scoped_types(scoped_types, full=full)
+
+    @classmethod
+    def _sync_scoped_types(cls, scoped_types, full=False):
+        """Syncs the given scoped entity types (see `sync`)"""
 
         client = get_api_client()
 
-        for entity_type in updating_entity_types:
-            api_suffix = cls.entity_type_api_map[entity_type]
-            Obj = get_resource_api(api_suffix, client.connection)
+        futures = OrderedDict()
+        for entity_type in scoped_types:
+            since = None if full else cls.get_max_update_time(entity_type)
+            cached = None if since is None else cls._get_uuid_name_map(entity_type)
+            futures[entity_type] = client.submit(
+                cls._fetch_entities, entity_type, client, since, cached
+            )
+
+        report = {}
+        entities = {}
+        for entity_type, future in futures.items():
             try:
-                res = Obj.get_name_uuid_map()
-                for name, uuid in res.items():
-                    cls.create(
-                        entity_type=entity_type, entity_name=name, entity_uuid=uuid
-                    )
-            except Exception:
+                entities[entity_type] = future.result()
+                report[entity_type] = None
+            except Exception as exc:
                 pc_ip = client.connection.host
-                LOG.warning("Cannot fetch data from {}".format(pc_ip))
+                LOG.warning(
+                    "Cannot fetch {} entities from {}: {}".format(
+                        entity_type, pc_ip, exc
+                    )
+                )
+                report[entity_type] = str(exc)
+
+        db = get_db_handle()
+        with db.db.atomic():
+            for entity_type, fetched in entities.items():
+                name_uuid_map, deleted_names, max_update_time = fetched
+                if deleted_names is None:
+                    cls.replace_entities(entity_type, name_uuid_map, max_update_time)
+                else:
+                    cls.update_entities(
+                        entity_type, name_uuid_map, deleted_names, max_update_time
+                    )
+
+        return report
 
     @classmethod
     def clear_entities(cls):
         """Deletes all the data present in the cache"""
 
         db = get_db_handle()
-        for db_entity in db.cache_table.select():
-            db_entity.delete_instance()
+        with db.db.atomic():
+            db.cache_table.delete().execute()
+            db.cache_meta_table.delete().execute()
+        _lookup_entity_uuid.cache_clear()
 
     @classmethod
     def list(cls):
@@ -107,3 +678,16 @@ class Cache:
             cache_data.append(entity.get_detail_dict())
 
         return cache_data
+
+
+for cache_entity in [
+    CacheEntity("AHV_DISK_IMAGE", "images", groups_entity_type="image"),
+    CacheEntity("AHV_SUBNET", "subnets", groups_entity_type="subnet"),
+    CacheEntity(
+        "AHV_NETWORK_FUNCTION_CHAIN",
+        "network_function_chains",
+        groups_entity_type="network_function_chain",
+    ),
+    CacheEntity("PROJECT", "projects", groups_entity_type="project"),
+]:
+    Cache.register(cache_entity)
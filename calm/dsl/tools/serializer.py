@@ -0,0 +1,152 @@
+"""
+serializer: Pluggable json serialization
+
+Json documents are encoded and decoded by the selected backend: `orjson`
+when installed, the standard library `json` module otherwise. A backend can
+be forced with the `CALM_DSL_JSON_BACKEND` environment variable
+(Ex: CALM_DSL_JSON_BACKEND=json) or `set_json_backend`.
+
+Pretty printed output (indent 4) is always produced by the standard library,
+so that it is the same irrespective of the backend.
+
+Example:
+
+body = dumps_bytes(payload)
+bp_dict = loads(dumps_bytes(payload, default=str))
+click.echo(dumps(bp_dict, pprint=True))
+
+"""
+
+import json
+import os
+
+from .logger import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+BACKEND_ENV_VAR = "CALM_DSL_JSON_BACKEND"
+
+
+class StdlibJSONBackend:
+    """Backend using the standard library json module"""
+
+    name = "json"
+
+    def dumps(self, obj, sort_keys=False, default=None):
+        return json.dumps(
+            obj, sort_keys=sort_keys, default=default, separators=(",", ":")
+        ).encode("utf-8")
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonBackend:
+    """Backend using orjson. Documents orjson can not encode (Ex: integers
+    beyond 64 bits) are encoded by the standard library."""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+        self._fallback = StdlibJSONBackend()
+
+    def dumps(self, obj, sort_keys=False, default=None):
+        option = self._orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= self._orjson.OPT_SORT_KEYS
+
+        try:
+            return self._orjson.dumps(obj, default=default, option=option)
+        except self._orjson.JSONEncodeError:
+            return self._fallback.dumps(obj, sort_keys=sort_keys, default=default)
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+
+_BACKEND_CLASSES = {
+    StdlibJSONBackend.name: StdlibJSONBackend,
+    OrjsonBackend.name: OrjsonBackend,
+}
+
+# Preferred backends, in order
+_BACKEND_ORDER = [OrjsonBackend.name, StdlibJSONBackend.name]
+
+_backend = None
+
+
+def register_json_backend(name, backend_cls):
+    """Registers a backend class. Instances must implement
+    dumps(obj, sort_keys, default) (returning bytes) and loads(data)"""
+
+    _BACKEND_CLASSES[name] = backend_cls
+
+
+def set_json_backend(name):
+    """Selects the backend used for serialization"""
+
+    global _backend
+
+    if name not in _BACKEND_CLASSES:
+        raise ValueError(
+            "Invalid json backend {}. Select from {}".format(
+                name, list(_BACKEND_CLASSES.keys())
+            )
+        )
+
+    _backend = _BACKEND_CLASSES[name]()
+    LOG.debug("Using {} json backend".format(name))
+
+
+def get_json_backend():
+    """Returns the backend in use, selecting it on first use"""
+
+    if _backend is not None:
+        return _backend
+
+    name = os.environ.get(BACKEND_ENV_VAR)
+    if name:
+        set_json_backend(name)
+        return _backend
+
+    for name in _BACKEND_ORDER:
+        try:
+            set_json_backend(name)
+            break
+        except ImportError:
+            continue
+
+    return _backend
+
+
+def dumps_bytes(obj, sort_keys=False, default=None):
+    """Returns obj serialized as compact utf-8 encoded json
+
+    Args:
+        obj (object): object to serialize
+        sort_keys (bool): sort the keys of objects
+        default (callable): called with objects that can not be serialized,
+                            returns a serializable object or raises TypeError
+    """
+
+    return get_json_backend().dumps(obj, sort_keys=sort_keys, default=default)
+
+
+def dumps(obj, pprint=False, sort_keys=False, default=None):
+    """Returns obj serialized as json string, indented if pprint is set"""
+
+    if pprint:
+        return json.dumps(
+            obj, sort_keys=sort_keys, default=default, indent=4, separators=(",", ": "),
+        )
+
+    return dumps_bytes(obj, sort_keys=sort_keys, default=default).decode("utf-8")
+
+
+def loads(data):
+    """Returns the object decoded from json data (str or bytes)"""
+
+    return get_json_backend().loads(data)
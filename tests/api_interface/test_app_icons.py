@@ -0,0 +1,110 @@
+import pytest
+
+from calm.dsl.tools import get_logging_handle
+from calm.dsl.cli import app_icons
+
+from tests.perf.pc_stub import PCStub, get_stub_client
+
+LOG = get_logging_handle(__name__)
+
+
+def test_upload(tmp_path):
+
+    file_path = tmp_path / "logo.png"
+    content = bytes(range(256)) * 4096
+    file_path.write_bytes(content)
+
+    with PCStub() as stub:
+        client = get_stub_client(stub)
+
+        # File is streamed in chunks, reporting progress
+        progress = []
+        res, err = client.app_icon.upload(
+            "logo",
+            str(file_path),
+            progress=lambda sent, total: progress.append((sent, total)),
+        )
+        assert not err
+        assert res.json()["status"]["name"] == "logo"
+        assert len(progress) > 1
+        assert progress[-1][0] == progress[-1][1] > len(content)
+
+    assert stub.uploads["logo"] == ("image/png", content)
+    LOG.info("Success")
+
+
+def test_upload_dir(tmp_path, monkeypatch):
+
+    for file_name in ["a.png", "b.svg", "notes.txt"]:
+        (tmp_path / file_name).write_bytes(file_name.encode())
+    (tmp_path / "c.png").mkdir()
+
+    with PCStub() as stub:
+        client = get_stub_client(stub)
+        monkeypatch.setattr(app_icons, "get_api_client", lambda: client)
+
+        # Image files are uploaded, named after the files
+        app_icons.create_app_icons_from_dir(str(tmp_path))
+        assert stub.uploads == {
+            "a": ("image/png", b"a.png"),
+            "b": ("image/svg+xml", b"b.svg"),
+        }
+
+        # Files of same name are not uploaded
+        stub.uploads.clear()
+        (tmp_path / "a.svg").write_bytes(b"a.svg")
+        with pytest.raises(SystemExit):
+            app_icons.create_app_icons_from_dir(str(tmp_path))
+        assert stub.uploads == {}
+    LOG.info("Success")
+
+
+def test_upload_delete_errors(tmp_path, monkeypatch):
+
+    file_path = tmp_path / "logo.png"
+    file_path.write_bytes(b"logo")
+
+    with PCStub() as stub:
+        client = get_stub_client(stub)
+        monkeypatch.setattr(app_icons, "get_api_client", lambda: client)
+
+        # Failed upload exits with error
+        stub.inject_errors(1, status=400)
+        with pytest.raises(SystemExit):
+            app_icons.create_app_icon("logo", str(file_path))
+        assert "logo" not in stub.uploads
+
+        app_icons.create_app_icon("logo", str(file_path))
+        assert "logo" in stub.uploads
+
+        # Failed delete exits with error, after deleting the remaining icons
+        icon_map = client.app_icon.get_name_uuid_map()
+        monkeypatch.setattr(client.app_icon, "get_name_uuid_map", lambda: icon_map)
+        icon_names = sorted(icon_map)[:2]
+        stub.inject_errors(1, status=400)
+        with pytest.raises(SystemExit):
+            app_icons.delete_app_icon(icon_names)
+        assert stub.deleted["app_icons"] == {icon_map[icon_names[1]]}
+    LOG.info("Success")
+
+
+def test_list_marketplace_use(tmp_path, monkeypatch, capsys):
+
+    file_path = tmp_path / "logo.png"
+    file_path.write_bytes(b"logo")
+
+    with PCStub(volumes={"app_icons": 0}) as stub:
+        client = get_stub_client(stub)
+        monkeypatch.setattr(app_icons, "get_api_client", lambda: client)
+
+        # Icons of same name are listed in separate rows
+        for _ in range(2):
+            res, err = client.app_icon.upload("logo", str(file_path))
+            assert not err
+        capsys.readouterr()
+        app_icons.get_app_icon_list(None, 20, 0, False, marketplace_use=True)
+        output = capsys.readouterr().out
+
+    assert output.count("logo") == 2
+    assert output.count("False") == 2
+    LOG.info("Success")
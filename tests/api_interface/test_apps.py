@@ -30,6 +30,51 @@ class TestApps:
         else:
             pytest.fail("[{}] - {}".format(err["code"], err["error"]))
 
+    def test_apps_iter_entities(self):
+
+        client = get_api_client()
+
+        res, err = client.application.list(params={"length": 1})
+        if err:
+            pytest.fail("[{}] - {}".format(err["code"], err["error"]))
+        total_matches = res.json()["metadata"]["total_matches"]
+
+        LOG.info("Walking all pages of apps list api")
+        app_uuids = [
+            entity["metadata"]["uuid"]
+            for entity in client.application.iter_entities(page_size=10)
+        ]
+        assert len(app_uuids) == total_matches
+        assert len(set(app_uuids)) == total_matches
+
+        limited = list(client.application.iter_entities(page_size=10, limit=15))
+        assert len(limited) == min(15, total_matches)
+        LOG.info("Success")
+
+    def test_apps_iter_entities_parallel(self):
+
+        client = get_api_client()
+        params = {
+            "sort_attribute": "_created_timestamp_usecs_",
+            "sort_order": "ASCENDING",
+        }
+
+        LOG.info("Walking pages of apps list api serially and in parallel")
+        serial = [
+            entity["metadata"]["uuid"]
+            for entity in client.application.iter_entities(
+                params, page_size=10, workers=1
+            )
+        ]
+        parallel = [
+            entity["metadata"]["uuid"]
+            for entity in client.application.iter_entities(
+                params, page_size=10, workers=4
+            )
+        ]
+        assert serial == parallel
+        LOG.info("Success")
+
     @pytest.mark.slow
     def test_apps_api(self):
 
@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+
+from calm.dsl.tools import get_logging_handle
+from calm.dsl.api import get_async_api_client
+
+LOG = get_logging_handle(__name__)
+
+
+class TestAsyncClient:
+    def test_async_bps_list_and_read(self):
+        async def list_and_read():
+            async with get_async_api_client(max_concurrency=5) as client:
+                params = {"length": 10, "offset": 0}
+                LOG.info("Invoking async list api call on bps")
+                res, err = await client.blueprint.list(params=params)
+                if err:
+                    pytest.fail("[{}] - {}".format(err["code"], err["error"]))
+
+                assert res.ok is True
+                bp_uuids = [
+                    entity["metadata"]["uuid"] for entity in res.json()["entities"]
+                ]
+
+                LOG.info("Reading {} bps concurrently".format(len(bp_uuids)))
+                results = await asyncio.gather(
+                    *[client.blueprint.read(bp_uuid) for bp_uuid in bp_uuids]
+                )
+                for bp_uuid, (res, err) in zip(bp_uuids, results):
+                    if err:
+                        pytest.fail("[{}] - {}".format(err["code"], err["error"]))
+                    assert res.json()["metadata"]["uuid"] == bp_uuid
+                LOG.info("Success")
+
+        asyncio.run(list_and_read())
+
+    def test_async_name_uuid_map(self):
+        async def get_map():
+            async with get_async_api_client() as client:
+                return await asyncio.gather(
+                    client.project.get_name_uuid_map(),
+                    client.application.get_name_uuid_map({"length": 20}),
+                )
+
+        project_map, app_map = asyncio.run(get_map())
+        assert isinstance(project_map, dict)
+        assert isinstance(app_map, dict)
@@ -0,0 +1,106 @@
+import json
+
+from requests.models import Response
+
+from calm.dsl.tools import get_logging_handle
+from calm.dsl.api.handle import ClientHandle
+
+LOG = get_logging_handle(__name__)
+
+
+class FakeConnection:
+    """Records the calls, answering batch calls with a response per item"""
+
+    host = "127.0.0.1"
+
+    def __init__(self):
+        self.calls = []
+
+    def _call(self, endpoint, method="post", request_json=None, **kwargs):
+        self.calls.append((method, endpoint, request_json))
+
+        body = {"endpoint": endpoint}
+        if endpoint.endswith("/batch"):
+            body = {
+                "api_response_list": [
+                    {
+                        "status": "404"
+                        if "missing" in req["path_and_params"]
+                        else "200",
+                        "api_response": {"path": req["path_and_params"]},
+                    }
+                    for req in request_json["api_request_list"]
+                ]
+            }
+
+        res = Response()
+        res.status_code = 200
+        res._content = json.dumps(body).encode()
+        return res, None
+
+
+class TestBatch:
+    def test_operations_are_batched(self):
+
+        connection = FakeConnection()
+        client = ClientHandle(connection)
+        client._init_apis()
+
+        with client.batch(chunk_size=2) as batch:
+            deletes = [
+                batch.application.delete("app-1", soft_delete=True),
+                batch.blueprint.delete("missing"),
+                batch.project.read("project-1"),
+            ]
+            # Full chunk is submitted right away
+            assert len(connection.calls) == 1
+
+        assert len(connection.calls) == 2
+        method, endpoint, payload = connection.calls[0]
+        assert endpoint == "api/nutanix/v3/batch"
+        assert payload["api_request_list"] == [
+            {
+                "operation": "DELETE",
+                "path_and_params": "/api/nutanix/v3/apps/app-1?type=soft",
+                "body": {},
+            },
+            {
+                "operation": "DELETE",
+                "path_and_params": "/api/nutanix/v3/blueprints/missing",
+                "body": {},
+            },
+        ]
+
+        res, err = deletes[0].result()
+        assert err is None
+        assert res.json() == {"path": "/api/nutanix/v3/apps/app-1?type=soft"}
+
+        res, err = deletes[1].result()
+        assert err["code"] == 404
+
+        # Single operation is sent as a regular request
+        assert connection.calls[1] == (
+            "get",
+            "api/nutanix/v3/projects_internal/project-1",
+            None,
+        )
+        res, err = deletes[2].result()
+        assert res.json() == {"endpoint": "api/nutanix/v3/projects_internal/project-1"}
+        LOG.info("Success")
+
+    def test_cancel_on_error(self):
+
+        connection = FakeConnection()
+        client = ClientHandle(connection)
+        client._init_apis()
+
+        try:
+            with client.batch() as batch:
+                delete = batch.project.delete("project-1")
+                raise RuntimeError("failed")
+        except RuntimeError:
+            pass
+
+        assert delete.cancelled()
+        assert not connection.calls
+        LOG.info("Success")
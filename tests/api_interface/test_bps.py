@@ -3,6 +3,7 @@ import json
 import uuid
 
 from calm.dsl.cli.main import get_api_client
+from calm.dsl.api import get_client_handle
 from calm.dsl.cli.bps import launch_blueprint_simple
 from tests.api_interface.entity_spec.existing_vm_bp import (
     ExistingVMBlueprint as Blueprint,
@@ -28,6 +29,40 @@ class TestBps:
         else:
             pytest.fail("[{}] - {}".format(err["code"], err["error"]))
 
+    def test_bp_read_with_response_cache(self):
+
+        client = get_api_client()
+        connection = client.connection
+        cached_client = get_client_handle(
+            connection.host,
+            connection.port,
+            auth=connection.auth,
+            temp=True,
+            response_cache=True,
+        )
+
+        res, err = client.blueprint.list(params={"length": 1})
+        if err:
+            pytest.fail("[{}] - {}".format(err["code"], err["error"]))
+
+        entities = res.json()["entities"]
+        if not entities:
+            pytest.skip("No blueprint found")
+        bp_uuid = entities[0]["metadata"]["uuid"]
+
+        LOG.info("Reading blueprint {} twice with response cache".format(bp_uuid))
+        res, err = cached_client.blueprint.read(bp_uuid)
+        if err:
+            pytest.fail("[{}] - {}".format(err["code"], err["error"]))
+        first_read = res.json()
+
+        res, err = cached_client.blueprint.read(bp_uuid)
+        if err:
+            pytest.fail("[{}] - {}".format(err["code"], err["error"]))
+        assert res.status_code == 200
+        assert res.json() == first_read
+        LOG.info("Success")
+
     @pytest.mark.slow
     def test_upload_and_launch_bp(self):
 
@@ -0,0 +1,99 @@
+import time
+
+from requests.models import Response
+
+from calm.dsl.tools import get_logging_handle
+from calm.dsl.api.circuit_breaker import CircuitBreaker
+from calm.dsl.api.timeouts import EndpointTimeouts, set_deadline
+
+from tests.perf.pc_stub import PCStub, get_stub_client, get_uuid
+
+LOG = get_logging_handle(__name__)
+
+
+def _response(status_code):
+    res = Response()
+    res.status_code = status_code
+    return res
+
+
+class TestCircuitBreaker:
+    def test_open_and_close(self):
+
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+        assert breaker.is_failure(None)
+        assert breaker.is_failure(_response(503))
+        assert not breaker.is_failure(_response(404))
+
+        breaker.record(True)
+        assert breaker.allow()
+        breaker.record(True)
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+        # Single trial request once reset timeout has passed
+        time.sleep(0.1)
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record(True)
+        assert breaker.state == CircuitBreaker.OPEN
+
+        time.sleep(0.1)
+        assert breaker.allow()
+        breaker.record(False)
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow()
+        LOG.info("Success")
+
+    def test_endpoint_timeouts(self):
+
+        timeouts = EndpointTimeouts(10, 60, "*/import_file=600, */list=5:30")
+        assert timeouts.get("api/nutanix/v3/blueprints/import_file") == (10, 600)
+        assert timeouts.get("api/nutanix/v3/apps/list") == (5, 30)
+        assert timeouts.get("api/nutanix/v3/apps/{}".format(get_uuid("apps", 0))) == (
+            10,
+            60,
+        )
+
+        try:
+            set_deadline(5)
+            connect_timeout, read_timeout = timeouts.get("api/nutanix/v3/apps/list")
+            assert 4 < connect_timeout <= 5
+            assert 4 < read_timeout <= 5
+        finally:
+            set_deadline(None)
+        LOG.info("Success")
+
+    def test_connection_failures(self):
+
+        with PCStub(latency=0.3) as stub:
+            client = get_stub_client(
+                stub,
+                read_timeout=0.1,
+                circuit_breaker_threshold=2,
+                circuit_breaker_reset=60,
+            )
+
+            # Timed out requests are returned as errors
+            for index in range(2):
+                res, err = client.application.read(get_uuid("apps", index))
+                assert err["code"] == 504
+
+            # Circuit is open, so request fails without being made
+            res, err = client.application.read(get_uuid("apps", 3))
+            assert err["code"] == 503
+            assert sum(stub.request_counts.values()) == 2
+
+        with PCStub() as stub:
+            client = get_stub_client(stub)
+            res, err = client.application.read(get_uuid("apps", 0))
+            assert not err
+
+            try:
+                set_deadline(0.001)
+                time.sleep(0.01)
+                res, err = client.application.read(get_uuid("apps", 1))
+                assert err["code"] == 504
+            finally:
+                set_deadline(None)
+        LOG.info("Success")
@@ -0,0 +1,61 @@
+from calm.dsl.tools import get_logging_handle
+
+from tests.perf.pc_stub import PCStub, get_stub_client
+
+LOG = get_logging_handle(__name__)
+
+BLUEPRINT_PATH = ("POST", "/api/nutanix/v3/blueprints")
+
+
+def _get_payload(name):
+    return {"spec": {"name": name, "description": "x" * 10000}, "metadata": {}}
+
+
+def test_request_compression():
+
+    with PCStub() as stub:
+        client = get_stub_client(
+            stub, request_compression=True, compression_threshold=1024
+        )
+        metrics = client.connection.transfer_metrics
+
+        # Large bodies are sent compressed
+        res, err = client.blueprint.create(_get_payload("bp-1"))
+        assert not err
+        assert res.json()["status"]["name"] == "bp-1"
+        assert metrics["request_bytes_sent"] < metrics["request_bytes"] / 10
+
+        # Small bodies are sent as they are
+        sent = metrics["request_bytes_sent"]
+        size = metrics["request_bytes"]
+        res, err = client.blueprint.create({"spec": {"name": "bp-2"}})
+        assert not err
+        assert metrics["request_bytes_sent"] - sent == metrics["request_bytes"] - size
+
+        # Response bodies are counted as received
+        assert metrics["response_bytes"] > 0
+        assert metrics["response_bytes_received"] == metrics["response_bytes"]
+    LOG.info("Success")
+
+
+def test_rejected_compression():
+
+    with PCStub(reject_gzip=True) as stub:
+        client = get_stub_client(
+            stub, request_compression=True, compression_threshold=1024
+        )
+        metrics = client.connection.transfer_metrics
+
+        # Request rejected with 415 is sent again uncompressed
+        res, err = client.blueprint.create(_get_payload("bp-1"))
+        assert not err
+        assert res.json()["status"]["name"] == "bp-1"
+        assert stub.request_counts[BLUEPRINT_PATH] == 2
+        assert not client.connection.request_compression
+
+        # Compression stays disabled for later requests
+        res, err = client.blueprint.create(_get_payload("bp-2"))
+        assert not err
+        assert stub.request_counts[BLUEPRINT_PATH] == 3
+        assert metrics["request_bytes_sent"] == metrics["request_bytes"]
+    LOG.info("Success")
@@ -0,0 +1,110 @@
+import hashlib
+
+from calm.dsl.tools import get_logging_handle
+from tests.perf.pc_stub import PCStub, get_stub_client, get_uuid
+
+LOG = get_logging_handle(__name__)
+
+APP_UUID = get_uuid("apps", 0)
+RUNLOG_UUID = get_uuid("runlogs", 0)
+
+
+def test_download(tmp_path):
+
+    file_name = str(tmp_path / "runlog.zip")
+    with PCStub(runlog_size=3 * 1024 * 1024 + 7) as stub:
+        client = get_stub_client(stub)
+        content = stub.get_runlog(RUNLOG_UUID)
+
+        progress = []
+        res, err = client.application.download_runlog(
+            APP_UUID,
+            RUNLOG_UUID,
+            file_name=file_name,
+            progress=lambda downloaded, total: progress.append((downloaded, total)),
+        )
+        assert not err
+        assert res.checksum == hashlib.sha256(content).hexdigest()
+        assert progress[-1] == (len(content), len(content))
+
+    with open(file_name, "rb") as fd:
+        assert fd.read() == content
+    LOG.info("Success")
+
+
+def test_resumed_download(tmp_path):
+
+    file_name = str(tmp_path / "runlog.zip")
+    with PCStub(runlog_size=100000) as stub:
+        client = get_stub_client(stub)
+        content = stub.get_runlog(RUNLOG_UUID)
+        with open(file_name, "wb") as fd:
+            fd.write(content[:30000])
+
+        # Only the rest of the file is downloaded
+        res, err = client.application.download_runlog(
+            APP_UUID, RUNLOG_UUID, file_name=file_name, resume=True
+        )
+        assert not err
+        assert res.status_code == 206
+        assert int(res.headers["Content-Length"]) == 100000 - 30000
+        assert res.checksum == hashlib.sha256(content).hexdigest()
+
+    with open(file_name, "rb") as fd:
+        assert fd.read() == content
+    LOG.info("Success")
+
+
+def test_gzip_download(tmp_path):
+
+    file_name = str(tmp_path / "runlog.zip")
+    with PCStub(runlog_size=100000, gzip_downloads=True) as stub:
+        client = get_stub_client(stub)
+        content = stub.get_runlog(RUNLOG_UUID)
+
+        # Decoded file is larger than Content-Length (encoded bytes)
+        res, err = client.application.download_runlog(
+            APP_UUID, RUNLOG_UUID, file_name=file_name
+        )
+        assert not err
+        assert res.headers["Content-Encoding"] == "gzip"
+        assert int(res.headers["Content-Length"]) < len(content)
+        assert res.checksum == hashlib.sha256(content).hexdigest()
+
+    with open(file_name, "rb") as fd:
+        assert fd.read() == content
+    LOG.info("Success")
+
+
+def test_failed_download(tmp_path):
+
+    file_name = str(tmp_path / "runlog.zip")
+    size = 3 * 1024 * 1024
+    with PCStub(runlog_size=size, download_cutoff=size // 2) as stub:
+        client = get_stub_client(stub, read_timeout=0.2)
+        content = stub.get_runlog(RUNLOG_UUID)
+
+        # Stalled response is reported as error, keeping the bytes received
+        res, err = client.application.download_runlog(
+            APP_UUID, RUNLOG_UUID, file_name=file_name
+        )
+        assert "failed after" in err["error"]
+        with open(file_name, "rb") as fd:
+            received = fd.read()
+        assert 0 < len(received) <= size // 2
+        assert content.startswith(received)
+
+        # Range is asked of the unencoded file
+        stub.download_cutoff = None
+        stub.gzip_downloads = True
+        res, err = client.application.download_runlog(
+            APP_UUID, RUNLOG_UUID, file_name=file_name, resume=True
+        )
+        assert not err
+        assert res.status_code == 206
+        assert "Content-Encoding" not in res.headers
+        assert res.checksum == hashlib.sha256(content).hexdigest()
+
+    with open(file_name, "rb") as fd:
+        assert fd.read() == content
+    LOG.info("Success")
@@ -0,0 +1,192 @@
+import pytest
+
+from calm.dsl.tools import get_logging_handle
+from calm.dsl.api import GroupsQuery, get_resource_api
+from calm.dsl.cli import accounts, apps, bps, projects
+from calm.dsl.cli.utils import get_groups_filter, get_list_entities, get_name_query
+
+from tests.perf.pc_stub import PCStub, get_stub_client, get_name
+
+LOG = get_logging_handle(__name__)
+
+
+def test_groups_query():
+
+    query = GroupsQuery(
+        "blueprint",
+        ["name", "state", "categories"],
+        filter="state==ACTIVE",
+        sort_attribute="name",
+        offset=10,
+        list_attributes=["categories"],
+    )
+
+    assert query.payload(length=20) == {
+        "entity_type": "blueprint",
+        "group_member_attributes": [
+            {"attribute": "name"},
+            {"attribute": "state"},
+            {"attribute": "categories"},
+        ],
+        "group_member_offset": 10,
+        "group_member_count": 20,
+        "filter_criteria": "state==ACTIVE",
+        "group_member_sort_attribute": "name",
+        "group_member_sort_order": "ASCENDING",
+    }
+
+    entity_result = {
+        "entity_id": "uuid-1",
+        "data": [
+            {"name": "name", "values": [{"values": ["bp-1"], "time": 0}]},
+            {"name": "state", "values": []},
+            {
+                "name": "categories",
+                "values": [{"values": ["TemplateType:Vm", "AppFamily:DevOps"]}],
+            },
+        ],
+    }
+    assert query.get_row(entity_result) == {
+        "entity_id": "uuid-1",
+        "name": "bp-1",
+        "state": None,
+        "categories": ["TemplateType:Vm", "AppFamily:DevOps"],
+    }
+    LOG.info("Success")
+
+
+def test_groups_filter():
+
+    filter_keys = {"name": "name", "_state": "_state"}
+
+    # Name queries are converted to contains, deleted entities excluded
+    filter_query = get_name_query(["My-App", "b"])
+    assert (
+        get_groups_filter(filter_query, filter_keys, "_state", "deleted")
+        == "(name=cs=my-app,name=cs=b);_state!=deleted"
+    )
+
+    # Filter on state includes deleted entities, if asked
+    filter_query = "name==app-1;(_state==running,_state==deleted)"
+    assert (
+        get_groups_filter(filter_query, filter_keys, "_state", "deleted")
+        == filter_query
+    )
+
+    # Unknown keys and regex values can not be converted
+    assert get_groups_filter("owner==admin", filter_keys) is None
+    assert get_groups_filter("name==app-.*", filter_keys) is None
+    assert get_groups_filter("", filter_keys) == ""
+    LOG.info("Success")
+
+
+def _get_path(entity, path):
+    for key in path.split("."):
+        entity = entity[key]
+    return entity
+
+
+@pytest.mark.parametrize(
+    "kind, entity_type, attributes, list_attributes, to_entity, paths",
+    [
+        (
+            "blueprints",
+            "blueprint",
+            bps.BLUEPRINT_GROUP_ATTRIBUTES,
+            ["categories"],
+            bps._get_blueprint_from_group,
+            [
+                "status.name",
+                "status.uuid",
+                "status.description",
+                "status.state",
+                "status.application_count",
+                "metadata.uuid",
+                "metadata.categories",
+                "metadata.project_reference.name",
+                "metadata.creation_time",
+                "metadata.last_update_time",
+            ],
+        ),
+        (
+            "apps",
+            "app",
+            apps.APPLICATION_GROUP_ATTRIBUTES,
+            [],
+            apps._get_app_from_group,
+            [
+                "status.name",
+                "status.uuid",
+                "status.state",
+                "status.resources.app_blueprint_reference.name",
+                "metadata.uuid",
+                "metadata.owner_reference.name",
+                "metadata.project_reference.name",
+                "metadata.creation_time",
+                "metadata.last_update_time",
+            ],
+        ),
+        (
+            "accounts",
+            "account",
+            accounts.ACCOUNT_GROUP_ATTRIBUTES,
+            [],
+            accounts._get_account_from_group,
+            [
+                "status.name",
+                "status.resources.type",
+                "status.resources.state",
+                "metadata.uuid",
+                "metadata.owner_reference.name",
+                "metadata.creation_time",
+                "metadata.last_update_time",
+            ],
+        ),
+        (
+            "projects",
+            "project",
+            projects.PROJECT_GROUP_ATTRIBUTES,
+            ["user_uuids"],
+            projects._get_project_from_group,
+            [
+                "status.name",
+                "status.description",
+                "status.state",
+                "metadata.uuid",
+                "metadata.owner_reference.name",
+            ],
+        ),
+    ],
+)
+def test_group_entities(
+    kind, entity_type, attributes, list_attributes, to_entity, paths
+):
+
+    with PCStub(volumes={kind: 30}) as stub:
+        client = get_stub_client(stub)
+        api = get_resource_api(kind, client.connection)
+        list_entities = list(api.iter_entities())
+
+        # Rows converted to list entities have the values shown in tables
+        query = GroupsQuery(entity_type, attributes, list_attributes=list_attributes)
+        group_entities = [to_entity(row) for row in client.groups.iter_entities(query)]
+        assert len(group_entities) == 30
+        for group_entity, list_entity in zip(group_entities, list_entities):
+            for path in paths:
+                assert _get_path(group_entity, path) == _get_path(list_entity, path)
+
+        # Entities matching the converted name query are listed
+        filter_query = get_name_query([get_name(kind, 1).upper()])
+        query = GroupsQuery(
+            entity_type,
+            attributes,
+            filter=get_groups_filter(filter_query, {"name": "name"}),
+            list_attributes=list_attributes,
+        )
+        entities = get_list_entities(client, api, {}, 0, None, query, to_entity)
+        assert [entity["status"]["name"] for entity in entities] == [
+            entity["status"]["name"]
+            for entity in api.iter_entities({"filter": filter_query})
+        ]
+        assert len(entities) == 11
+    LOG.info("Success")
@@ -0,0 +1,139 @@
+import socket
+
+from requests.adapters import HTTPAdapter
+
+from calm.dsl.tools import get_logging_handle
+from calm.dsl.api import get_client_handle
+from calm.dsl.api.instrumentation import (
+    Profiler,
+    TimedHTTPAdapter,
+    get_endpoint_template,
+    register_hook,
+    unregister_hook,
+)
+
+from tests.perf.pc_stub import PCStub, get_stub_client, get_uuid
+
+LOG = get_logging_handle(__name__)
+
+
+class TestInstrumentation:
+    def test_endpoint_template(self):
+
+        endpoint = (
+            "api/nutanix/v3/apps/3b1c4b0e-9ff4-4a8e-b4d5-2a1f1e8f2c11/actions/"
+            "A0B1C2D3-E4F5-4789-8abc-def012345678/run?type=soft"
+        )
+        assert (
+            get_endpoint_template(endpoint)
+            == "api/nutanix/v3/apps/<uuid>/actions/<uuid>/run"
+        )
+
+    def test_profiler_summary(self):
+
+        profiler = Profiler()
+        for i in range(1, 101):
+            profiler.add(
+                {
+                    "method": "GET",
+                    "endpoint": "api/nutanix/v3/apps/<uuid>",
+                    "status": 404 if i == 100 else 200,
+                    "total": i / 1000.0,
+                    "server": i / 2000.0,
+                }
+            )
+        profiler.add(
+            {
+                "method": "POST",
+                "endpoint": "api/nutanix/v3/apps/list",
+                "status": 200,
+                "total": 0.001,
+                "server": 0.0,
+            }
+        )
+
+        rows = profiler.summary()
+        assert [row["endpoint"] for row in rows] == [
+            "api/nutanix/v3/apps/<uuid>",
+            "api/nutanix/v3/apps/list",
+        ]
+        assert rows[0]["count"] == 100
+        assert rows[0]["errors"] == 1
+        assert rows[0]["p50"] == 0.05
+        assert rows[0]["p95"] == 0.095
+        assert rows[0]["max"] == 0.1
+
+    def test_phase_timings(self, monkeypatch):
+
+        # Host resolves to an unreachable address, and to the stub
+        resolved = []
+
+        def getaddrinfo(host, port, family=0, type=0, *args):
+            addresses = [host]
+            if host == "pc.calm.test":
+                resolved.append(host)
+                addresses = ["127.0.0.2", "127.0.0.1"]
+            return [
+                (socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port))
+                for address in addresses
+            ]
+
+        monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+
+        profiler = Profiler()
+        register_hook(profiler.add)
+        try:
+            with PCStub(latency=0.05) as stub:
+                client = get_client_handle(
+                    "pc.calm.test",
+                    stub.port,
+                    scheme="http",
+                    auth=("admin", "pw"),
+                    temp=True,
+                    request_coalescing=False,
+                )
+                for _ in range(2):
+                    res, err = client.project.read(get_uuid("projects", 0))
+                    assert not err
+        finally:
+            unregister_hook(profiler.add)
+
+        # Host name is resolved once per connection, and is timed
+        assert resolved == ["pc.calm.test"]
+        first, second = [
+            trace for trace in profiler.traces if trace["endpoint"].endswith("/<uuid>")
+        ]
+        assert first["dns"] > 0
+        assert first["connect"] > 0
+        assert first["tls"] == 0
+
+        # Pooled connection is reused
+        assert second["dns"] == second["connect"] == 0
+
+        for trace in [first, second]:
+            assert trace["status"] == 200
+            assert trace["send"] > 0
+            assert trace["server"] >= 0.03
+            assert trace["transfer"] >= 0
+            phases = ["dns", "connect", "tls", "send", "server", "transfer"]
+            assert sum(trace[phase] for phase in phases) <= trace["total"]
+
+    def test_untraced_connection(self):
+
+        url = "http://127.0.0.1/"
+        with PCStub() as stub:
+            # Stock adapter is used, unless traces are used
+            client = get_stub_client(stub)
+            assert type(client.connection.session.get_adapter(url)) is HTTPAdapter
+            res, err = client.project.read(get_uuid("projects", 0))
+            assert not err
+
+            profiler = Profiler()
+            register_hook(profiler.add)
+            try:
+                client = get_stub_client(stub)
+            finally:
+                unregister_hook(profiler.add)
+            adapter = client.connection.session.get_adapter(url)
+            assert isinstance(adapter, TimedHTTPAdapter)
+        LOG.info("Success")
@@ -0,0 +1,44 @@
+import json
+
+from calm.dsl.tools import get_logging_handle
+from calm.dsl.api.json_stream import JSONItemStream
+
+LOG = get_logging_handle(__name__)
+
+
+def _chunks(data, size):
+    while data:
+        chunk, data = data[:size], data[size:]
+        yield chunk
+
+
+class TestJSONItemStream:
+    def test_items_are_decoded_across_chunks(self):
+
+        doc = {
+            "api_version": "3.0",
+            "metadata": {"total_matches": 3, "kind": "app"},
+            "entities": [
+                {"name": "café", "count": 1.5e10, "ok": True},
+                [1, -20, None],
+                'text with "escapes" and ]},',
+            ],
+        }
+        data = json.dumps(doc).encode("utf-8")
+
+        for size in [1, 2, 3, 7, 64, len(data)]:
+            stream = JSONItemStream(_chunks(data, size))
+            items = list(stream)
+            assert items == doc["entities"]
+            assert stream.fields["metadata"] == doc["metadata"]
+
+    def test_empty_entities_and_close(self):
+
+        closed = []
+        stream = JSONItemStream(
+            [b'{"entities": [], "metadata": {"length": 0}}'],
+            on_close=lambda: closed.append(1),
+        )
+        assert list(stream) == []
+        assert stream.fields["metadata"] == {"length": 0}
+        assert closed == [1]
@@ -0,0 +1,76 @@
+import time
+
+from requests.models import Response
+
+from calm.dsl.tools import get_logging_handle
+from calm.dsl.api.rate_limiter import (
+    RateLimiter,
+    get_endpoint_class,
+    get_retry_after,
+    is_read_request,
+)
+
+LOG = get_logging_handle(__name__)
+
+
+def _response(status_code, retry_after=None):
+    res = Response()
+    res.status_code = status_code
+    if retry_after is not None:
+        res.headers["Retry-After"] = retry_after
+    return res
+
+
+class TestRateLimiter:
+    def test_endpoint_class(self):
+
+        assert get_endpoint_class("get", "api/nutanix/v3/apps/1") == "read"
+        assert get_endpoint_class("post", "api/nutanix/v3/apps/list") == "read"
+        assert get_endpoint_class("post", "api/nutanix/v3/groups") == "read"
+        assert get_endpoint_class("put", "api/nutanix/v3/apps/1") == "write"
+        assert get_endpoint_class("delete", "api/nutanix/v3/apps/1") == "delete"
+        LOG.info("Success")
+
+    def test_read_request(self):
+
+        assert is_read_request("get", "api/nutanix/v3/apps/1")
+        assert is_read_request("GET", "api/nutanix/v3/apps/1?detailed=true")
+        assert is_read_request("post", "api/nutanix/v3/apps/list")
+        assert is_read_request("post", "api/nutanix/v3/groups?offset=0")
+        assert not is_read_request("post", "api/nutanix/v3/blueprints")
+        assert not is_read_request("put", "api/nutanix/v3/apps/1")
+        assert not is_read_request("delete", "api/nutanix/v3/apps/1")
+        LOG.info("Success")
+
+    def test_retry_after(self):
+
+        assert get_retry_after(_response(200)) is None
+        assert get_retry_after(_response(429)) == 1.0
+        assert get_retry_after(_response(503, "3")) == 3.0
+        assert get_retry_after(_response(429, "Thu, 01 Jan 1970 00:00:00 GMT")) == 0
+        LOG.info("Success")
+
+    def test_rate_and_backoff(self):
+
+        limiter = RateLimiter(rate=20, burst=1)
+        start = time.monotonic()
+        for _ in range(5):
+            with limiter.limit("get", "apps/1"):
+                pass
+        assert time.monotonic() - start >= 0.19
+
+        # Throttled class is paused, others are not
+        throttle_time = time.monotonic()
+        limiter.update("write", _response(429, "0.3"))
+        with limiter.limit("get", "apps/1"):
+            pass
+        assert time.monotonic() - throttle_time < 0.25
+
+        with limiter.limit("put", "apps/1"):
+            pass
+        assert time.monotonic() - throttle_time >= 0.29
+        assert limiter.buckets[None].rate == 10
+
+        limiter.update("read", _response(200))
+        assert limiter.buckets[None].rate == 11
+        LOG.info("Success")
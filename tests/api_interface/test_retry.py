@@ -0,0 +1,105 @@
+from requests.exceptions import ConnectionError, ReadTimeout
+from requests.models import Response
+
+from calm.dsl.tools import get_logging_handle
+from calm.dsl.api.instrumentation import Profiler, register_hook, unregister_hook
+from calm.dsl.api.retry import RetryPolicy
+from calm.dsl.api.timeouts import set_deadline
+
+from tests.perf.pc_stub import PCStub, get_stub_client, get_uuid
+
+LOG = get_logging_handle(__name__)
+
+
+def _response(status_code, retry_after=None):
+    res = Response()
+    res.status_code = status_code
+    if retry_after is not None:
+        res.headers["Retry-After"] = retry_after
+    return res
+
+
+class TestRetry:
+    def test_policy(self):
+
+        policy = RetryPolicy(max_retries=2, backoff=1, max_backoff=3)
+        endpoint = "api/nutanix/v3/apps/list"
+        assert policy.is_retryable("post", endpoint, res=_response(503))
+        assert policy.is_retryable("post", endpoint, exc=ConnectionError())
+        assert not policy.is_retryable("post", endpoint, res=_response(500))
+        assert not policy.is_retryable("post", endpoint, exc=ReadTimeout())
+        assert not policy.is_retryable(
+            "post", "api/nutanix/v3/apps", res=_response(503)
+        )
+
+        # Mutations are not retried, as server may have applied them
+        for method, endpoint in [
+            ("put", "api/nutanix/v3/apps/1"),
+            ("post", "api/nutanix/v3/apps/1/actions/2/run"),
+            ("post", "api/nutanix/v3/blueprints/1/simple_launch"),
+            ("delete", "api/nutanix/v3/apps/1"),
+        ]:
+            assert not policy.is_retryable(method, endpoint, res=_response(503))
+
+        for attempt in range(2):
+            assert 0 <= policy.get_delay(attempt) <= min(3, 2 ** attempt)
+        assert policy.get_delay(2) is None
+
+        # Retry-After of server is honoured
+        assert policy.get_delay(0, _response(429, "2")) >= 2
+
+        # No retry past deadline
+        try:
+            set_deadline(1)
+            assert policy.get_delay(0, _response(429, "2")) is None
+        finally:
+            set_deadline(None)
+        LOG.info("Success")
+
+    def test_retries(self):
+
+        profiler = Profiler()
+        register_hook(profiler.add)
+        try:
+            with PCStub() as stub:
+                client = get_stub_client(
+                    stub, retry_backoff=0.01, circuit_breaker_threshold=0
+                )
+
+                stub.inject_errors(2, status=503)
+                res, err = client.application.read(get_uuid("apps", 0))
+                assert not err
+
+                stub.inject_errors(1, status=429, retry_after=0.1)
+                res, err = client.application.list()
+                assert not err
+
+                # Creates are not retried
+                stub.inject_errors(1, status=503)
+                res, err = client.blueprint.create({"spec": {"name": "bp"}})
+                assert err["code"] == 503
+
+                # Action runs are not retried
+                app_uuid = get_uuid("apps", 2)
+                stub.inject_errors(1, status=502)
+                res, err = client.application.run_action(
+                    app_uuid, "a1", {"metadata": {"uuid": app_uuid}, "spec": {}}
+                )
+                assert err["code"] == 502
+
+                stub.inject_errors(5, status=502)
+                res, err = client.application.read(get_uuid("apps", 1))
+                assert err["code"] == 502
+        finally:
+            unregister_hook(profiler.add)
+
+        attempts = [trace["attempt"] for trace in profiler.traces]
+        assert attempts == [0, 1, 2, 0, 1, 0, 0, 0, 1, 2, 3]
+        rows = {
+            row["method"] + " " + row["endpoint"]: row for row in profiler.summary()
+        }
+        assert rows["GET api/nutanix/v3/apps/<uuid>"]["retries"] == 5
+        run_rows = [row for endpoint, row in rows.items() if endpoint.endswith("/run")]
+        assert len(run_rows) == 1
+        assert run_rows[0]["retries"] == 0
+        LOG.info("Success")
@@ -0,0 +1,90 @@
+import atexit
+
+import pytest
+
+from calm.dsl.tools import get_logging_handle
+from calm.dsl.db import handler
+from calm.dsl.db.table_config import dsl_database
+
+from tests.perf.pc_stub import PCStub, get_stub_client
+
+LOG = get_logging_handle(__name__)
+
+PROJECT_LIST_PATH = ("POST", "/api/nutanix/v3/projects/list")
+
+
+@pytest.fixture
+def session_db(tmp_path, monkeypatch):
+    """Sessions stored in a temporary db"""
+
+    db_location = dsl_database.database
+    dsl_database.init(str(tmp_path / "dsl.db"))
+    monkeypatch.setattr(handler.Database, "db", dsl_database)
+    monkeypatch.setattr(handler, "_Database", None)
+    db = handler.get_db_handle()
+    yield db
+
+    db.close()
+    atexit.unregister(db.close)
+    dsl_database.init(db_location)
+
+
+def _list_projects(client):
+    res, err = client.project.list({"length": 1})
+    assert not err
+    return res
+
+
+def test_session_reuse(session_db):
+
+    with PCStub(sessions=True) as stub:
+        # Session cookie set on basic auth is stored
+        client = get_stub_client(stub, persist_session=True)
+        _list_projects(client)
+        _list_projects(client)
+        assert stub.logins == 1
+        assert session_db.session_table.select().count() == 1
+
+        # Later clients reuse the stored session
+        client = get_stub_client(stub, persist_session=True)
+        res = _list_projects(client)
+        assert "Authorization" not in res.request.headers
+        assert stub.logins == 1
+
+        # Client having another password discards it
+        client = get_stub_client(stub, auth=("admin", "new-pw"), persist_session=True)
+        _list_projects(client)
+        assert stub.logins == 2
+    LOG.info("Success")
+
+
+def test_session_refresh(session_db):
+
+    with PCStub(sessions=True) as stub:
+        _list_projects(get_stub_client(stub, persist_session=True))
+
+        # Expired session is refreshed by basic auth, and stored again
+        stub.expire_sessions()
+        stub.request_counts.clear()
+        client = get_stub_client(stub, persist_session=True)
+        res = _list_projects(client)
+        assert res.history and res.history[0].status_code == 401
+        assert stub.request_counts[PROJECT_LIST_PATH] == 2
+        assert stub.logins == 2
+
+        stub.request_counts.clear()
+        _list_projects(get_stub_client(stub, persist_session=True))
+        assert stub.request_counts[PROJECT_LIST_PATH] == 1
+        assert stub.logins == 2
+    LOG.info("Success")
+
+
+def test_session_without_password(session_db):
+
+    with PCStub() as stub:
+        client = get_stub_client(stub, auth=("admin", None), persist_session=True)
+        assert client.connection.session_store is None
+        _list_projects(client)
+
+    assert session_db.session_table.select().count() == 0
+    LOG.info("Success")
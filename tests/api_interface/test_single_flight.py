@@ -0,0 +1,86 @@
+import threading
+import time
+
+from calm.dsl.tools import get_logging_handle
+from calm.dsl.api.single_flight import SingleFlight
+
+from tests.perf.pc_stub import PCStub, get_stub_client, get_uuid
+
+LOG = get_logging_handle(__name__)
+
+
+class TestSingleFlight:
+    def test_concurrent_calls_are_coalesced(self):
+
+        group = SingleFlight(window=0)
+        calls = []
+
+        def func():
+            calls.append(1)
+            time.sleep(0.2)
+            return "result", None
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(group.do("key", func)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == [("result", None)] * 5
+        LOG.info("Success")
+
+        # Completed results are not shared without window
+        group.do("key", func)
+        assert len(calls) == 2
+
+    def test_window_and_forget(self):
+
+        group = SingleFlight(window=60)
+        calls = []
+
+        def func():
+            calls.append(1)
+            return "result", None
+
+        group.do("key", func)
+        group.do("key", func)
+        assert len(calls) == 1
+
+        group.forget()
+        group.do("key", func)
+        assert len(calls) == 2
+
+    def test_errors_are_not_shared_after_completion(self):
+
+        group = SingleFlight(window=60)
+        calls = []
+
+        def func():
+            calls.append(1)
+            return None, {"error": "failed", "code": 500}
+
+        group.do("key", func)
+        group.do("key", func)
+        assert len(calls) == 2
+
+    def test_completed_reads_are_not_shared_by_default(self):
+
+        with PCStub() as stub:
+            client = get_stub_client(stub)
+
+            # Polls of an entity see its latest state
+            for _ in range(2):
+                res, err = client.project.read(get_uuid("projects", 0))
+                assert not err
+            reads = [
+                count
+                for (method, endpoint), count in stub.request_counts.items()
+                if method == "GET" and endpoint.endswith("/<uuid>")
+            ]
+            assert reads == [2]
+        LOG.info("Success")
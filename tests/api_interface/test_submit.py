@@ -0,0 +1,43 @@
+import pytest
+
+from calm.dsl.tools import get_logging_handle
+
+from tests.perf.pc_stub import PCStub, get_stub_client, get_uuid
+
+LOG = get_logging_handle(__name__)
+
+
+def test_submit():
+
+    with PCStub(latency=0.1) as stub:
+        client = get_stub_client(stub, pool_maxsize=8)
+
+        futures = [
+            client.submit(client.application.read, get_uuid("apps", index))
+            for index in range(8)
+        ]
+        for index, future in enumerate(futures):
+            res, err = future.result()
+            assert not err
+            assert res.json()["status"]["name"] == "app-{}".format(index)
+
+        # Reads are made concurrently, pool is sized to the connection pool
+        assert stub.max_in_flight > 1
+        assert client.connection.get_executor()._max_workers == 8
+
+        # Errors are surfaced per future
+        res, err = client.submit(client.application.read, "unknown").result()
+        assert err["code"] == 404
+
+        def fail():
+            raise ValueError("failed")
+
+        with pytest.raises(ValueError):
+            client.submit(fail).result()
+
+        with client.batch() as batch:
+            with pytest.raises(TypeError):
+                batch.submit(batch.application.read, get_uuid("apps", 0))
+
+        client.connection.close()
+    LOG.info("Success")
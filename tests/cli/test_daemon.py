@@ -0,0 +1,91 @@
+import json
+import os
+import socket
+
+from calm.dsl.tools import get_logging_handle
+from calm.dsl.daemon.client import forward_command, request
+from calm.dsl.daemon.protocol import recv_message, send_message
+from calm.dsl.daemon.server import start_daemon
+
+LOG = get_logging_handle(__name__)
+
+
+class TestDaemon:
+    def test_message_with_fds(self, tmp_path):
+
+        file_path = str(tmp_path / "out.txt")
+        client, server = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        with open(file_path, "w") as fd, client, server:
+            send_message(client, {"op": "run", "argv": ["a" * 100000]}, [fd.fileno()])
+            message, fds = recv_message(server)
+
+        assert message["argv"] == ["a" * 100000]
+        assert len(fds) == 1
+        with os.fdopen(fds[0], "w") as fd:
+            fd.write("written by peer")
+
+        with open(file_path) as fd:
+            assert fd.read() == "written by peer"
+
+    def test_command_is_forwarded(self, tmp_path, capfd):
+
+        socket_path = str(tmp_path / "daemon.sock")
+        pid = start_daemon(socket_path, idle_timeout=60)
+        LOG.info("Started daemon (pid {})".format(pid))
+
+        try:
+            exit_code = forward_command(["--help"], socket_path)
+            assert exit_code == 0
+            assert "Calm CLI" in capfd.readouterr().out
+
+            exit_code = forward_command(["invalid_command"], socket_path)
+            assert exit_code == 2
+
+            assert request("ping", socket_path)["commands_run"] == 2
+
+        finally:
+            request("stop", socket_path)
+
+    def test_commands_run_concurrently(self, tmp_path):
+
+        socket_path = str(tmp_path / "calm" / "daemon.sock")
+        pid = start_daemon(socket_path, idle_timeout=60)
+        LOG.info("Started daemon (pid {})".format(pid))
+
+        # Socket (and its directory) is created accessible only to the user
+        assert os.stat(socket_path).st_mode & 0o777 == 0o600
+        assert os.stat(os.path.dirname(socket_path)).st_mode & 0o077 == 0
+
+        # Command waiting on its (open) stdin keeps running in daemon
+        stdin_fd, stdin_write_fd = os.pipe()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(socket_path)
+            with open(str(tmp_path / "out.txt"), "w") as out_fd:
+                send_message(
+                    sock,
+                    {
+                        "op": "run",
+                        "argv": ["init", "dsl"],
+                        "cwd": os.getcwd(),
+                        "env": dict(os.environ, HOME=str(tmp_path)),
+                    },
+                    [stdin_fd, out_fd.fileno(), out_fd.fileno()],
+                )
+            os.close(stdin_fd)
+            reader = sock.makefile("r")
+            assert "pid" in json.loads(reader.readline())
+
+            # Other commands and control requests are served meanwhile
+            assert forward_command(["--help"], socket_path) == 0
+            res = request("ping", socket_path)
+            assert res["commands_running"] == 1
+            assert res["commands_run"] == 2
+
+            # Exit code is reported once the command exits (aborted on eof)
+            os.close(stdin_write_fd)
+            assert json.loads(reader.readline())["exit_code"] == 1
+
+        finally:
+            sock.close()
+            request("stop", socket_path)
@@ -0,0 +1,21 @@
+import pytest
+
+from tests.perf.pc_stub import PCStub
+
+
+@pytest.fixture
+def pc_stub():
+    """Starts stubs of Prism Central with the given options (see `PCStub`),
+    stopped at the end of test"""
+
+    stubs = []
+
+    def start(**options):
+        stub = PCStub(**options).start()
+        stubs.append(stub)
+        return stub
+
+    yield start
+
+    for stub in stubs:
+        stub.stop()
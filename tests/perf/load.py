@@ -0,0 +1,440 @@
+"""
+load: Load test harness driving calm-dsl workflows against a server
+
+Workflows (api calls made in process, or `calm` commands run as
+subprocesses) are run `iterations` times by `concurrency` threads. The
+report has the throughput and latency of every workflow and of the http
+requests made by it (collected from instrumentation traces).
+
+By default a local `PCStub` is started, so runs are reproducible and need
+no Prism Central.
+
+Example:
+
+python -m tests.perf.load --volume apps=5000 --latency 0.02 --concurrency 8
+python -m tests.perf.load -w list_apps -w groups_apps --iterations 50
+python -m tests.perf.load --server 10.0.0.1:9440 --username admin --password pw
+"""
+
+import argparse
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from prettytable import PrettyTable
+
+from calm.dsl.tools import get_logging_handle
+from calm.dsl.api import get_client_handle, get_resource_api, GroupsQuery
+from calm.dsl.api.instrumentation import Profiler, register_hook, unregister_hook
+
+from .pc_stub import PCStub, get_uuid
+
+LOG = get_logging_handle(__name__)
+
+CONFIG_TEMPLATE = """[SERVER]
+pc_ip = {host}
+pc_port = {port}
+pc_username = {username}
+pc_password = {password}
+
+[PROJECT]
+name = default
+
+[DB]
+location = {db_location}
+
+[LOG]
+level = ERROR
+
+[CATEGORIES]
+
+[CONNECTION]
+"""
+
+
+def list_apps(client, context):
+    return len(list(client.application.iter_entities()))
+
+
+def list_bps(client, context):
+    return len(list(client.blueprint.iter_entities()))
+
+
+def groups_apps(client, context):
+    query = GroupsQuery("app", ["name", "_state", "last_update_time"])
+    return len(list(client.groups.iter_entities(query)))
+
+
+def read_app(client, context):
+    res, err = client.application.read(context.get_uuid("apps"))
+    if err:
+        raise Exception("[{}] - {}".format(err["code"], err["error"]))
+    return 1
+
+
+def describe_project(client, context):
+    res, err = client.project.read(context.get_uuid("projects"))
+    if err:
+        raise Exception("[{}] - {}".format(err["code"], err["error"]))
+
+    subnets = res.json()["status"]["project_status"]["resources"][
+        "subnet_reference_list"
+    ]
+    with client.batch() as batch:
+        subnet_api = get_resource_api("subnets", batch.connection)
+        futures = [subnet_api.read(subnet["uuid"]) for subnet in subnets]
+
+    for future in futures:
+        res, err = future.result()
+        if err:
+            raise Exception("[{}] - {}".format(err["code"], err["error"]))
+    return len(futures) + 1
+
+
+def delete_apps(client, context):
+    """Deletes 10 apps in batch. Stub only, as it deletes (any) apps"""
+
+    with client.batch() as batch:
+        futures = [
+            batch.application.delete(context.get_uuid("apps")) for _ in range(10)
+        ]
+
+    for future in futures:
+        future.result()
+    return len(futures)
+
+
+def download_runlog(client, context):
+    file_name = os.path.join(context.work_dir, "{}.tar".format(threading.get_ident()))
+    res, err = client.application.download_runlog(
+        context.get_uuid("apps"), context.get_uuid("runlogs"), file_name=file_name
+    )
+    if err:
+        raise Exception("[{}] - {}".format(err["code"], err["error"]))
+    return 1
+
+
+def _run_cli(context, *args):
+    if not context.calm:
+        raise Exception("calm cli is not available")
+
+    env = dict(os.environ)
+    env["CALM_DSL_NO_DAEMON"] = "1"
+    proc = subprocess.run(
+        [context.calm] + list(args),
+        cwd=context.work_dir,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+    if proc.returncode:
+        raise Exception(
+            "calm {} failed: {}".format(" ".join(args), proc.stdout.decode()[-500:])
+        )
+    return 1
+
+
+def cli_get_apps(client, context):
+    return _run_cli(context, "get", "apps", "--limit", "250")
+
+
+def cli_get_bps(client, context):
+    return _run_cli(context, "get", "bps", "--limit", "250")
+
+
+WORKFLOWS = {
+    "list_apps": list_apps,
+    "list_bps": list_bps,
+    "groups_apps": groups_apps,
+    "read_app": read_app,
+    "describe_project": describe_project,
+    "delete_apps": delete_apps,
+    "download_runlog": download_runlog,
+    "cli_get_apps": cli_get_apps,
+    "cli_get_bps": cli_get_bps,
+}
+
+# Workflows run if none are given
+DEFAULT_WORKFLOWS = [
+    "list_apps",
+    "groups_apps",
+    "read_app",
+    "describe_project",
+    "download_runlog",
+]
+
+
+class LoadContext:
+    def __init__(self, work_dir, volumes, calm=None):
+        """State shared by the workflows of a run
+
+        Args:
+            work_dir (str): directory having config.ini of cli workflows,
+                            and downloaded files
+            volumes (dict): number of entities per kind on the server
+            calm (str): path of calm cli
+        """
+        self.work_dir = work_dir
+        self.volumes = volumes
+        self.calm = calm
+
+    def get_uuid(self, kind):
+        """Returns the uuid of a random (stub) entity of kind"""
+
+        return get_uuid(kind, random.randrange(max(self.volumes.get(kind, 1), 1)))
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    rank = max(int(math.ceil(percent / 100.0 * len(values))), 1)
+    return values[rank - 1]
+
+
+def run_workflow(client, context, workflow, iterations=10, concurrency=1):
+    """Runs the workflow iterations times using concurrency threads
+
+    Returns:
+        (dict): workflow, iterations, errors, duration, ops (per second),
+            p50, p95, max (of iteration durations), requests, retries, req_p50,
+            req_p95 (of request durations) and error (first error seen).
+            Requests made by subprocesses (cli workflows) are not counted.
+    """
+
+    profiler = Profiler()
+    durations = []
+    errors = []
+    lock = threading.Lock()
+
+    def run_once(_):
+        start = time.perf_counter()
+        try:
+            WORKFLOWS[workflow](client, context)
+        except Exception as exc:
+            with lock:
+                errors.append(exc)
+            return
+
+        with lock:
+            durations.append(time.perf_counter() - start)
+
+    register_hook(profiler.add)
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(run_once, range(iterations)))
+    finally:
+        unregister_hook(profiler.add)
+    duration = time.perf_counter() - start
+
+    request_durations = [trace["total"] for trace in profiler.traces]
+    return {
+        "workflow": workflow,
+        "iterations": iterations,
+        "errors": len(errors),
+        "error": str(errors[0]) if errors else None,
+        "duration": duration,
+        "ops": len(durations) / duration if duration else 0.0,
+        "p50": _percentile(durations, 50),
+        "p95": _percentile(durations, 95),
+        "max": max(durations) if durations else 0.0,
+        "requests": len(request_durations),
+        "retries": len([trace for trace in profiler.traces if trace["attempt"]]),
+        "req_p50": _percentile(request_durations, 50),
+        "req_p95": _percentile(request_durations, 95),
+    }
+
+
+def run_load(
+    workflows=None,
+    iterations=10,
+    concurrency=1,
+    stub_options=None,
+    server=None,
+    auth=("admin", "password"),
+):
+    """Runs the workflows against server (or a local stub)
+
+    Args:
+        workflows (list): names of workflows (default: DEFAULT_WORKFLOWS)
+        iterations (int): runs of every workflow
+        concurrency (int): threads running a workflow
+        stub_options (dict): options of the local stub (see `PCStub`)
+        server (tuple): (host, port) of server used instead of the stub
+        auth (tuple): (username, password) of server
+    Returns:
+        (list of dict): result of every workflow (see `run_workflow`)
+    """
+
+    workflows = workflows or DEFAULT_WORKFLOWS
+    for workflow in workflows:
+        if workflow not in WORKFLOWS:
+            raise ValueError(
+                "Invalid workflow {}. Select from {}".format(
+                    workflow, list(WORKFLOWS.keys())
+                )
+            )
+
+    stub = None
+    work_dir = tempfile.mkdtemp(prefix="calm_load_")
+    try:
+        if server:
+            host, port = server
+            scheme = "https"
+            volumes = {}
+        else:
+            stub = PCStub(**(stub_options or {})).start()
+            host, port, scheme = stub.host, stub.port, stub.scheme
+            LOG.info("Started stub on {}://{}:{}".format(scheme, host, port))
+            volumes = stub.volumes
+
+        with open(os.path.join(work_dir, "config.ini"), "w") as fd:
+            fd.write(
+                CONFIG_TEMPLATE.format(
+                    host=host,
+                    port=port,
+                    username=auth[0],
+                    password=auth[1],
+                    db_location=os.path.join(work_dir, "dsl.db"),
+                )
+            )
+
+        # Cli always connects using https
+        calm = shutil.which("calm") if scheme == "https" else None
+        context = LoadContext(work_dir, volumes, calm=calm)
+        client = get_client_handle(host, port, scheme=scheme, auth=auth, temp=True)
+
+        return [
+            run_workflow(
+                client,
+                context,
+                workflow,
+                iterations=iterations,
+                concurrency=concurrency,
+            )
+            for workflow in workflows
+        ]
+
+    finally:
+        if stub:
+            stub.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def get_report(results):
+    table = PrettyTable()
+    table.field_names = [
+        "WORKFLOW",
+        "ITERATIONS",
+        "ERRORS",
+        "OPS/S",
+        "P50 (ms)",
+        "P95 (ms)",
+        "MAX (ms)",
+        "REQUESTS",
+        "RETRIES",
+        "REQ/S",
+        "REQ P50 (ms)",
+        "REQ P95 (ms)",
+    ]
+    for result in results:
+        table.add_row(
+            [
+                result["workflow"],
+                result["iterations"],
+                result["errors"],
+                "{:.1f}".format(result["ops"]),
+                "{:.1f}".format(result["p50"] * 1000),
+                "{:.1f}".format(result["p95"] * 1000),
+                "{:.1f}".format(result["max"] * 1000),
+                result["requests"],
+                result["retries"],
+                "{:.1f}".format(result["requests"] / result["duration"]),
+                "{:.1f}".format(result["req_p50"] * 1000),
+                "{:.1f}".format(result["req_p95"] * 1000),
+            ]
+        )
+
+    report = str(table)
+    for result in results:
+        if result["error"]:
+            report += "\n{}: {}".format(result["workflow"], result["error"])
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test calm-dsl workflows")
+    parser.add_argument(
+        "-w",
+        "--workflow",
+        action="append",
+        default=[],
+        choices=list(WORKFLOWS.keys()),
+        help="Workflow to run (default: {})".format(", ".join(DEFAULT_WORKFLOWS)),
+    )
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of requests failed by stub"
+    )
+    parser.add_argument(
+        "--volume",
+        action="append",
+        default=[],
+        metavar="KIND=COUNT",
+        help="Number of entities of kind on stub (Ex: apps=5000)",
+    )
+    parser.add_argument(
+        "--certfile", default=None, help="Serve https from stub (cli workflows)"
+    )
+    parser.add_argument("--keyfile", default=None)
+    parser.add_argument(
+        "--server", default=None, help="HOST:PORT of server used instead of stub"
+    )
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="password")
+    args = parser.parse_args()
+
+    volumes = {}
+    for volume in args.volume:
+        kind, _, count = volume.partition("=")
+        volumes[kind] = int(count)
+
+    server = None
+    if args.server:
+        host, _, port = args.server.partition(":")
+        server = (host, int(port or 9440))
+
+    results = run_load(
+        workflows=args.workflow,
+        iterations=args.iterations,
+        concurrency=args.concurrency,
+        stub_options={
+            "volumes": volumes,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "error_rate": args.error_rate,
+            "certfile": args.certfile,
+            "keyfile": args.keyfile,
+        },
+        server=server,
+        auth=(args.username, args.password),
+    )
+    print(get_report(results))
+
+    if any(result["errors"] for result in results):
+        sys.exit(-1)
+
+
+if __name__ == "__main__":
+    main()
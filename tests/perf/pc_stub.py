@@ -0,0 +1,830 @@
+"""
+pc_stub: Local stand-in of Prism Central for benchmarking calm-dsl
+
+Serves the v3 endpoints used by calm-dsl (blueprints, apps, runlogs,
+projects, groups, batch, marketplace, images, subnets, accounts, app icons)
+from memory. Entities are generated on demand from their index, so large
+volumes cost no memory. Every response is delayed by `latency` (+ random
+`jitter`) seconds.
+
+Example:
+
+with PCStub(volumes={"apps": 5000}, latency=0.02) as stub:
+    client = get_stub_client(stub)
+    ...
+    print(stub.request_counts)
+
+Run standalone (Ex: for `calm` commands, which use https):
+python -m tests.perf.pc_stub --port 9440 --certfile cert.pem --keyfile key.pem
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import re
+import ssl
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from email.parser import BytesParser
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from calm.dsl.tools import get_logging_handle
+from calm.dsl.api import get_client_handle
+from calm.dsl.api.instrumentation import get_endpoint_template
+
+LOG = get_logging_handle(__name__)
+
+API_ROOT = "/api/nutanix/v3/"
+
+# Number of entities served per kind, if not given
+DEFAULT_VOLUMES = {
+    "blueprints": 200,
+    "apps": 500,
+    "projects": 5,
+    "images": 50,
+    "subnets": 10,
+    "accounts": 3,
+    "app_icons": 10,
+    "calm_marketplace_items": 50,
+}
+
+# Kinds of entities queried using groups api
+GROUP_ENTITY_KINDS = {
+    "blueprint": "blueprints",
+    "app": "apps",
+    "project": "projects",
+    "image": "images",
+    "subnet": "subnets",
+    "account": "accounts",
+    "marketplace_item": "calm_marketplace_items",
+    "network_function_chain": "network_function_chains",
+}
+
+# Paths of v3 apis, served by the same kind
+KIND_ALIASES = {"projects_internal": "projects"}
+
+# Name of session cookie set by server
+SESSION_COOKIE = "NTNX_IGW_SESSION"
+
+# Maximum page length of list and groups apis
+MAX_PAGE_LENGTH = 250
+
+
+def get_uuid(kind, index):
+    """Returns the (deterministic) uuid of index'th entity of kind"""
+
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, "{}/{}".format(kind, index)))
+
+
+def get_name(kind, index):
+    return "{}-{}".format(kind.rstrip("s"), index)
+
+
+def get_update_time(index):
+    """Returns the last_update_time (usecs) of index'th generated entity"""
+
+    return 1577836800000000 + index * 1000000
+
+
+def _match_name(condition, name):
+    """Applies the name condition (Ex: name==a.*, groups api name=cs=a)"""
+
+    if condition.startswith("name=cs="):
+        return condition.split("=cs=", 1)[1].lower() in name.lower()
+
+    return re.fullmatch(condition.split("==", 1)[-1], name) is not None
+
+
+def _match_filter(name, filter_query):
+    """Applies the name terms of filter (Ex: name==abc;state!=DELETED)"""
+
+    if not filter_query:
+        return True
+
+    for term in filter_query.split(";"):
+        conditions = term.strip("()").split(",")
+        if not all(condition.startswith("name=") for condition in conditions):
+            continue
+
+        if not any(_match_name(condition, name) for condition in conditions):
+            return False
+
+    return True
+
+
+class _Server(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients going away (Ex: on timeouts) are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class PCStub:
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        volumes=None,
+        latency=0.0,
+        jitter=0.0,
+        runlog_size=1024 * 1024,
+        gzip_downloads=False,
+        download_cutoff=None,
+        page_length=MAX_PAGE_LENGTH,
+        error_rate=0.0,
+        reject_gzip=False,
+        sessions=False,
+        sort_lists=True,
+        certfile=None,
+        keyfile=None,
+    ):
+        """Stub server
+
+        Args:
+            host (str): address to listen on
+            port (int): port to listen on (0: any free port)
+            volumes (dict): number of entities per kind (Ex: {"apps": 1000})
+            latency (float): seconds by which every response is delayed
+            jitter (float): maximum random seconds added to latency
+            runlog_size (int): size of downloaded runlog archives
+            gzip_downloads (bool): gzip the downloaded runlog archives, if
+                                   accepted by client
+            download_cutoff (int): bytes of runlog archives served before
+                                   the response stalls (for a second) and
+                                   the connection is dropped
+            page_length (int): maximum page length of list/groups apis
+            error_rate (float): share of requests failed with 503
+            reject_gzip (bool): fail gzip encoded requests with 415
+            sessions (bool): authenticate requests by basic auth or session
+                             cookie (set on basic auth), failing others
+                             with 401
+            sort_lists (bool): sort lists by last_update_time, if asked
+            certfile (str): certificate file, serves https if given
+            keyfile (str): private key file of certificate
+        """
+        self.volumes = dict(DEFAULT_VOLUMES)
+        self.volumes.update(volumes or {})
+        self.latency = latency
+        self.jitter = jitter
+        self.runlog_size = runlog_size
+        self.gzip_downloads = gzip_downloads
+        self.download_cutoff = download_cutoff
+        self.page_length = page_length
+        self.error_rate = error_rate
+        self.reject_gzip = reject_gzip
+        self.sessions = sessions
+        self.sort_lists = sort_lists
+
+        # Valid session cookies, and number of basic auth logins
+        self.session_tokens = set()
+        self.logins = 0
+        self.request_counts = Counter()
+
+        # Requests being served, and the most served at once
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        # Errors (status, Retry-After) returned for the next requests
+        self._errors = []
+
+        # Entities created/deleted by requests, per kind
+        self.created = {}
+        self.deleted = {}
+        self.create_counts = Counter()
+
+        # Files uploaded (content type, content), by name
+        self.uploads = {}
+
+        # Index of generated entities by uuid, per kind (built on first use)
+        self._indexes = {}
+
+        self._lock = threading.Lock()
+        self._thread = None
+        self.server = _Server((host, port), _make_handler(self))
+        self.scheme = "http"
+        if certfile:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile, keyfile)
+            self.server.socket = context.wrap_socket(
+                self.server.socket, server_side=True
+            )
+            self.scheme = "https"
+
+    @property
+    def host(self):
+        return self.server.server_address[0]
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def delay(self):
+        wait = self.latency
+        if self.jitter:
+            wait += random.uniform(0, self.jitter)
+        if wait:
+            time.sleep(wait)
+
+    def inject_errors(self, count, status=503, retry_after=None):
+        """Fails the next count requests with status"""
+
+        with self._lock:
+            self._errors.extend([(status, retry_after)] * count)
+
+    def get_error(self):
+        """Returns (status, Retry-After) of error to be returned for the
+        request, None if it is to be served"""
+
+        with self._lock:
+            if self._errors:
+                return self._errors.pop(0)
+
+        if self.error_rate and random.random() < self.error_rate:
+            return 503, None
+
+        return None
+
+    def authenticate(self, headers):
+        """Returns (True if authenticated, new session cookie) of request"""
+
+        cookie = SimpleCookie(headers.get("Cookie", "")).get(SESSION_COOKIE)
+        with self._lock:
+            if cookie is not None and cookie.value in self.session_tokens:
+                return True, None
+
+            if headers.get("Authorization", "").startswith("Basic "):
+                self.logins += 1
+                token = str(uuid.uuid4())
+                self.session_tokens.add(token)
+                return True, token
+
+        return False, None
+
+    def expire_sessions(self):
+        with self._lock:
+            self.session_tokens.clear()
+
+    def count_request(self, method, path):
+        with self._lock:
+            self.request_counts[(method, get_endpoint_template(path))] += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def end_request(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def get_entity(self, kind, index):
+        """Returns the index'th entity of kind, as returned by v3 apis"""
+
+        entity_uuid = get_uuid(kind, index)
+        name = get_name(kind, index)
+        spec_kind = kind.rstrip("s")
+        resources = {}
+        if kind == "apps":
+            resources = {
+                "app_blueprint_reference": {
+                    "kind": "blueprint",
+                    "name": get_name("blueprints", index % 10),
+                },
+                "action_list": [
+                    {"name": "action_{}".format(action), "uuid": get_uuid(action, 0)}
+                    for action in ["create", "start", "stop", "delete"]
+                ],
+            }
+        elif kind == "projects":
+            resources = {
+                "user_reference_list": [
+                    {"kind": "user", "name": "admin", "uuid": get_uuid("users", 0)}
+                ],
+                "subnet_reference_list": [
+                    {
+                        "kind": "subnet",
+                        "name": get_name("subnets", i),
+                        "uuid": get_uuid("subnets", i),
+                    }
+                    for i in range(min(3, self.volumes.get("subnets", 0)))
+                ],
+                "account_reference_list": [],
+                "environment_reference_list": [],
+            }
+        elif kind == "accounts":
+            resources = {"type": "nutanix_pc", "state": "VERIFIED"}
+        elif kind == "subnets":
+            resources = {"vlan_id": index}
+
+        entity = {
+            "api_version": "3.0",
+            "metadata": {
+                "kind": spec_kind,
+                "uuid": entity_uuid,
+                "name": name,
+                "spec_version": 1,
+                "creation_time": "1577836800000000",
+                "last_update_time": str(get_update_time(index)),
+                "owner_reference": {"kind": "user", "name": "admin"},
+                "project_reference": {"kind": "project", "name": "default"},
+                "categories": {},
+            },
+            "spec": {"name": name, "description": "", "resources": resources},
+            "status": {
+                "name": name,
+                "uuid": entity_uuid,
+                "description": "",
+                "state": "running" if kind == "apps" else "ACTIVE",
+                "application_count": 0,
+                "resources": resources,
+            },
+        }
+        if kind == "projects":
+            entity["status"]["project_status"] = {"resources": resources}
+            entity["status"]["access_control_policy_list_status"] = []
+        if kind == "subnets":
+            entity["status"]["cluster_reference"] = {
+                "kind": "cluster",
+                "name": "cluster-0",
+            }
+
+        return entity
+
+    def get_index(self, kind):
+        """Returns the index of generated entities of kind by uuid"""
+
+        with self._lock:
+            if kind not in self._indexes:
+                self._indexes[kind] = {
+                    get_uuid(kind, index): index
+                    for index in range(self.volumes.get(kind, 0))
+                }
+            return self._indexes[kind]
+
+    def find_entity(self, kind, entity_uuid):
+        """Returns the entity of kind having uuid, None if not present"""
+
+        if entity_uuid in self.deleted.get(kind, set()):
+            return None
+
+        if entity_uuid in self.created.get(kind, {}):
+            return self.created[kind][entity_uuid]
+
+        index = self.get_index(kind).get(entity_uuid, None)
+        if index is None:
+            return None
+
+        return self.get_entity(kind, index)
+
+    def find_entities(self, kind, filter_query=None):
+        """Returns the entities of kind matching filter, as a list holding
+        the index of generated entities and created entities themselves"""
+
+        deleted = self.deleted.get(kind, set())
+        refs = []
+        for index in range(self.volumes.get(kind, 0)):
+            if filter_query and not _match_filter(get_name(kind, index), filter_query):
+                continue
+            refs.append(index)
+
+        if deleted:
+            uuid_index = self.get_index(kind)
+            deleted_indexes = {uuid_index.get(uuid) for uuid in deleted}
+            refs = [index for index in refs if index not in deleted_indexes]
+
+        for entity in list(self.created.get(kind, {}).values()):
+            if _match_filter(entity["status"]["name"], filter_query):
+                refs.append(entity)
+
+        return refs
+
+    def get_page(self, kind, refs):
+        return [
+            ref if isinstance(ref, dict) else self.get_entity(kind, ref) for ref in refs
+        ]
+
+    def list_entities(self, kind, payload):
+        offset = int(payload.get("offset", 0) or 0)
+        length = min(int(payload.get("length", 20) or 20), self.page_length)
+        entities = self.find_entities(kind, payload.get("filter"))
+        metadata = {"kind": kind.rstrip("s")}
+        if self.sort_lists and payload.get("sort_attribute") == "last_update_time":
+            entities.sort(
+                key=lambda ref: get_update_time(ref)
+                if not isinstance(ref, dict)
+                else int(ref["metadata"]["last_update_time"]),
+                reverse=payload.get("sort_order") == "DESCENDING",
+            )
+            metadata["sort_attribute"] = payload["sort_attribute"]
+            metadata["sort_order"] = payload.get("sort_order", "ASCENDING")
+        page = self.get_page(kind, entities[offset:][:length])
+        metadata.update(total_matches=len(entities), length=len(page), offset=offset)
+        return {"api_version": "3.0", "metadata": metadata, "entities": page}
+
+    def query_groups(self, payload):
+        kind = GROUP_ENTITY_KINDS.get(payload.get("entity_type"))
+        if not kind:
+            return None
+
+        offset = int(payload.get("group_member_offset", 0) or 0)
+        length = min(int(payload.get("group_member_count", 20) or 20), self.page_length)
+        entities = self.find_entities(kind, payload.get("filter_criteria"))
+
+        entity_results = []
+        for entity in self.get_page(kind, entities[offset:][:length]):
+            data = []
+            resources = entity["status"].get("resources", {})
+            for attribute in payload.get("group_member_attributes", []):
+                name = attribute["attribute"]
+                value = entity["status"].get(name)
+                if name == "_state":
+                    value = entity["status"]["state"]
+                elif name == "_created_timestamp_usecs_":
+                    value = entity["metadata"]["creation_time"]
+                elif name.endswith("_timestamp_usecs_"):
+                    value = entity["metadata"]["last_update_time"]
+                elif name == "owner_username":
+                    value = entity["metadata"]["owner_reference"]["name"]
+                elif name == "project_name":
+                    value = entity["metadata"]["project_reference"]["name"]
+                elif name == "blueprint_name":
+                    value = resources["app_blueprint_reference"]["name"]
+                elif name == "user_uuids":
+                    value = [ref["uuid"] for ref in resources["user_reference_list"]]
+                elif name == "categories":
+                    value = [
+                        "{}:{}".format(key, category_value)
+                        for key, category_value in entity["metadata"][
+                            "categories"
+                        ].items()
+                    ]
+                elif kind == "accounts" and name in ["type", "state"]:
+                    value = resources[name]
+
+                values = value if isinstance(value, list) else [value]
+                values = [
+                    v for v in values if v is not None and not isinstance(v, dict)
+                ]
+                data.append(
+                    {
+                        "name": name,
+                        "values": [{"values": values, "time": 0}] if values else [],
+                    }
+                )
+            entity_results.append(
+                {"entity_id": entity["metadata"]["uuid"], "data": data}
+            )
+
+        return {
+            "entity_type": payload["entity_type"],
+            "filtered_entity_count": len(entities),
+            "total_entity_count": len(entities),
+            "group_results": [{"entity_results": entity_results}],
+        }
+
+    def create_entity(self, kind, payload):
+        spec = payload.get("spec", {}) or {}
+        name = spec.get("name") or (payload.get("metadata", {}) or {}).get("name")
+        with self._lock:
+            index = self.volumes.get(kind, 0) + self.create_counts[kind]
+            self.create_counts[kind] += 1
+        entity = self.get_entity(kind, index)
+        entity["spec"] = spec
+        entity["status"]["name"] = name or entity["status"]["name"]
+        entity["metadata"]["name"] = entity["status"]["name"]
+        entity["metadata"]["last_update_time"] = str(int(time.time() * 1000000))
+        with self._lock:
+            self.created.setdefault(kind, {})[entity["metadata"]["uuid"]] = entity
+        return entity
+
+    def delete_entity(self, kind, entity_uuid):
+        with self._lock:
+            self.created.get(kind, {}).pop(entity_uuid, None)
+            self.deleted.setdefault(kind, set()).add(entity_uuid)
+
+    def upload_file(self, content_type, body):
+        """Stores the image of multipart/form-data upload of app icon"""
+
+        message = BytesParser().parsebytes(
+            "Content-Type: {}\r\n\r\n".format(content_type).encode() + body
+        )
+        fields = {
+            part.get_param("name", header="content-disposition"): part
+            for part in message.get_payload()
+        }
+        name = fields["name"].get_payload(decode=True).decode()
+        image = fields["image"]
+        with self._lock:
+            self.uploads[name] = (
+                image.get_content_type(),
+                image.get_payload(decode=True),
+            )
+        return self.create_entity("app_icons", {"spec": {"name": name}})
+
+    def get_runlog(self, runlog_uuid):
+        """Returns the (deterministic) runlog archive content"""
+
+        seed = hashlib.sha256(runlog_uuid.encode()).digest()
+        return (seed * (self.runlog_size // len(seed) + 1))[: self.runlog_size]
+
+    def handle(self, method, path, payload):
+        """Returns (status code, response body) of the request"""
+
+        parsed = urlparse(path)
+        if not parsed.path.startswith(API_ROOT):
+            return 404, {"message": "Unknown path {}".format(parsed.path)}
+
+        parts = parsed.path.replace(API_ROOT, "", 1).strip("/").split("/")
+        kind = KIND_ALIASES.get(parts[0], parts[0])
+
+        if kind == "groups" and method == "POST":
+            response = self.query_groups(payload)
+            if response is None:
+                return 400, {"message": "Unknown entity type"}
+            return 200, response
+
+        if kind == "batch" and method == "POST":
+            return 200, self.run_batch(payload)
+
+        if kind == "services" and parts[-1] == "status":
+            return 200, {"service_enablement_status": "ENABLED"}
+
+        if parts[-1] == "list" and method == "POST":
+            if len(parts) == 2:
+                return 200, self.list_entities(kind, payload)
+            # Nested lists (Ex: app runlogs)
+            return 200, {"metadata": {"total_matches": 0}, "entities": []}
+
+        if len(parts) == 1:
+            if method == "POST":
+                return 200, self.create_entity(kind, payload)
+            return 404, {"message": "Unknown path {}".format(parsed.path)}
+
+        if kind == "blueprints" and parts[1] == "import_json":
+            return 200, self.create_entity(kind, payload)
+
+        entity = self.find_entity(kind, parts[1])
+        if not entity:
+            return 404, {"message": "{} {} not found".format(kind, parts[1])}
+
+        if len(parts) == 2:
+            if method == "GET":
+                return 200, entity
+            if method == "PUT":
+                # Only created entities keep the updates
+                entity["spec"] = payload.get("spec", entity["spec"])
+                if entity["spec"].get("name", None):
+                    entity["status"]["name"] = entity["spec"]["name"]
+                entity["metadata"]["last_update_time"] = str(int(time.time() * 1000000))
+                return 200, entity
+            if method == "DELETE":
+                self.delete_entity(kind, parts[1])
+                return 202, {"status": {"runlog_uuid": str(uuid.uuid4())}}
+
+        action = parts[2]
+        if action in ["simple_launch", "launch"]:
+            return 200, {"status": {"request_id": str(uuid.uuid4())}}
+        if action == "pending_launches":
+            app_uuid = get_uuid("apps", 0)
+            return (
+                200,
+                {"status": {"state": "success", "application_uuid": app_uuid}},
+            )
+        if action == "runtime_editables":
+            return 200, {"resources": []}
+        if action == "export_json":
+            return 200, entity
+        if action == "is_marketplaceicon":
+            return 200, {"is_marketplaceicon": False}
+        if action == "actions":
+            return 200, {"status": {"runlog_uuid": str(uuid.uuid4())}}
+
+        return 404, {"message": "Unknown path {}".format(parsed.path)}
+
+    def run_batch(self, payload):
+        api_response_list = []
+        for api_request in payload.get("api_request_list", []):
+            path = api_request["path_and_params"]
+            status, body = self.handle(
+                api_request["operation"].upper(), path, api_request.get("body") or {}
+            )
+            api_response_list.append(
+                {"status": str(status), "path_and_params": path, "api_response": body}
+            )
+        return {"api_version": "3.0", "api_response_list": api_response_list}
+
+
+def get_stub_client(stub, **kwargs):
+    """Returns a client (not stored as the default one) of stub, logged in as
+    admin. kwargs are passed to `get_client_handle` (Ex: retry_backoff)"""
+
+    kwargs.setdefault("scheme", stub.scheme)
+    kwargs.setdefault("auth", ("admin", "pw"))
+    return get_client_handle(stub.host, stub.port, temp=True, **kwargs)
+
+
+def _make_handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        # Session cookie set by the response
+        _session_token = None
+
+        def log_message(self, *args):
+            pass
+
+        def _read_body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            if self.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            self._body = body
+
+            content_type = self.headers.get("Content-Type", "")
+            if body and content_type.startswith("application/json"):
+                return json.loads(body)
+            return {}
+
+        def _respond(
+            self,
+            status,
+            body,
+            content_type="application/json",
+            retry_after=None,
+            headers=None,
+            cutoff=None,
+        ):
+            if not isinstance(body, bytes):
+                body = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            if retry_after is not None:
+                self.send_header("Retry-After", str(retry_after))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if self._session_token:
+                self.send_header(
+                    "Set-Cookie",
+                    "{}={}; Path=/".format(SESSION_COOKIE, self._session_token),
+                )
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if cutoff is not None:
+                # Response stalls, and connection is dropped before the whole
+                # body is sent
+                self.wfile.write(body[:cutoff])
+                self.wfile.flush()
+                time.sleep(1)
+                self.close_connection = True
+                return
+            self.wfile.write(body)
+
+        def _handle(self, method):
+            payload = self._read_body()
+            stub.count_request(method, self.path)
+            try:
+                self._serve(method, payload)
+            finally:
+                stub.end_request()
+
+        def _serve(self, method, payload):
+            stub.delay()
+
+            self._session_token = None
+            if stub.sessions:
+                authenticated, self._session_token = stub.authenticate(self.headers)
+                if not authenticated:
+                    return self._respond(401, {"message": "Authentication required"})
+
+            if stub.reject_gzip and self.headers.get("Content-Encoding") == "gzip":
+                return self._respond(415, {"message": "Unsupported encoding"})
+
+            error = stub.get_error()
+            if error:
+                status, retry_after = error
+                return self._respond(
+                    status, {"message": "Injected error"}, retry_after=retry_after
+                )
+
+            path = urlparse(self.path).path
+            if path.endswith("/output/download"):
+                return self._download(stub.get_runlog(path.split("/")[-3]))
+            if path.endswith("/upload"):
+                return self._respond(
+                    200, stub.upload_file(self.headers.get("Content-Type"), self._body),
+                )
+
+            status, body = stub.handle(method, self.path, payload)
+            self._respond(status, body)
+
+        def _download(self, content):
+            """Serves content, from the offset of range requested"""
+
+            status = 200
+            headers = {}
+            match = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range", ""))
+            if match:
+                start = int(match.group(1))
+                headers["Content-Range"] = "bytes {}-{}/{}".format(
+                    start, len(content) - 1, len(content)
+                )
+                content = content[start:]
+                status = 206
+
+            if stub.gzip_downloads and "gzip" in self.headers.get(
+                "Accept-Encoding", ""
+            ):
+                content = gzip.compress(content)
+                headers["Content-Encoding"] = "gzip"
+
+            self._respond(
+                status,
+                content,
+                content_type="application/octet-stream",
+                headers=headers,
+                cutoff=stub.download_cutoff,
+            )
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+        def do_PUT(self):
+            self._handle("PUT")
+
+        def do_DELETE(self):
+            self._handle("DELETE")
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prism Central stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9440)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of requests failed"
+    )
+    parser.add_argument(
+        "--volume",
+        action="append",
+        default=[],
+        metavar="KIND=COUNT",
+        help="Number of entities of kind (Ex: apps=5000)",
+    )
+    parser.add_argument("--certfile", default=None)
+    parser.add_argument("--keyfile", default=None)
+    args = parser.parse_args()
+
+    volumes = {}
+    for volume in args.volume:
+        kind, _, count = volume.partition("=")
+        volumes[kind] = int(count)
+
+    stub = PCStub(
+        args.host,
+        args.port,
+        volumes=volumes,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        certfile=args.certfile,
+        keyfile=args.keyfile,
+    )
+    LOG.info("Serving on {}://{}:{}".format(stub.scheme, stub.host, stub.port))
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
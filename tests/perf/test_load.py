@@ -0,0 +1,49 @@
+from calm.dsl.tools import get_logging_handle
+from calm.dsl.api import GroupsQuery
+
+from .load import run_load, get_report, DEFAULT_WORKFLOWS
+from .pc_stub import PCStub, get_stub_client, get_uuid
+
+LOG = get_logging_handle(__name__)
+
+
+def test_pc_stub():
+    with PCStub(volumes={"apps": 600}) as stub:
+        client = get_stub_client(stub)
+
+        apps = list(client.application.iter_entities())
+        assert len(apps) == 600
+        assert len({app["metadata"]["uuid"] for app in apps}) == 600
+
+        app_uuid = get_uuid("apps", 7)
+        res, err = client.application.read(app_uuid)
+        assert not err
+        assert res.json()["status"]["name"] == "app-7"
+
+        rows = list(
+            client.groups.iter_entities(GroupsQuery("app", ["name"]), limit=300)
+        )
+        assert len(rows) == 300
+        assert rows[7] == {"name": "app-7", "entity_id": app_uuid}
+
+        with client.batch() as batch:
+            futures = [batch.application.delete(get_uuid("apps", i)) for i in range(5)]
+        assert all(not future.result()[1] for future in futures)
+        assert len(list(client.application.iter_entities())) == 595
+
+        assert stub.request_counts[("POST", "/api/nutanix/v3/batch")] == 1
+
+
+def test_run_load():
+    results = run_load(
+        iterations=4, concurrency=2, stub_options={"volumes": {"apps": 300}}
+    )
+
+    assert [result["workflow"] for result in results] == DEFAULT_WORKFLOWS
+    for result in results:
+        assert not result["errors"], result["error"]
+        # Concurrent identical requests may be coalesced
+        assert result["requests"] > 0
+        assert result["ops"] > 0
+
+    assert "list_apps" in get_report(results)
@@ -0,0 +1,323 @@
+import atexit
+import configparser
+import time
+
+import pytest
+
+from calm.dsl.tools import get_logging_handle
+from calm.dsl.api import get_resource_api
+from calm.dsl.db import handler
+from calm.dsl.db.table_config import dsl_database
+from calm.dsl.store import Cache, CacheEntity
+from calm.dsl.store import cache
+
+from tests.perf.pc_stub import get_stub_client, get_uuid
+
+LOG = get_logging_handle(__name__)
+
+
+@pytest.fixture
+def cache_db(tmp_path, monkeypatch):
+    """Cache backed by a temporary db"""
+
+    db_location = dsl_database.database
+    dsl_database.init(str(tmp_path / "dsl.db"))
+    monkeypatch.setattr(handler.Database, "db", dsl_database)
+    monkeypatch.setattr(handler, "_Database", None)
+    cache._lookup_entity_uuid.cache_clear()
+    db = handler.get_db_handle()
+    yield db
+
+    db.close()
+    atexit.unregister(db.close)
+    dsl_database.init(db_location)
+    cache._lookup_entity_uuid.cache_clear()
+
+
+@pytest.fixture
+def cache_stub(pc_stub, monkeypatch):
+    """Starts a stub with the given options (see `PCStub`), whose client is
+    used by cache"""
+
+    def start(request_coalescing=True, **options):
+        stub = pc_stub(**options)
+        client = get_stub_client(stub, request_coalescing=request_coalescing)
+        monkeypatch.setattr(cache, "get_api_client", lambda: client)
+        return stub
+
+    return start
+
+
+def test_lookup(cache_db):
+
+    Cache.replace_entities("AHV_DISK_IMAGE", {"centos": "image-uuid"})
+    Cache.replace_entities("AHV_SUBNET", {"centos": "subnet-uuid"})
+
+    # Entities of other types having same name are not matched
+    assert Cache.get_entity_uuid("AHV_SUBNET", "centos") == "subnet-uuid"
+    assert Cache.get_entity_uuid("AHV_DISK_IMAGE", "centos") == "image-uuid"
+    assert Cache.get_entity_uuid("PROJECT", "centos") is None
+
+    # Lookups are served from memory, and forgotten when cache changes
+    hits = cache._lookup_entity_uuid.cache_info().hits
+    assert Cache.get_entity_uuid("AHV_SUBNET", "centos") == "subnet-uuid"
+    assert cache._lookup_entity_uuid.cache_info().hits == hits + 1
+
+    Cache.replace_entities("AHV_SUBNET", {"ubuntu": "subnet-uuid-2"})
+    assert Cache.get_entity_uuid("AHV_SUBNET", "centos") is None
+    assert Cache.get_entity_uuid("AHV_SUBNET", "ubuntu") == "subnet-uuid-2"
+
+    Cache.clear_entities()
+    assert Cache.list() == []
+    assert Cache.get_entity_uuid("AHV_DISK_IMAGE", "centos") is None
+    LOG.info("Success")
+
+
+def test_sync(cache_db, cache_stub):
+
+    cache_stub(volumes={"images": 10000, "subnets": 20})
+    Cache.sync()
+
+    entities = Cache.list()
+    assert len(entities) == 10000 + 20 + 5
+    assert Cache.get_entity_uuid("AHV_DISK_IMAGE", "image-9999") == get_uuid(
+        "images", 9999
+    )
+
+    # 10k rows are replaced at once
+    Cache.replace_entities(
+        "AHV_DISK_IMAGE",
+        {"image-{}".format(index): str(index) for index in range(10000)},
+    )
+    assert len(Cache.list()) == 10000 + 20 + 5
+    assert Cache.get_entity_uuid("AHV_DISK_IMAGE", "image-9999") == "9999"
+    LOG.info("Success")
+
+
+def test_delta_sync(cache_db, cache_stub):
+
+    stub = cache_stub(volumes={"images": 2000, "subnets": 20})
+    images = get_resource_api("images", cache.get_api_client().connection)
+
+    Cache.sync()
+    assert Cache.get_max_update_time("AHV_DISK_IMAGE") is not None
+
+    res, err = images.create({"spec": {"name": "centos"}})
+    centos_uuid = res.json()["metadata"]["uuid"]
+    res, err = images.create({"spec": {"name": "ubuntu"}})
+    ubuntu_uuid = res.json()["metadata"]["uuid"]
+    images.delete(get_uuid("images", 7))
+    Cache.sync("AHV_DISK_IMAGE")
+    assert Cache.get_entity_uuid("AHV_DISK_IMAGE", "centos") == centos_uuid
+    assert Cache.get_entity_uuid("AHV_DISK_IMAGE", "image-7") is None
+
+    # Renames, deletes and creates are synced from a single page of list
+    stub.request_counts.clear()
+    images.update(ubuntu_uuid, {"spec": {"name": "ubuntu-20"}})
+    images.delete(centos_uuid)
+    images.create({"spec": {"name": "centos"}})
+    Cache.sync("AHV_DISK_IMAGE")
+    assert stub.request_counts[("POST", "/api/nutanix/v3/images/list")] == 1
+
+    assert Cache.get_entity_uuid("AHV_DISK_IMAGE", "ubuntu") is None
+    assert Cache.get_entity_uuid("AHV_DISK_IMAGE", "ubuntu-20") == ubuntu_uuid
+    assert Cache.get_entity_uuid("AHV_DISK_IMAGE", "centos") not in [
+        None,
+        centos_uuid,
+    ]
+    assert Cache.get_entity_uuid("AHV_DISK_IMAGE", "image-1999") == get_uuid(
+        "images", 1999
+    )
+    assert len(Cache.list()) == 2000 - 1 + 2 + 20 + 5
+
+    # Clearing the cache forgets the high water marks
+    Cache.clear_entities()
+    assert Cache.get_max_update_time("AHV_DISK_IMAGE") is None
+    LOG.info("Success")
+
+
+def test_unsorted_delta_sync(cache_db, cache_stub):
+
+    stub = cache_stub(volumes={"images": 200, "subnets": 20}, sort_lists=False)
+    images = get_resource_api("images", cache.get_api_client().connection)
+
+    res, err = images.create({"spec": {"name": "centos"}})
+    centos_uuid = res.json()["metadata"]["uuid"]
+    Cache.sync()
+
+    # Renames listed after older entities are found by full fetch, if
+    # list is not sorted as asked
+    images.update(centos_uuid, {"spec": {"name": "centos-8"}})
+    stub.request_counts.clear()
+    Cache.sync("AHV_DISK_IMAGE")
+    assert stub.request_counts[("POST", "/api/nutanix/v3/images/list")] > 1
+
+    assert Cache.get_entity_uuid("AHV_DISK_IMAGE", "centos") is None
+    assert Cache.get_entity_uuid("AHV_DISK_IMAGE", "centos-8") == centos_uuid
+    LOG.info("Success")
+
+
+def test_lazy_sync(cache_db, cache_stub, monkeypatch):
+
+    config = configparser.ConfigParser()
+    config.optionxform = str
+    config.read_dict({"CACHE": {"ttl": "3600", "AHV_SUBNET": "0.1"}})
+    monkeypatch.setattr(cache, "get_config", lambda: config)
+    assert Cache.get_ttl("AHV_DISK_IMAGE") == 3600
+    assert Cache.get_ttl("AHV_SUBNET") == 0.1
+
+    stub = cache_stub(volumes={"images": 500, "subnets": 20})
+
+    def get_list_calls():
+        return {
+            path.split("/")[-2]: count
+            for (method, path), count in stub.request_counts.items()
+            if path.endswith("/list")
+        }
+
+    # Only the types looked up are synced, once per context
+    with Cache.lazy_sync():
+        image_uuid = Cache.get_entity_uuid("AHV_DISK_IMAGE", "image-3")
+        assert image_uuid == get_uuid("images", 3)
+        assert Cache.get_entity_uuid("AHV_DISK_IMAGE", "unknown") is None
+    assert get_list_calls() == {"images": 2}
+
+    # Fresh types are not synced, unless the entity is missing
+    stub.request_counts.clear()
+    with Cache.lazy_sync():
+        assert Cache.get_entity_uuid("AHV_DISK_IMAGE", "image-4")
+    assert get_list_calls() == {}
+
+    with Cache.lazy_sync():
+        assert Cache.get_entity_uuid("AHV_DISK_IMAGE", "unknown") is None
+    assert get_list_calls() == {"images": 1}
+
+    # Stale types are synced
+    with Cache.lazy_sync():
+        assert Cache.get_entity_uuid("AHV_SUBNET", "subnet-1")
+    time.sleep(0.1)
+    stub.request_counts.clear()
+    with Cache.lazy_sync():
+        assert Cache.get_entity_uuid("AHV_SUBNET", "subnet-1")
+    assert get_list_calls() == {"subnets": 1}
+
+    stub.request_counts.clear()
+    with Cache.lazy_sync(enabled=False):
+        assert Cache.get_entity_uuid("AHV_SUBNET", "subnet-1")
+        assert Cache.get_entity_uuid("PROJECT", "project-1") is None
+    assert get_list_calls() == {}
+    LOG.info("Success")
+
+
+def test_concurrent_sync(cache_db, cache_stub):
+
+    stub = cache_stub(
+        volumes={"images": 10, "subnets": 10}, latency=0.2, request_coalescing=False
+    )
+
+    # Types are fetched concurrently
+    report = Cache.sync()
+    assert stub.max_in_flight > 1
+    assert report == {
+        entity_type: None
+        for entity_type, cache_entity in Cache.registry.items()
+        if not (cache_entity.scopes or cache_entity.on_demand)
+    }
+
+    # Failure of a type is reported, and its entities are left as they are
+    stub.inject_errors(1, status=500)
+    report = Cache.sync(full=True)
+    failed = [entity_type for entity_type, err in report.items() if err]
+    assert len(failed) == 1
+    assert "500" in report[failed[0]]
+
+    assert len(Cache.list()) == 10 + 10 + 5
+    LOG.info("Success")
+
+
+def test_on_demand_entities(cache_db, cache_stub, monkeypatch):
+
+    config = configparser.ConfigParser()
+    config.read_dict({"CACHE": {"ttl": "3600"}})
+    monkeypatch.setattr(cache, "get_config", lambda: config)
+
+    cache_entity = CacheEntity("STUB_IMAGE", "images", on_demand=True)
+    monkeypatch.setitem(Cache.registry, "STUB_IMAGE", cache_entity)
+
+    cache_stub(volumes={"images": 10, "subnets": 20})
+
+    # Entities are not synced by sync of all types, till looked up
+    report = Cache.sync()
+    assert "STUB_IMAGE" not in report
+    assert "AHV_DISK_IMAGE" in report
+
+    assert len(Cache.get_entities("STUB_IMAGE")) == 10
+    report = Cache.sync()
+    assert report["STUB_IMAGE"] is None
+
+    # Entities are synced if asked for
+    Cache.clear_entities()
+    assert Cache.sync("STUB_IMAGE") == {"STUB_IMAGE": None}
+    LOG.info("Success")
+
+
+def test_scoped_entities(cache_db, cache_stub, monkeypatch):
+
+    config = configparser.ConfigParser()
+    config.read_dict({"CACHE": {"ttl": "3600"}})
+    monkeypatch.setattr(cache, "get_config", lambda: config)
+
+    cache_entity = CacheEntity(
+        "STUB_SUBNET",
+        "subnets",
+        uuid_key="status.name",
+        scopes=["account_uuid", "cluster"],
+        filter="name==subnet-1.*",
+    )
+    monkeypatch.setitem(Cache.registry, "STUB_SUBNET", cache_entity)
+    assert Cache.get_cache_entity("STUB_SUBNET:account_uuid==a") is cache_entity
+    assert (
+        Cache.get_scoped_type("STUB_SUBNET", {"cluster": "c1", "account_uuid": "a"})
+        == "STUB_SUBNET:account_uuid==a;cluster==c1"
+    )
+    with pytest.raises(ValueError):
+        Cache.get_entities("STUB_SUBNET", region="us-east-1")
+
+    # Scoped entities are not synced incrementally (groups api is not scoped)
+    with pytest.raises(ValueError):
+        CacheEntity(
+            "STUB_SUBNET",
+            "subnets",
+            scopes=["account_uuid"],
+            groups_entity_type="subnet",
+        )
+    with pytest.raises(ValueError):
+        CacheEntity(
+            "STUB_SUBNET", "subnets", filter="name==a", groups_entity_type="subnet"
+        )
+
+    stub = cache_stub(volumes={"images": 10, "subnets": 20}, request_coalescing=False)
+
+    # Entities are fetched with the filter of scope, once till stale
+    names = ["subnet-1"] + ["subnet-1{}".format(index) for index in range(10)]
+    subnets = Cache.get_entities("STUB_SUBNET", account_uuid="a")
+    assert list(subnets.items()) == [(name, name) for name in names]
+    assert Cache.get_entities("STUB_SUBNET", account_uuid="a") == subnets
+    Cache.get_entities("STUB_SUBNET", account_uuid="b", cluster="c1")
+    assert stub.request_counts[("POST", "/api/nutanix/v3/subnets/list")] == 2
+
+    # Scopes synced before are refreshed by sync of all types
+    stub.request_counts.clear()
+    report = Cache.sync()
+    assert report["STUB_SUBNET:account_uuid==a"] is None
+    assert report["STUB_SUBNET:account_uuid==b;cluster==c1"] is None
+    assert stub.request_counts[("POST", "/api/nutanix/v3/subnets/list")] == 2 + 1
+
+    # Entities never synced cannot be served, if fetch fails
+    stub.inject_errors(1, status=500)
+    with pytest.raises(Exception):
+        Cache.get_entities("STUB_SUBNET", account_uuid="c")
+
+    assert Cache.get_entity_uuid("STUB_SUBNET", "subnet-12", account_uuid="a")
+    assert Cache.get_entity_uuid("STUB_SUBNET", "subnet-12") is None
+    LOG.info("Success")
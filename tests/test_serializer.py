@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from calm.dsl.tools import serializer
+
+
+BACKENDS = ["json"]
+try:
+    import orjson  # noqa
+
+    BACKENDS.append("orjson")
+except ImportError:
+    pass
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+
+    previous = serializer.get_json_backend().name
+    serializer.set_json_backend(request.param)
+    yield request.param
+    serializer.set_json_backend(previous)
+
+
+def test_round_trip(backend):
+
+    data = {"name": "vm-é", "spec": {"count": 2, "disks": [1.5, None, True]}}
+    assert serializer.loads(serializer.dumps_bytes(data)) == data
+    assert serializer.loads(serializer.dumps(data)) == data
+    assert serializer.dumps({"b": 1, "a": 2}, sort_keys=True) == '{"a":2,"b":1}'
+
+    # Large integers are encoded irrespective of backend
+    assert serializer.loads(serializer.dumps_bytes({"size": 2 ** 70})) == {
+        "size": 2 ** 70
+    }
+
+
+def test_pprint_and_default(backend):
+    class Node:
+        pass
+
+    data = {"node": Node(), "id": 1}
+    pprint = serializer.dumps(data, pprint=True, default=lambda obj: "node")
+    assert pprint == json.dumps(
+        {"node": "node", "id": 1}, indent=4, separators=(",", ": ")
+    )
+
+    with pytest.raises(TypeError):
+        serializer.dumps_bytes(data)